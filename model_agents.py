@@ -4,23 +4,72 @@ Model-specific agent implementations using pydantic_ai.
 This module provides agent implementations for different LLM providers.
 """
 
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Sequence, Tuple
+from pydantic import BaseModel, Field, TypeAdapter
 from pydantic_ai import Agent
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    RetryPromptPart,
+    SystemPromptPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart
+)
+from pydantic_ai.usage import Usage
 from datetime import datetime, UTC
 import os
+import time
+
+from model_mock import mock_model
+from model_tools import get_tools
+
+# Name of the tool pydantic_ai uses for structured results
+RESULT_TOOL_NAME = "final_result"
+
+# Usage detail keys reporting prompt tokens served from the provider's prompt cache.
+# pydantic_ai does not map Anthropic cache usage into the details, so there is no key for it.
+CACHED_TOKEN_DETAILS = (
+    "cached_tokens",  # OpenAI-compatible APIs
+    "cached_content_token_count",  # Gemini
+)
 
 class TestResponse(BaseModel):
     """Structured response from test runs."""
     content: str = Field(..., description="The model's response")
     duration: float = Field(..., description="Time taken to generate response in seconds")
+    validation_time: Optional[float] = Field(None, description="Time to re-validate the structured result with a cached TypeAdapter, in seconds")
+    retries: int = Field(0, description="Number of retries requested because of invalid structured output")
+    request_tokens: Optional[int] = Field(None, description="Prompt tokens reported by the provider")
+    response_tokens: Optional[int] = Field(None, description="Completion tokens reported by the provider")
+    cached_tokens: Optional[int] = Field(None, description="Prompt tokens served from the provider's prompt cache")
+    ttft: Optional[float] = Field(None, description="Time to first token in seconds (streamed runs only)")
+    turn_durations: Optional[List[float]] = Field(None, description="Latency of each turn of a conversation in seconds")
+    turn_context_tokens: Optional[List[Optional[int]]] = Field(None, description="Prompt tokens of each turn, i.e. the conversation's cumulative context")
+    tool_calls: Optional[int] = Field(None, description="Local tool calls made by the model (tool runs only)")
+    model_turns: Optional[int] = Field(None, description="Model responses needed to answer, including tool-calling ones (tool runs only)")
+    tool_round_trips: Optional[List[float]] = Field(None, description="Seconds from each model request to its tool results (tool runs only)")
+
+@lru_cache(maxsize=None)
+def get_type_adapter(result_type: type) -> TypeAdapter:
+    """Get a cached TypeAdapter for a result type."""
+    return TypeAdapter(result_type)
 
-def create_test_agent(model_name: str, api_key: Optional[str] = None) -> Agent:
+def create_test_agent(
+    model_name: str,
+    api_key: Optional[str] = None,
+    result_type: type = str,
+    tools: Sequence[str] = ()
+) -> Agent:
     """Create an agent for testing.
     
     Args:
         model_name: Full model name (e.g., 'groq:deepseek-r1-distill-llama-70b')
         api_key: Optional API key (will use environment variable if not provided)
+        result_type: Result type; anything other than str uses structured output
+        tools: Names of local tools to register (see model_tools.py)
         
     Returns:
         Configured Agent instance
@@ -31,37 +80,158 @@ def create_test_agent(model_name: str, api_key: Optional[str] = None) -> Agent:
         env_var = f"{provider.upper()}_API_KEY"
         os.environ[env_var] = api_key
 
+    # Mock models are served by the local mock server
+    model = mock_model(model_name) if model_name.startswith("mock:") else model_name
     return Agent(
-        model=model_name,
-        result_type=str,  # We want raw string responses for tests
-        system_prompt="You are a helpful assistant."  # Default system prompt
+        model=model,
+        result_type=result_type,
+        system_prompt="You are a helpful assistant.",  # Default system prompt
+        tools=get_tools(tools)
+    )
+
+def get_cached_tokens(usage: Usage) -> Optional[int]:
+    """Get the number of cached prompt tokens from a run's usage, if reported."""
+    details = usage.details or {}
+    for key in CACHED_TOKEN_DETAILS:
+        if key in details:
+            return details[key]
+    return None
+
+def measure_validation(messages: List[ModelMessage], result_type: type) -> Tuple[float, int]:
+    """Measure the parse/validation cost of a structured result.
+    
+    Re-validates the final result tool call with the cached TypeAdapter
+    after the run. pydantic_ai's own validation during the run is not
+    timed, so this is an estimate of its cost, not a measurement of it.
+    
+    Args:
+        messages: All messages of the run
+        result_type: The structured result type
+        
+    Returns:
+        Tuple of (validation time in seconds, number of retry prompts)
+    """
+    retries = sum(
+        1 for message in messages if isinstance(message, ModelRequest)
+        for part in message.parts if isinstance(part, RetryPromptPart)
+    )
+    calls = [
+        part for message in messages if isinstance(message, ModelResponse)
+        for part in message.parts if isinstance(part, ToolCallPart) and part.tool_name == RESULT_TOOL_NAME
+    ]
+    if not calls:
+        return 0.0, retries
+    
+    adapter = get_type_adapter(result_type)
+    raw = calls[-1].args_as_json_str()
+    start = time.perf_counter()
+    adapter.validate_json(raw)
+    return time.perf_counter() - start, retries
+
+def measure_tool_use(messages: List[ModelMessage]) -> Tuple[int, int, List[float]]:
+    """Measure the model turns and tool round trips of a run.
+    
+    A round trip starts when a request goes to the model and ends when the
+    tool results (or retry prompts) of its response are ready, using the
+    local timestamps of the prompt and tool return parts. The turn that
+    produces the answer is not a round trip.
+    
+    Args:
+        messages: All messages of the run
+        
+    Returns:
+        Tuple of (model turns, tool calls, round trip durations in seconds)
+    """
+    turns = sum(1 for message in messages if isinstance(message, ModelResponse))
+    calls = sum(
+        1 for message in messages if isinstance(message, ModelResponse)
+        for part in message.parts if isinstance(part, ToolCallPart) and part.tool_name != RESULT_TOOL_NAME
     )
+    round_trips = []
+    previous = None
+    for message in messages:
+        if not isinstance(message, ModelRequest):
+            continue
+        stamps = [
+            part.timestamp for part in message.parts
+            if isinstance(part, (ToolReturnPart, RetryPromptPart)) and part.tool_name != RESULT_TOOL_NAME
+        ]
+        if stamps and previous is not None:
+            round_trips.append((max(stamps) - previous).total_seconds())
+        prompts = [part.timestamp for part in message.parts if isinstance(part, UserPromptPart)]
+        previous = max(stamps + prompts, default=previous)
+    return turns, calls, round_trips
 
-async def run_test(agent: Agent, system_prompt: str, user_prompt: str) -> TestResponse:
+async def run_test(
+    agent: Agent,
+    system_prompt: str,
+    user_prompt: str,
+    result_type: type = str,
+    stream: bool = False
+) -> TestResponse:
     """Run a test with the agent.
     
     Args:
         agent: The agent to test with
         system_prompt: The system prompt to use
         user_prompt: The user prompt to test
+        result_type: The agent's result type; structured results are returned as JSON
+        stream: Stream the response to measure time to first token (text results only)
         
     Returns:
         TestResponse containing the response and metrics
     """
     start_time = datetime.now(UTC)
     try:
-        # Update system prompt for this test
-        agent.system_prompt = system_prompt
+        # Pass the system prompt per run instead of mutating the shared agent,
+        # so concurrent tests on one agent don't race. The agent's default
+        # system prompt is skipped when a message history is given.
+        message_history = [ModelRequest(parts=[SystemPromptPart(content=system_prompt)])]
+        
+        if stream and result_type is str:
+            ttft = None
+            chunks = []
+            async with agent.run_stream(user_prompt, message_history=message_history) as result:
+                async for chunk in result.stream_text(delta=True, debounce_by=None):
+                    if ttft is None:
+                        ttft = (datetime.now(UTC) - start_time).total_seconds()
+                    chunks.append(chunk)
+            duration = max((datetime.now(UTC) - start_time).total_seconds(), 0.001)
+            usage = result.usage()
+            return TestResponse(
+                content="".join(chunks),
+                duration=duration,
+                request_tokens=usage.request_tokens,
+                response_tokens=usage.response_tokens,
+                cached_tokens=get_cached_tokens(usage),
+                ttft=ttft
+            )
         
-        result = await agent.run(user_prompt)
+        result = await agent.run(user_prompt, message_history=message_history)
         
         duration = (datetime.now(UTC) - start_time).total_seconds()
         if duration == 0:
             duration = 0.001  # Minimum duration to avoid division by zero
+        usage = result.usage()
         
+        if result_type is str:
+            return TestResponse(
+                content=result.data,  # Using .data for run() response
+                duration=duration,
+                request_tokens=usage.request_tokens,
+                response_tokens=usage.response_tokens,
+                cached_tokens=get_cached_tokens(usage)
+            )
+        
+        validation_time, retries = measure_validation(result.all_messages(), result_type)
         return TestResponse(
-            content=result.data,  # Using .data for run() response
-            duration=duration
+            content=get_type_adapter(result_type).dump_json(result.data).decode(),
+            duration=duration,
+            validation_time=validation_time,
+            retries=retries,
+            request_tokens=usage.request_tokens,
+            response_tokens=usage.response_tokens,
+            cached_tokens=get_cached_tokens(usage)
         )
     except Exception as e:
         duration = (datetime.now(UTC) - start_time).total_seconds()
@@ -71,4 +241,92 @@ async def run_test(agent: Agent, system_prompt: str, user_prompt: str) -> TestRe
         return TestResponse(
             content=f"Error: {str(e)}",
             duration=duration
-        ) 
\ No newline at end of file
+        ) 
+
+async def run_tool_task(agent: Agent, system_prompt: str, user_prompt: str) -> TestResponse:
+    """Run a task the agent answers by calling its local tools.
+    
+    Args:
+        agent: Agent with the task's tools registered
+        system_prompt: The system prompt to use
+        user_prompt: The task
+        
+    Returns:
+        TestResponse with the answer, the total time to answer, and the
+        model turns, tool calls and round trips it took
+    """
+    start_time = datetime.now(UTC)
+    message_history = [ModelRequest(parts=[SystemPromptPart(content=system_prompt)])]
+    try:
+        result = await agent.run(user_prompt, message_history=message_history)
+    except Exception as e:
+        return TestResponse(
+            content=f"Error: {str(e)}",
+            duration=max((datetime.now(UTC) - start_time).total_seconds(), 0.001)
+        )
+    
+    duration = max((datetime.now(UTC) - start_time).total_seconds(), 0.001)
+    usage = result.usage()
+    turns, calls, round_trips = measure_tool_use(result.all_messages())
+    return TestResponse(
+        content=result.data,
+        duration=duration,
+        request_tokens=usage.request_tokens,
+        response_tokens=usage.response_tokens,
+        cached_tokens=get_cached_tokens(usage),
+        tool_calls=calls,
+        model_turns=turns,
+        tool_round_trips=round_trips
+    )
+
+async def run_conversation(agent: Agent, system_prompt: str, user_prompts: List[str]) -> TestResponse:
+    """Run a multi-turn conversation with the agent.
+    
+    Each turn continues from the previous turn's messages, so the history
+    grows incrementally instead of being rebuilt per turn.
+    
+    Args:
+        agent: The agent to test
+        system_prompt: The system prompt to use
+        user_prompts: The user turns, in order
+        
+    Returns:
+        TestResponse with the turn responses joined by horizontal rules, the
+        total duration and per-turn latency and context size; cached tokens
+        are summed over the turns that reported them
+    """
+    start_time = datetime.now(UTC)
+    message_history: List[ModelMessage] = [ModelRequest(parts=[SystemPromptPart(content=system_prompt)])]
+    contents, durations, context_tokens = [], [], []
+    request_tokens = response_tokens = 0
+    cached_tokens: Optional[int] = None
+    try:
+        for user_prompt in user_prompts:
+            turn_start = time.perf_counter()
+            result = await agent.run(user_prompt, message_history=message_history)
+            durations.append(time.perf_counter() - turn_start)
+            message_history = result.all_messages()
+            usage = result.usage()
+            context_tokens.append(usage.request_tokens)
+            request_tokens += usage.request_tokens or 0
+            response_tokens += usage.response_tokens or 0
+            if (turn_cached := get_cached_tokens(usage)) is not None:
+                cached_tokens = (cached_tokens or 0) + turn_cached
+            contents.append(result.data)
+    except Exception as e:
+        return TestResponse(
+            content=f"Error: turn {len(durations) + 1}: {str(e)}",
+            duration=max((datetime.now(UTC) - start_time).total_seconds(), 0.001),
+            turn_durations=durations,
+            turn_context_tokens=context_tokens
+        )
+    
+    return TestResponse(
+        content="\n\n---\n\n".join(contents),
+        duration=max((datetime.now(UTC) - start_time).total_seconds(), 0.001),
+        request_tokens=request_tokens,
+        response_tokens=response_tokens,
+        cached_tokens=cached_tokens,
+        turn_durations=durations,
+        turn_context_tokens=context_tokens
+    )
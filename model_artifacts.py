@@ -0,0 +1,125 @@
+"""
+Content-addressed artifact store for model responses.
+
+Responses are stored once, compressed, under the SHA-256 of their text.
+Result records reference them by hash, so repeated runs and identical
+responses never write the same bytes twice.
+"""
+
+import gzip
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from model_writer import write_bytes
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency, gzip is used when missing
+    zstandard = None
+
+class ArtifactStore:
+    """Compressed, content-addressed storage for response text."""
+
+    def __init__(self, root: Path, codec: Optional[str] = None):
+        """Initialize the store.
+
+        Args:
+            root: Directory holding the artifacts
+            codec: 'zstd' or 'gzip' (default: zstd when installed, otherwise gzip)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        if codec is None:
+            codec = "zstd" if zstandard is not None else "gzip"
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("zstd codec requires the zstandard package")
+        if codec not in ("zstd", "gzip"):
+            raise ValueError(f"Unknown codec: {codec}")
+        self.codec = codec
+        # Write I/O accounting for the current run
+        self.artifacts_written = 0
+        self.duplicates_skipped = 0
+        self.bytes_in = 0
+        self.bytes_written = 0
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Get the content address of a text."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _path(self, digest: str, codec: str) -> Path:
+        suffix = ".zst" if codec == "zstd" else ".gz"
+        return self.root / digest[:2] / f"{digest[2:]}{suffix}"
+
+    def _find(self, digest: str) -> Optional[Path]:
+        for codec in ("zstd", "gzip"):
+            path = self._path(digest, codec)
+            if path.exists():
+                return path
+        return None
+
+    def __contains__(self, digest: str) -> bool:
+        return self._find(digest) is not None
+
+    def put(self, text: str) -> str:
+        """Store a text if it is not stored yet.
+
+        Args:
+            text: The text to store
+
+        Returns:
+            The SHA-256 hex digest referencing the text
+        """
+        digest = self.hash_text(text)
+        raw = text.encode("utf-8")
+        self.bytes_in += len(raw)
+        if digest in self:
+            self.duplicates_skipped += 1
+            return digest
+
+        if self.codec == "zstd":
+            data = zstandard.ZstdCompressor(level=10).compress(raw)
+        else:
+            data = gzip.compress(raw, compresslevel=9, mtime=0)
+
+        # Written atomically so readers never see partial artifacts
+        write_bytes(self._path(digest, self.codec), data)
+        self.artifacts_written += 1
+        self.bytes_written += len(data)
+        return digest
+
+    def generate_stats_table(self) -> str:
+        """Generate a markdown table of the write I/O saved by deduplication and compression."""
+        ratio = self.bytes_in / self.bytes_written if self.bytes_written else 0.0
+        rows = [
+            "| Responses Stored | Duplicates Skipped | Response Bytes | Bytes Written | Reduction |",
+            "|---|---|---|---|---|",
+            f"| {self.artifacts_written} | {self.duplicates_skipped} | {self.bytes_in} | "
+            f"{self.bytes_written} | {ratio:.1f}x |"
+        ]
+        return "\n".join(rows)
+
+    def get(self, digest: str) -> str:
+        """Load a stored text.
+
+        Args:
+            digest: The content address returned by put
+
+        Returns:
+            The stored text
+
+        Raises:
+            KeyError: If no artifact exists for the digest
+        """
+        path = self._find(digest)
+        if path is None:
+            raise KeyError(f"Artifact {digest} not found")
+        data = path.read_bytes()
+        if path.suffix == ".zst":
+            if zstandard is None:
+                raise ValueError("Reading zstd artifacts requires the zstandard package")
+            raw = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            raw = gzip.decompress(data)
+        return raw.decode("utf-8")
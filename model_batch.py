@@ -0,0 +1,321 @@
+"""
+Batch execution backends for bulk offline evaluation.
+
+This module packages many (model, test_case) jobs into provider batch
+submissions, polls them with exponential backoff and maps the outputs back
+to the same TestResponse records produced by model_agents.run_test.
+"""
+
+import asyncio
+import io
+import json
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime, UTC
+from typing import Dict, List, Optional
+
+import aiohttp
+from pydantic import BaseModel, Field
+
+from model_agents import TestResponse
+
+# Default API endpoints, overridable with <PROVIDER>_API_BASE (see env.example)
+DEFAULT_API_BASES = {
+    "anthropic": "https://api.anthropic.com",
+    "openai": "https://api.openai.com",
+    "groq": "https://api.groq.com/openai",
+}
+
+class BatchJob(BaseModel):
+    """A single request inside a provider batch."""
+    custom_id: str = Field(..., description="Identifier used to match the batch output")
+    model: str = Field(..., description="Full model name (e.g., 'anthropic:claude-3-5-sonnet-latest')")
+    test_case: str
+    system_prompt: str
+    user_prompt: str
+    max_tokens: int = 4096
+
+class BatchStatus(BaseModel):
+    """Provider-independent view of a submitted batch."""
+    batch_id: str
+    done: bool = False
+    failed: bool = False
+    results_ref: Optional[str] = None  # results URL or output file id
+    errors_ref: Optional[str] = None
+
+class BatchBackend(ABC):
+    """Base class for provider batch endpoints."""
+
+    provider: str = ""
+
+    def __init__(self, api_key: Optional[str] = None, api_base: Optional[str] = None):
+        """Initialize the backend.
+
+        Args:
+            api_key: Optional API key (will use environment variable if not provided)
+            api_base: Optional API base URL (will use <PROVIDER>_API_BASE or the default)
+        """
+        env_prefix = self.provider.upper().replace("-", "_")
+        self.api_key = api_key or os.getenv(f"{env_prefix}_API_KEY", "")
+        self.api_base = (
+            api_base
+            or os.getenv(f"{env_prefix}_API_BASE")
+            or DEFAULT_API_BASES[self.provider]
+        ).rstrip("/")
+
+    @abstractmethod
+    def _headers(self) -> Dict[str, str]:
+        """Get the authentication headers for the provider."""
+
+    @abstractmethod
+    async def submit(self, session: aiohttp.ClientSession, jobs: List[BatchJob]) -> BatchStatus:
+        """Submit jobs and return the initial batch status."""
+
+    @abstractmethod
+    async def poll(self, session: aiohttp.ClientSession, batch_id: str) -> BatchStatus:
+        """Fetch the current status of a batch."""
+
+    @abstractmethod
+    async def fetch_results(self, session: aiohttp.ClientSession, status: BatchStatus) -> Dict[str, TestResponse]:
+        """Download the results of a finished batch keyed by custom_id.
+
+        Durations are filled in by run_batch, so they are zero here.
+        """
+
+    @staticmethod
+    def _model_id(model: str) -> str:
+        """Strip the provider prefix from a full model name."""
+        return model.split(":", 1)[1] if ":" in model else model
+
+class AnthropicBatchBackend(BatchBackend):
+    """Anthropic Message Batches API."""
+
+    provider = "anthropic"
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json",
+        }
+
+    def _status(self, data: Dict) -> BatchStatus:
+        return BatchStatus(
+            batch_id=data["id"],
+            done=data.get("processing_status") == "ended",
+            results_ref=data.get("results_url"),
+        )
+
+    async def submit(self, session: aiohttp.ClientSession, jobs: List[BatchJob]) -> BatchStatus:
+        payload = {
+            "requests": [
+                {
+                    "custom_id": job.custom_id,
+                    "params": {
+                        "model": self._model_id(job.model),
+                        "max_tokens": job.max_tokens,
+                        "system": job.system_prompt,
+                        "messages": [{"role": "user", "content": job.user_prompt}],
+                    },
+                }
+                for job in jobs
+            ]
+        }
+        async with session.post(f"{self.api_base}/v1/messages/batches", json=payload, headers=self._headers()) as resp:
+            resp.raise_for_status()
+            return self._status(await resp.json())
+
+    async def poll(self, session: aiohttp.ClientSession, batch_id: str) -> BatchStatus:
+        async with session.get(f"{self.api_base}/v1/messages/batches/{batch_id}", headers=self._headers()) as resp:
+            resp.raise_for_status()
+            return self._status(await resp.json())
+
+    async def fetch_results(self, session: aiohttp.ClientSession, status: BatchStatus) -> Dict[str, TestResponse]:
+        results: Dict[str, TestResponse] = {}
+        if not status.results_ref:
+            return results
+        async with session.get(status.results_ref, headers=self._headers()) as resp:
+            resp.raise_for_status()
+            body = await resp.text()
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            result = item.get("result", {})
+            if result.get("type") == "succeeded":
+                blocks = result["message"].get("content", [])
+                content = "".join(b.get("text", "") for b in blocks if b.get("type") == "text")
+                results[item["custom_id"]] = TestResponse(content=content, duration=0)
+            else:
+                error = result.get("error", {}).get("message") or result.get("type", "unknown")
+                results[item["custom_id"]] = TestResponse(content=f"Error: {error}", duration=0)
+        return results
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI-compatible Batch API (also served by Groq)."""
+
+    provider = "openai"
+
+    def _headers(self) -> Dict[str, str]:
+        return {"authorization": f"Bearer {self.api_key}"}
+
+    def _status(self, data: Dict) -> BatchStatus:
+        state = data.get("status")
+        return BatchStatus(
+            batch_id=data["id"],
+            done=state in ("completed", "failed", "expired", "cancelled"),
+            failed=state in ("failed", "expired", "cancelled"),
+            results_ref=data.get("output_file_id"),
+            errors_ref=data.get("error_file_id"),
+        )
+
+    def _max_tokens_field(self, model: str) -> str:
+        # OpenAI reasoning models reject max_tokens
+        if self._model_id(model).startswith(("o1", "o3")):
+            return "max_completion_tokens"
+        return "max_tokens"
+
+    async def submit(self, session: aiohttp.ClientSession, jobs: List[BatchJob]) -> BatchStatus:
+        lines = [
+            json.dumps({
+                "custom_id": job.custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self._model_id(job.model),
+                    self._max_tokens_field(job.model): job.max_tokens,
+                    "messages": [
+                        {"role": "system", "content": job.system_prompt},
+                        {"role": "user", "content": job.user_prompt},
+                    ],
+                },
+            })
+            for job in jobs
+        ]
+        form = aiohttp.FormData()
+        form.add_field("purpose", "batch")
+        form.add_field("file", io.BytesIO("\n".join(lines).encode()), filename="batch.jsonl",
+                       content_type="application/jsonl")
+        async with session.post(f"{self.api_base}/v1/files", data=form, headers=self._headers()) as resp:
+            resp.raise_for_status()
+            file_id = (await resp.json())["id"]
+
+        payload = {
+            "input_file_id": file_id,
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h",
+        }
+        async with session.post(f"{self.api_base}/v1/batches", json=payload, headers=self._headers()) as resp:
+            resp.raise_for_status()
+            return self._status(await resp.json())
+
+    async def poll(self, session: aiohttp.ClientSession, batch_id: str) -> BatchStatus:
+        async with session.get(f"{self.api_base}/v1/batches/{batch_id}", headers=self._headers()) as resp:
+            resp.raise_for_status()
+            return self._status(await resp.json())
+
+    async def _file_lines(self, session: aiohttp.ClientSession, file_id: str) -> List[Dict]:
+        async with session.get(f"{self.api_base}/v1/files/{file_id}/content", headers=self._headers()) as resp:
+            resp.raise_for_status()
+            body = await resp.text()
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+    async def fetch_results(self, session: aiohttp.ClientSession, status: BatchStatus) -> Dict[str, TestResponse]:
+        results: Dict[str, TestResponse] = {}
+        for ref in (status.results_ref, status.errors_ref):
+            if not ref:
+                continue
+            for item in await self._file_lines(session, ref):
+                response = item.get("response") or {}
+                if item.get("error") or response.get("status_code") != 200:
+                    error = (item.get("error") or {}).get("message") or f"status {response.get('status_code')}"
+                    results[item["custom_id"]] = TestResponse(content=f"Error: {error}", duration=0)
+                    continue
+                choices = response["body"].get("choices", [])
+                content = choices[0]["message"].get("content", "") if choices else ""
+                results[item["custom_id"]] = TestResponse(content=content or "", duration=0)
+        return results
+
+class GroqBatchBackend(OpenAIBatchBackend):
+    """Groq's OpenAI-compatible Batch API."""
+
+    provider = "groq"
+
+BATCH_BACKENDS = {
+    "anthropic": AnthropicBatchBackend,
+    "openai": OpenAIBatchBackend,
+    "groq": GroqBatchBackend,
+}
+
+def get_batch_backend(provider: str, api_key: Optional[str] = None, api_base: Optional[str] = None) -> BatchBackend:
+    """Get the batch backend for a provider.
+
+    Args:
+        provider: The provider name
+        api_key: Optional API key
+        api_base: Optional API base URL
+
+    Returns:
+        Configured BatchBackend instance
+
+    Raises:
+        KeyError: If the provider has no batch endpoint
+    """
+    if provider not in BATCH_BACKENDS:
+        raise KeyError(f"Provider {provider} does not support batch execution")
+    return BATCH_BACKENDS[provider](api_key=api_key, api_base=api_base)
+
+async def run_batch(
+    backend: BatchBackend,
+    jobs: List[BatchJob],
+    poll_interval: float = 5.0,
+    max_poll_interval: float = 300.0,
+    timeout: float = 24 * 3600,
+    session: Optional[aiohttp.ClientSession] = None,
+) -> Dict[str, TestResponse]:
+    """Submit jobs as one batch and wait for the results.
+
+    Args:
+        backend: The provider batch backend
+        jobs: Jobs to submit; custom_ids must be unique
+        poll_interval: Initial delay between status checks in seconds
+        max_poll_interval: Upper bound for the exponential backoff
+        timeout: Give up after this many seconds
+        session: Optional shared HTTP session
+
+    Returns:
+        TestResponse per custom_id. Each duration is the batch turnaround
+        (submission to results available), since providers do not report
+        per-request latency. Jobs missing from the output are returned as errors.
+    """
+    if not jobs:
+        return {}
+
+    own_session = session is None
+    session = session or aiohttp.ClientSession()
+    start_time = datetime.now(UTC)
+    try:
+        status = await backend.submit(session, jobs)
+        delay = poll_interval
+        while not status.done:
+            elapsed = (datetime.now(UTC) - start_time).total_seconds()
+            if elapsed >= timeout:
+                raise TimeoutError(f"Batch {status.batch_id} did not finish within {timeout:.0f}s")
+            await asyncio.sleep(min(delay, timeout - elapsed))
+            delay = min(delay * 2, max_poll_interval)
+            status = await backend.poll(session, status.batch_id)
+
+        results = await backend.fetch_results(session, status)
+    finally:
+        if own_session:
+            await session.close()
+
+    duration = max((datetime.now(UTC) - start_time).total_seconds(), 0.001)
+    responses = {}
+    for job in jobs:
+        response = results.get(job.custom_id)
+        if response is None:
+            reason = "batch failed" if status.failed else "missing from batch output"
+            response = TestResponse(content=f"Error: {reason}", duration=0)
+        responses[job.custom_id] = TestResponse(content=response.content, duration=duration)
+    return responses
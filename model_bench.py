@@ -0,0 +1,386 @@
+"""
+Microbenchmarks for the harness's reporting and persistence code paths.
+
+The code paths that slow down as results and history grow are measured on
+synthetic fixtures (from 1k results over 10 models to 1M results over 500
+models): history load and save, the metrics and speed ranking tables,
+saving results and registry lookups. Each operation is timed (best of a
+few runs) and then run once more under tracemalloc for its peak memory.
+
+Measurements are compared with a stored baseline. The run fails when an
+operation got slower or allocates more than the threshold allows, so the
+reporting and persistence layers don't quietly become the bottleneck:
+
+    python model_bench.py                    # Compare with the baseline
+    python model_bench.py --update-baseline  # Store the current numbers
+
+Fixture responses come from a small pool, so the artifact store writes
+each distinct response once; result files are written in full.
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from model_artifacts import ArtifactStore
+from model_breaker import BreakerTransition
+from model_test import (
+    SCENARIO_TESTS,
+    ModelCapabilities,
+    ModelTester,
+    ModelTestHistory,
+    TestResult,
+    TestScenario
+)
+from model_utils import MODEL_REGISTRY, get_model_info
+
+# (results, models) fixtures measured by default
+DEFAULT_CASES = ((1_000, 10), (100_000, 100), (1_000_000, 500))
+
+DEFAULT_BASELINE = Path("bench_baseline.json")
+
+# Relative slowdown or memory growth over the baseline that fails the run
+DEFAULT_THRESHOLD = 0.25
+
+# Absolute differences below these are noise, whatever the relative change
+MIN_TIME_DIFF = 0.005  # Seconds
+MIN_MEMORY_DIFF = 1.0  # MB
+
+# Timed runs per operation; operations slower than MAX_REPEAT_TIME run once
+DEFAULT_REPEAT = 3
+MAX_REPEAT_TIME = 2.0
+
+# Distinct known issues stored per model in the history fixture, at most
+MAX_KNOWN_ISSUES = 50
+
+class BenchResult(BaseModel):
+    """Time and peak memory of one operation on one fixture."""
+    operation: str
+    results: int
+    models: int
+    seconds: float
+    peak_mb: float
+
+    @property
+    def key(self) -> str:
+        """Key of the measurement in the baseline."""
+        return f"{self.operation}[{self.results}x{self.models}]"
+
+def _response_pool(size: int = 32) -> List[str]:
+    """Build markdown responses of varied length, with and without headers, lists and code."""
+    pool = []
+    for i in range(size):
+        parts = [f"# Answer {i}"] if i % 2 else []
+        parts += [f"Paragraph {j} of the answer, explaining step {j} in some detail." for j in range(2 + i % 20)]
+        if i % 3:
+            parts += [f"- point {j}" for j in range(i % 7)]
+        if i % 4 == 0:
+            parts.append("```python\ndef solve(x):\n    return x * 2\n```")
+        pool.append("\n\n".join(parts))
+    return pool
+
+@contextmanager
+def synthetic_models(count: int) -> Iterator[List[str]]:
+    """Register synthetic models for the duration of a benchmark."""
+    models = [f"bench:model-{i:03d}" for i in range(count)]
+    for i, model in enumerate(models):
+        MODEL_REGISTRY[model] = {
+            "provider": "bench",
+            "base_name": f"bench-model-{i:03d}",
+            "context_window": 128_000,
+            "capabilities": {"tools": bool(i % 2), "json_mode": True, "system_prompt": True}
+        }
+    try:
+        yield models
+    finally:
+        for model in models:
+            MODEL_REGISTRY.pop(model, None)
+
+def make_results(count: int, models: Sequence[str], seed: int = 0) -> Dict[str, List[TestResult]]:
+    """Generate results spread evenly over models, standard test cases and 30 days.
+
+    Args:
+        count: Number of results
+        models: Models to spread the results over
+        seed: Seed of the generated values
+
+    Returns:
+        Dictionary mapping model names to their results
+    """
+    rng = random.Random(seed)
+    pool = _response_pool()
+    test_cases = [test_case.name for test_case in SCENARIO_TESTS[TestScenario.STANDARD]]
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    all_results: Dict[str, List[TestResult]] = {model: [] for model in models}
+    for i in range(count):
+        model = models[i % len(models)]
+        success = rng.random() > 0.05
+        # Validation is skipped: the values are well-formed and at 1M results it would dominate setup
+        all_results[model].append(TestResult.model_construct(
+            model=model,
+            test_case=test_cases[i % len(test_cases)],
+            route=model,
+            success=success,
+            response=rng.choice(pool) if success else None,
+            error=None if success else f"Error: synthetic failure {i % 17}",
+            duration=rng.lognormvariate(0.5, 0.6),
+            request_tokens=rng.randint(50, 2_000),
+            response_tokens=rng.randint(50, 1_000),
+            timestamp=start + timedelta(seconds=i * 2_592_000 / count)
+        ))
+    return all_results
+
+def make_history(all_results: Dict[str, List[TestResult]]) -> Dict[str, ModelTestHistory]:
+    """Generate the test history matching a set of results."""
+    history = {}
+    for model, results in all_results.items():
+        model_info = get_model_info(model)
+        failures = [r for r in results if not r.success]
+        history[model] = ModelTestHistory(
+            model=model,
+            provider=model_info["provider"],
+            base_name=model_info["base_name"],
+            capabilities=ModelCapabilities(**model_info["capabilities"]),
+            last_success=results[-1].timestamp if results else None,
+            last_failure=failures[-1].timestamp if failures else None,
+            success_count=len(results) - len(failures),
+            failure_count=len(failures),
+            known_issues=sorted({r.error for r in failures})[:MAX_KNOWN_ISSUES],
+            durations={r.test_case: r.duration for r in results},
+            breaker_transitions=[
+                BreakerTransition(breaker=f"model:{model}", from_state="closed", to_state="open",
+                                  reason="3 consecutive failures: synthetic", model=model)
+                for _ in range(min(len(failures), 3))
+            ]
+        )
+    return history
+
+def make_tester(workdir: Path) -> ModelTester:
+    """Create a ModelTester writing to a benchmark directory."""
+    tester = ModelTester(scenario=TestScenario.STANDARD)
+    tester.results_dir = workdir
+    tester.markdown_dir = workdir / "markdown"
+    tester.markdown_dir.mkdir(parents=True, exist_ok=True)
+    tester.history_file = workdir / "test_history.json"
+    tester.artifacts = ArtifactStore(workdir / "artifacts")
+    return tester
+
+def measure(operation: Callable[[], object], repeat: int = DEFAULT_REPEAT) -> Tuple[float, float]:
+    """Measure an operation's time and peak memory.
+
+    Timing runs are not traced, since tracemalloc slows allocation-heavy
+    code several times over; one extra run is traced for the peak.
+
+    Args:
+        operation: The operation to measure
+        repeat: Maximum number of timed runs
+
+    Returns:
+        Tuple of (best time in seconds, peak traced memory in MB)
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        operation()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        if elapsed > MAX_REPEAT_TIME:
+            break
+    gc.collect()
+    tracemalloc.start()
+    try:
+        operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 1e6
+
+def run_case(results: int, models: int, repeat: int = DEFAULT_REPEAT,
+             log: Callable[[str], None] = print) -> List[BenchResult]:
+    """Measure all operations on one fixture.
+
+    Args:
+        results: Number of results in the fixture
+        models: Number of models in the fixture
+        repeat: Maximum number of timed runs per operation
+        log: Called with a line per measured operation
+
+    Returns:
+        One BenchResult per operation
+    """
+    with synthetic_models(models) as model_names, tempfile.TemporaryDirectory() as workdir:
+        tester = make_tester(Path(workdir))
+        all_results = make_results(results, model_names)
+        tester.test_history = make_history(all_results)
+        for model_results in all_results.values():
+            for result in model_results:
+                tester.results.append(result)
+        row_models = [r.model for model_results in all_results.values() for r in model_results]
+        tester._save_history()
+
+        def save_results():
+            for model in model_names:
+                tester.save_results(model)
+
+        def lookup_models():
+            for model in row_models:
+                get_model_info(model)
+
+        operations = {
+            "load_history": tester._load_history,
+            "save_history": tester._save_history,
+            "metrics_table": lambda: tester._generate_metrics_table(tester.results),
+            "speed_ranking": lambda: tester._generate_speed_ranking(tester.results),
+            "save_results": save_results,
+            "get_model_info": lookup_models,
+        }
+        measured = []
+        for name, operation in operations.items():
+            seconds, peak_mb = measure(operation, repeat)
+            measured.append(BenchResult(operation=name, results=results, models=models,
+                                        seconds=seconds, peak_mb=peak_mb))
+            log(f"{measured[-1].key}: {seconds:.4f}s, peak {peak_mb:.1f} MB")
+        return measured
+
+def load_baseline(path: Path) -> Dict[str, BenchResult]:
+    """Load stored measurements by key."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return {key: BenchResult(**data) for key, data in json.load(f)["results"].items()}
+
+def save_baseline(path: Path, measured: Sequence[BenchResult]) -> None:
+    """Store measurements as the baseline, keeping those of fixtures not measured now."""
+    baseline = load_baseline(path)
+    baseline.update({result.key: result for result in measured})
+    with open(path, "w") as f:
+        json.dump({
+            "updated": datetime.now(UTC).isoformat(),
+            "python": sys.version.split()[0],
+            "results": {key: result.model_dump() for key, result in sorted(baseline.items())}
+        }, f, indent=2)
+
+def compare(measured: Sequence[BenchResult], baseline: Dict[str, BenchResult],
+            threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Find measurements that regressed past the threshold.
+
+    Args:
+        measured: Current measurements
+        baseline: Stored measurements by key
+        threshold: Allowed relative growth of time and peak memory
+
+    Returns:
+        A message per regression
+    """
+    regressions = []
+    for result in measured:
+        if (base := baseline.get(result.key)) is None:
+            continue
+        if (result.seconds > base.seconds * (1 + threshold)
+                and result.seconds - base.seconds > MIN_TIME_DIFF):
+            regressions.append(
+                f"{result.key}: {result.seconds:.4f}s vs {base.seconds:.4f}s baseline "
+                f"(+{(result.seconds / base.seconds - 1) * 100:.0f}%)"
+            )
+        if (result.peak_mb > base.peak_mb * (1 + threshold)
+                and result.peak_mb - base.peak_mb > MIN_MEMORY_DIFF):
+            regressions.append(
+                f"{result.key}: peak {result.peak_mb:.1f} MB vs {base.peak_mb:.1f} MB baseline "
+                f"(+{(result.peak_mb / base.peak_mb - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+def generate_table(measured: Sequence[BenchResult], baseline: Dict[str, BenchResult]) -> str:
+    """Generate a markdown table of measurements next to their baseline."""
+    rows = [
+        "| Operation | Results | Models | Time (s) | Peak Memory (MB) | Baseline Time (s) | Baseline Memory (MB) |",
+        "|---|---|---|---|---|---|---|"
+    ]
+    for result in measured:
+        base = baseline.get(result.key)
+        rows.append(
+            f"| {result.operation} | {result.results} | {result.models} | {result.seconds:.4f} | "
+            f"{result.peak_mb:.1f} | {f'{base.seconds:.4f}' if base else '-'} | "
+            f"{f'{base.peak_mb:.1f}' if base else '-'} |"
+        )
+    return "\n".join(rows)
+
+def get_parser() -> argparse.ArgumentParser:
+    """Get the benchmark argument parser."""
+    parser = argparse.ArgumentParser(description="Benchmark reporting and persistence code paths")
+    parser.add_argument(
+        "--case",
+        nargs=2,
+        type=int,
+        action="append",
+        metavar=("RESULTS", "MODELS"),
+        help="Fixture to measure, repeatable (default: 1000 10, 100000 100 and 1000000 500)"
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=DEFAULT_BASELINE,
+        help=f"Baseline file (default: {DEFAULT_BASELINE})"
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store the measurements as the new baseline instead of comparing"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Allowed relative growth of time and memory (default: {DEFAULT_THRESHOLD})"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"Maximum timed runs per operation (default: {DEFAULT_REPEAT})"
+    )
+    return parser
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the benchmarks and compare with or update the baseline.
+
+    Returns:
+        Exit status: 1 if an operation regressed past the threshold
+    """
+    args = get_parser().parse_args(argv)
+    measured = []
+    for results, models in args.case or DEFAULT_CASES:
+        measured += run_case(results, models, args.repeat)
+
+    baseline = load_baseline(args.baseline)
+    print()
+    print(generate_table(measured, baseline))
+    if args.update_baseline or not baseline:
+        save_baseline(args.baseline, measured)
+        print(f"\nBaseline saved to: {args.baseline}")
+        return 0
+
+    regressions = compare(measured, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regressions past {args.threshold * 100:.0f}%:")
+        for regression in regressions:
+            print(f"  • {regression}")
+        return 1
+    print(f"\nNo regressions past {args.threshold * 100:.0f}%")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
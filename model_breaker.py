@@ -0,0 +1,221 @@
+"""
+Circuit breakers for providers and models.
+
+Every request passes a breaker for its provider and one for its model.
+After a number of consecutive failures a breaker opens and the remaining
+requests fail fast as skipped instead of each failing slowly. Once the
+probe interval has passed, a single request is let through as a
+half-open probe: success closes the breaker, failure opens it again for
+another interval.
+"""
+
+import time
+from datetime import datetime, UTC
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# Error prefix of results skipped because a breaker was open
+CIRCUIT_OPEN_ERROR = "Skipped: circuit open"
+
+class BreakerTransition(BaseModel):
+    """A state change of a circuit breaker."""
+    breaker: str  # e.g. "provider:groq" or "model:groq:qwen-2.5-coder-32b"
+    from_state: str
+    to_state: str
+    reason: str
+    model: Optional[str] = None  # Tested model whose request caused the transition
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with half-open probing."""
+
+    def __init__(self, name: str, failure_threshold: int = 3, probe_interval: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the breaker.
+
+        Args:
+            name: Breaker name, used in reports
+            failure_threshold: Consecutive failures that open the breaker
+            probe_interval: Seconds an open breaker waits before letting a probe through
+            clock: Monotonic clock, replaceable in tests
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.fast_failed = 0
+        self.probes = 0
+
+    def can_pass(self) -> bool:
+        """Check whether a request may be sent, without changing state."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return self.clock() - self.opened_at >= self.probe_interval
+        return False  # A half-open probe is already in flight
+
+    def _transition(self, to_state: str, reason: str, model: Optional[str]) -> BreakerTransition:
+        transition = BreakerTransition(
+            breaker=self.name, from_state=self.state, to_state=to_state, reason=reason, model=model
+        )
+        self.state = to_state
+        if to_state == OPEN:
+            self.opened_at = self.clock()
+            self.times_opened += 1
+        return transition
+
+    def on_pass(self, model: Optional[str] = None) -> Optional[BreakerTransition]:
+        """Record a request let through; the first one after the interval is the probe."""
+        if self.state == OPEN:
+            self.probes += 1
+            return self._transition(HALF_OPEN, f"probe after {self.probe_interval:.0f}s", model)
+        return None
+
+    def record(self, success: bool, error: Optional[str] = None, model: Optional[str] = None) -> Optional[BreakerTransition]:
+        """Record the outcome of a request that passed the breaker.
+
+        Args:
+            success: Whether the request succeeded
+            error: Error message of a failed request
+            model: Tested model, for the transition record
+
+        Returns:
+            The transition caused by the outcome, if any
+        """
+        if success:
+            self.consecutive_failures = 0
+            if self.state != CLOSED:
+                return self._transition(CLOSED, "request succeeded", model)
+            return None
+        self.consecutive_failures += 1
+        reason = (error or "failure")[:120]
+        if self.state == HALF_OPEN:
+            return self._transition(OPEN, f"probe failed: {reason}", model)
+        if self.state == CLOSED and self.consecutive_failures >= self.failure_threshold:
+            return self._transition(OPEN, f"{self.consecutive_failures} consecutive failures: {reason}", model)
+        return None
+
+    def cancel_probe(self) -> None:
+        """Return a half-open breaker whose probe was cancelled to open, ready to probe again."""
+        if self.state == HALF_OPEN:
+            self.state = OPEN
+            self.opened_at = self.clock() - self.probe_interval
+
+class CircuitBreakers:
+    """Provider and model breakers of a tester."""
+
+    def __init__(
+        self,
+        provider_threshold: int = 5,
+        model_threshold: int = 3,
+        probe_interval: float = 30.0,
+        on_transition: Optional[Callable[[BreakerTransition], None]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize the breakers.
+
+        Args:
+            provider_threshold: Consecutive failures across a provider's models that open its breaker
+            model_threshold: Consecutive failures of a model that open its breaker
+            probe_interval: Seconds between half-open probes of an open breaker
+            on_transition: Called with every state change
+            clock: Monotonic clock, replaceable in tests
+        """
+        self.provider_threshold = provider_threshold
+        self.model_threshold = model_threshold
+        self.probe_interval = probe_interval
+        self.on_transition = on_transition
+        self.clock = clock
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.transitions: List[BreakerTransition] = []
+
+    def _get(self, name: str, threshold: int) -> CircuitBreaker:
+        if name not in self.breakers:
+            self.breakers[name] = CircuitBreaker(name, threshold, self.probe_interval, self.clock)
+        return self.breakers[name]
+
+    def _pair(self, provider: str, route: str) -> Tuple[CircuitBreaker, CircuitBreaker]:
+        return (
+            self._get(f"provider:{provider}", self.provider_threshold),
+            self._get(f"model:{route}", self.model_threshold)
+        )
+
+    def _emit(self, transition: Optional[BreakerTransition]) -> None:
+        if transition is None:
+            return
+        self.transitions.append(transition)
+        if self.on_transition:
+            self.on_transition(transition)
+
+    def allow(self, provider: str, route: str, model: Optional[str] = None) -> bool:
+        """Check both breakers of a request and let it through if they allow it.
+
+        Args:
+            provider: Provider of the route
+            route: Full model name the request is sent to
+            model: Tested model, for transition records
+
+        Returns:
+            False if the request should fail fast
+        """
+        breakers = self._pair(provider, route)
+        if not all(breaker.can_pass() for breaker in breakers):
+            for breaker in breakers:
+                if breaker.state != CLOSED:
+                    breaker.fast_failed += 1
+            return False
+        for breaker in breakers:
+            self._emit(breaker.on_pass(model))
+        return True
+
+    def record(self, provider: str, route: str, success: bool, error: Optional[str] = None,
+               model: Optional[str] = None) -> None:
+        """Record the outcome of a request let through by allow."""
+        for breaker in self._pair(provider, route):
+            self._emit(breaker.record(success, error, model))
+
+    def cancel(self, provider: str, route: str) -> None:
+        """Record a request cancelled by the run; it is neither a success nor a failure."""
+        for breaker in self._pair(provider, route):
+            breaker.cancel_probe()
+
+    def is_open(self, provider: str, route: str) -> bool:
+        """Check whether a breaker of a request opened, e.g. while it waited for a slot."""
+        return any(breaker.state == OPEN for breaker in self._pair(provider, route))
+
+    def open_breakers(self, provider: str, route: str) -> List[str]:
+        """Get the names of a request's breakers that are not closed."""
+        return [breaker.name for breaker in self._pair(provider, route) if breaker.state != CLOSED]
+
+    def generate_table(self) -> str:
+        """Generate markdown tables of breaker states and transitions."""
+        rows = [
+            "| Breaker | State | Times Opened | Fast-Failed | Probes |",
+            "|---|---|---|---|---|"
+        ]
+        for name, breaker in sorted(self.breakers.items()):
+            if breaker.times_opened or breaker.state != CLOSED:
+                rows.append(
+                    f"| {name} | {breaker.state} | {breaker.times_opened} | "
+                    f"{breaker.fast_failed} | {breaker.probes} |"
+                )
+        rows += [
+            "",
+            "| Time | Breaker | Transition | Reason |",
+            "|---|---|---|---|"
+        ]
+        for t in self.transitions:
+            reason = t.reason.replace("|", "\\|").replace("\n", " ")
+            rows.append(
+                f"| {t.timestamp.strftime('%H:%M:%S')} | {t.breaker} | {t.from_state} → {t.to_state} | {reason} |"
+            )
+        return "\n".join(rows)
@@ -0,0 +1,257 @@
+"""
+Adaptive concurrency control for provider requests.
+
+Each provider gets an AIMD (additive increase, multiplicative decrease)
+limiter: the number of in-flight requests grows slowly while latency and
+error rates stay healthy and is cut back on 429s, timeouts or latency
+spikes. Learned limits are saved between runs as starting points.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import re
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+# Outcome labels passed to AdaptiveLimiter.release
+OK = "ok"
+RATE_LIMITED = "rate_limited"
+TIMEOUT = "timeout"
+SERVER_ERROR = "server_error"
+ERROR = "error"
+CANCELLED = "cancelled"  # Request cancelled by the run, not by the provider
+
+# Outcomes worth retrying elsewhere; other errors are deterministic
+TRANSIENT_OUTCOMES = (RATE_LIMITED, TIMEOUT, SERVER_ERROR)
+
+# HTTP status codes count only where the message reports a status, e.g.
+# "status_code: 503" or "Error code: 500", not in token counts or parameters
+_STATUS_CODE = re.compile(r"\b(?:status(?:[ _]?code)?|error code|http(?:/[\d.]+)?)\W{0,3}(\d{3})\b")
+
+_SERVER_ERROR_STATUSES = {"500", "502", "503", "504", "529"}
+
+_SERVER_ERROR_MARKERS = (
+    "internal server error", "bad gateway", "service unavailable", "overloaded"
+)
+
+def classify_error(error: Optional[str]) -> str:
+    """Classify an error message into a limiter outcome.
+
+    Args:
+        error: Error message, or None for a successful request
+
+    Returns:
+        One of OK, RATE_LIMITED, TIMEOUT, SERVER_ERROR or ERROR
+    """
+    if not error:
+        return OK
+    text = error.lower()
+    statuses = set(_STATUS_CODE.findall(text))
+    if "429" in statuses or "rate limit" in text or "rate_limit" in text or "too many requests" in text:
+        return RATE_LIMITED
+    if "timeout" in text or "timed out" in text:
+        return TIMEOUT
+    if statuses & _SERVER_ERROR_STATUSES or any(marker in text for marker in _SERVER_ERROR_MARKERS):
+        return SERVER_ERROR
+    return ERROR
+
+class AdaptiveLimiter:
+    """AIMD concurrency limiter for a single provider."""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 64,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+        ewma_alpha: float = 0.2
+    ):
+        """Initialize the limiter.
+
+        Args:
+            name: Provider name, used in reports
+            initial_limit: Starting number of in-flight requests
+            min_limit: Lower bound for the limit
+            max_limit: Upper bound for the limit
+            increase: Additive increase per limit's worth of healthy completions
+            decrease: Multiplicative factor applied on overload
+            latency_tolerance: Latencies above this multiple of the baseline count as spikes
+            ewma_alpha: Smoothing factor for the latency baselines
+        """
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = min(max(initial_limit, min_limit), max_limit)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.ewma_alpha = ewma_alpha
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.baselines: Dict[str, float] = {}  # Latency EWMA per request kind
+        self.stats = {
+            OK: 0, RATE_LIMITED: 0, TIMEOUT: 0, SERVER_ERROR: 0, ERROR: 0, CANCELLED: 0,
+            "latency_spikes": 0, "decreases": 0
+        }
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+        self._waiting: list = []  # Heap of (-priority, arrival) tickets
+        self._arrivals = itertools.count()
+
+    async def acquire(self, priority: float = 0.0) -> None:
+        """Wait until a request slot is available.
+
+        Slots go to waiting requests highest priority first, then in arrival
+        order. Requests arriving in the same event loop iteration are ordered
+        by priority too.
+
+        Args:
+            priority: Start priority (e.g. the estimated duration, for longest-first ordering)
+        """
+        ticket = (-priority, next(self._arrivals))
+        heapq.heappush(self._waiting, ticket)
+        try:
+            # Let requests started in the same iteration enqueue before slots are granted
+            await asyncio.sleep(0)
+            async with self._condition:
+                await self._condition.wait_for(
+                    lambda: self.in_flight < int(self.limit) and self._waiting[0] == ticket
+                )
+                heapq.heappop(self._waiting)
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                self._condition.notify_all()
+        except BaseException:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                # The next waiter may be able to go now
+                asyncio.get_running_loop().create_task(self._notify())
+            raise
+
+    async def _notify(self) -> None:
+        async with self._condition:
+            self._condition.notify_all()
+
+    async def release(self, latency: float, outcome: str = OK, key: str = "default") -> None:
+        """Release a slot and adapt the limit.
+
+        Args:
+            latency: Request duration in seconds
+            outcome: One of OK, RATE_LIMITED, TIMEOUT, SERVER_ERROR, ERROR or CANCELLED
+            key: Request kind (e.g. "<model>:<test case>"); latency baselines are kept per kind
+        """
+        async with self._condition:
+            self.in_flight -= 1
+            self.stats[outcome] += 1
+
+            overloaded = outcome in (RATE_LIMITED, TIMEOUT)
+            if outcome == OK:
+                baseline = self.baselines.get(key)
+                if baseline is not None and latency > baseline * self.latency_tolerance:
+                    self.stats["latency_spikes"] += 1
+                    overloaded = True
+                # Spikes are folded in too, so a lasting shift becomes the new baseline
+                self.baselines[key] = latency if baseline is None else (
+                    self.ewma_alpha * latency + (1 - self.ewma_alpha) * baseline
+                )
+
+            if overloaded:
+                self._on_overload(latency)
+            elif outcome == OK:
+                # Grow by `increase` once every `limit` healthy completions
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+
+            self._condition.notify_all()
+
+    def _on_overload(self, latency: float) -> None:
+        # Cut at most once per request round-trip so one burst of failures
+        # doesn't collapse the limit to the floor
+        now = time.monotonic()
+        if now - self._last_decrease < latency:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self.stats["decreases"] += 1
+
+    def state(self) -> Dict[str, float]:
+        """Get a snapshot of the limiter state."""
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            **self.stats
+        }
+
+class ConcurrencyController:
+    """Per-provider adaptive limiters with persisted learned limits."""
+
+    def __init__(self, state_file: Optional[Path] = None, default_limit: float = 4, **limiter_kwargs):
+        """Initialize the controller.
+
+        Args:
+            state_file: JSON file holding learned limits from earlier runs
+            default_limit: Starting limit for providers without a learned limit
+            **limiter_kwargs: Extra arguments for every AdaptiveLimiter
+        """
+        self.state_file = state_file
+        self.default_limit = default_limit
+        self.limiter_kwargs = limiter_kwargs
+        self.limiters: Dict[str, AdaptiveLimiter] = {}
+        self.learned_limits: Dict[str, float] = self._load()
+
+    def _load(self) -> Dict[str, float]:
+        if not self.state_file or not self.state_file.exists():
+            return {}
+        try:
+            with open(self.state_file) as f:
+                return {provider: float(limit) for provider, limit in json.load(f).items()}
+        except Exception as e:
+            print(f"Warning: Could not load concurrency limits: {str(e)}")
+            return {}
+
+    def save(self) -> None:
+        """Save the current limits as starting points for the next run."""
+        if not self.state_file:
+            return
+        limits = {**self.learned_limits, **{p: round(l.limit, 2) for p, l in self.limiters.items()}}
+        with open(self.state_file, "w") as f:
+            json.dump(limits, f, indent=2)
+
+    def get(self, provider: str) -> AdaptiveLimiter:
+        """Get (or create) the limiter for a provider."""
+        if provider not in self.limiters:
+            self.limiters[provider] = AdaptiveLimiter(
+                provider,
+                initial_limit=self.learned_limits.get(provider, self.default_limit),
+                **self.limiter_kwargs
+            )
+        return self.limiters[provider]
+
+    def generate_state_table(self) -> str:
+        """Generate a markdown table of the limiter states."""
+        headers = ["Provider", "Limit", "Peak In-Flight", "OK", "429s", "Timeouts", "5xx", "Errors", "Latency Spikes", "Decreases"]
+        rows = ["| " + " | ".join(headers) + " |", "|" + "|".join("---" for _ in headers) + "|"]
+        for provider, limiter in sorted(self.limiters.items()):
+            state = limiter.state()
+            row = [
+                provider,
+                f"{state['limit']:.2f}",
+                str(state["peak_in_flight"]),
+                str(state[OK]),
+                str(state[RATE_LIMITED]),
+                str(state[TIMEOUT]),
+                str(state[SERVER_ERROR]),
+                str(state[ERROR]),
+                str(state["latency_spikes"]),
+                str(state["decreases"])
+            ]
+            rows.append("| " + " | ".join(row) + " |")
+        return "\n".join(rows)
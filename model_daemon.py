@@ -0,0 +1,248 @@
+"""
+Long-running test daemon with warm agents and a local job API.
+
+Every `python model_test.py --run-tests` pays interpreter startup,
+imports, logfire and .env setup, history parsing and agent and
+connection setup again. The daemon keeps one ModelTester, with its
+agents, connection pools, learned concurrency limits, routes and circuit
+breakers, alive between runs and accepts jobs over a localhost HTTP API:
+
+    POST /jobs    Submit a job; results stream back as NDJSON as they complete
+    GET  /status  Uptime, queued and completed jobs, warm agents
+
+A job is a JSON object, all fields optional:
+
+    {"models": ["groq:qwen-2.5-coder-32b"], "providers": ["groq"],
+     "scenarios": ["standard", "structured"], "test_cases": ["basic_response"],
+     "max_wall_time": 120, "check_code": false}
+
+Jobs run one at a time, in submission order, since a run's results,
+progress and schedule belong to the tester. Each streamed line is an
+event: "queued", "started", one "result" per finished test case, then
+"done" with the summary path, or "error". A job keeps running when its
+client disconnects; its results are saved like those of any run.
+
+Start it with `python model_daemon.py` and submit jobs with any HTTP
+client, e.g. curl (see the README).
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from aiohttp import web
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+from model_test import SCENARIO_TESTS, ModelTester, resolve_scenarios
+from model_utils import MODEL_REGISTRY
+
+DEFAULT_PORT = 8780
+
+class DaemonJob(BaseModel):
+    """A test run submitted to the daemon."""
+    model_config = ConfigDict(extra="forbid")
+
+    models: Optional[List[str]] = None  # Default: latest model of each base model
+    providers: Optional[List[str]] = None  # Default: all available providers
+    scenarios: List[str] = ["standard"]  # Scenario names, or "all"
+    test_cases: Optional[List[str]] = None  # Only these test cases of the scenarios
+    max_wall_time: Optional[float] = None
+    check_code: bool = False
+
+def validate_job(job: DaemonJob) -> None:
+    """Check a job's names before it is queued.
+
+    Raises:
+        ValueError: If a model, scenario or test case does not exist
+    """
+    unknown = [model for model in job.models or [] if model not in MODEL_REGISTRY]
+    if unknown:
+        raise ValueError(f"Unknown models: {', '.join(unknown)}")
+    scenarios = resolve_scenarios(job.scenarios)
+    names = {tc.name for scenario in scenarios for tc in SCENARIO_TESTS[scenario]}
+    unknown = [name for name in job.test_cases or [] if name not in names]
+    if unknown:
+        raise ValueError(f"Test cases not in the job's scenarios: {', '.join(unknown)}")
+
+def result_event(job_id: int, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the stream event of a finished test case from its result record (see ResultBuffer.to_records).
+
+    The record leaves out the response text, which stays in the artifact store.
+    """
+    return {"event": "result", "job": job_id, **record}
+
+class ModelTestDaemon:
+    """Runs submitted jobs on one warm ModelTester."""
+
+    def __init__(self, tester: ModelTester, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        """Initialize the daemon.
+
+        Args:
+            tester: Tester whose agents and state are reused across jobs
+            host: Interface to listen on; keep it local, jobs spend provider quota
+            port: Port to listen on (0: any free port)
+        """
+        self.tester = tester
+        self.host = host
+        self.port = port
+        self._runner: Optional[web.AppRunner] = None
+        self._jobs: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        self._ids = itertools.count(1)
+        self._started = time.monotonic()
+        # Statistics
+        self.queued = 0
+        self.running: Optional[int] = None
+        self.completed = 0
+        self.failed = 0
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running daemon."""
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """Start listening; with port 0 the chosen port is stored in self.port."""
+        self._started = time.monotonic()
+        app = web.Application()
+        app.router.add_post("/jobs", self._handle_job)
+        app.router.add_get("/status", self._handle_status)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self) -> None:
+        """Stop listening, cancel running jobs and close connections."""
+        if self._runner is not None:
+            # Cancelled jobs end their event streams, so open responses finish
+            for task in self._jobs:
+                task.cancel()
+            await asyncio.gather(*self._jobs, return_exceptions=True)
+            await self._runner.cleanup()
+            self._runner = None
+
+    def status(self) -> Dict[str, Any]:
+        """Get the daemon's state."""
+        return {
+            "uptime": round(time.monotonic() - self._started, 1),
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "warm_agents": len(self.tester.agents),
+            "available_providers": sorted(self.tester.available_providers),
+        }
+
+    async def run_job(self, job_id: int, job: DaemonJob, events: asyncio.Queue) -> None:
+        """Run a job after the jobs submitted before it, putting its events on a queue.
+
+        The queue ends with None.
+        """
+        self.queued += 1
+        events.put_nowait({"event": "queued", "job": job_id, "position": self.queued + (self.running is not None) - 1})
+        try:
+            async with self._lock:
+                self.queued -= 1
+                self.running = job_id
+                events.put_nowait({"event": "started", "job": job_id})
+                await self._run(job_id, job, events)
+        finally:
+            if self.running == job_id:
+                self.running = None
+            events.put_nowait(None)
+
+    async def _run(self, job_id: int, job: DaemonJob, events: asyncio.Queue) -> None:
+        tester = self.tester
+        providers = tester.available_providers
+        if job.providers:
+            tester.available_providers = providers & set(job.providers)
+        tester.set_scenarios(job.scenarios)
+        if job.test_cases:
+            tester.test_cases = [tc for tc in tester.test_cases if tc.name in job.test_cases]
+        tester.on_result = lambda record: events.put_nowait(result_event(job_id, record))
+        start = time.perf_counter()
+        try:
+            summary = await tester.run_all_tests(
+                max_wall_time=job.max_wall_time,
+                check_code=job.check_code,
+                models=job.models
+            )
+        except Exception as e:
+            self.failed += 1
+            events.put_nowait({"event": "error", "job": job_id, "error": str(e)})
+            return
+        finally:
+            tester.on_result = None
+            tester.available_providers = providers
+        self.completed += 1
+        finished = [r for r in tester.results.to_records() if not r["skipped"]] if summary else []
+        events.put_nowait({
+            "event": "done",
+            "job": job_id,
+            "run": tester.run_id if summary else None,
+            "results": len(finished),
+            "passed": sum(1 for r in finished if r["success"]),
+            "duration": round(time.perf_counter() - start, 3),
+            "timed_out": tester.timed_out if summary else False,
+            "summary": summary,
+        })
+
+    async def _handle_status(self, request: web.Request) -> web.Response:
+        return web.json_response(self.status())
+
+    async def _handle_job(self, request: web.Request) -> web.StreamResponse:
+        try:
+            job = DaemonJob.model_validate_json(await request.read() or b"{}")
+            validate_job(job)
+        except (ValidationError, ValueError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+        # The job outlives its request, so a disconnect does not cancel it
+        events: asyncio.Queue = asyncio.Queue()
+        job_task = asyncio.create_task(self.run_job(next(self._ids), job, events))
+        self._jobs.add(job_task)
+        job_task.add_done_callback(self._jobs.discard)
+        return await self._stream(request, events)
+
+    async def _stream(self, request: web.Request, events: asyncio.Queue) -> web.StreamResponse:
+        """Stream events as NDJSON with chunked transfer encoding until the queue ends."""
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson", "Cache-Control": "no-cache"})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        try:
+            while (event := await events.get()) is not None:
+                await response.write((json.dumps(event) + "\n").encode())
+            await response.write_eof()
+        except ConnectionResetError:
+            pass  # The client went away; its job keeps running
+        return response
+
+async def serve(host: str, port: int, providers: Optional[List[str]]) -> None:
+    """Run the daemon until interrupted."""
+    tester = ModelTester()
+    if providers:
+        tester.available_providers = {p for p in providers if p in tester.available_providers}
+    daemon = ModelTestDaemon(tester, host=host, port=port)
+    await daemon.start()
+    print(f"Test daemon listening on {daemon.url} (providers: {', '.join(sorted(tester.available_providers)) or 'none'})")
+    print(f"Submit jobs with: curl -N -d '{{\"scenarios\": [\"standard\"]}}' {daemon.url}/jobs")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await daemon.stop()
+        await tester.writer.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test daemon with warm agents and a local job API")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--providers", nargs="+", help="Providers jobs may use (default: all available)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.providers))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,193 @@
+"""
+Columnar export of saved test results for external analytics.
+
+Rows are written under Hive-style partition directories
+(date=YYYY-MM-DD/provider=<name>/), one file per saved results file and
+partition, so tools can prune partitions and read only the columns they
+need. Parquet is used when pyarrow is installed; otherwise every file is a
+NumPy .npz archive holding one array per column.
+
+Exports are incremental: a manifest records which results files have been
+exported and only new ones are written on the next export.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from model_metrics import column, key_codes
+from model_results import ResultBuffer
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency, .npz files are written when missing
+    pa = pq = None
+
+# Columns stored in every file; date and provider are partition keys
+EXPORT_COLUMNS = (
+    "model", "test_case", "route", "run", "timestamp", "success", "skipped", "error",
+    "duration", "generation_time", "validation_time", "retries",
+    "request_tokens", "response_tokens", "cached_tokens", "ttft", "loop_lag",
+    "tool_calls", "model_turns", "code_passed", "code_total", "code_time",
+    "response_length", "response_hash"
+)
+
+def _strings(table: Sequence[str], ids: np.ndarray) -> List[Optional[str]]:
+    """Resolve interned string ids, with None for negative ids."""
+    return [table[i] if i >= 0 else None for i in ids.tolist()]
+
+def result_columns(buffer: ResultBuffer, rows: np.ndarray) -> Dict[str, np.ndarray]:
+    """Get export columns for a set of rows.
+
+    Missing values are None in string columns, NaN in float columns and -1
+    in token, tool-use and code check count columns.
+
+    Args:
+        buffer: The results
+        rows: Row indices to include
+
+    Returns:
+        Dict of column name to NumPy array
+    """
+    durations = column(buffer.durations)[rows]
+    validation_times = column(buffer.validation_times)[rows]
+    return {
+        "model": np.array(_strings(buffer.models.values, column(buffer.model_ids)[rows].astype(np.int64)), dtype=object),
+        "test_case": np.array(_strings(buffer.test_cases.values, column(buffer.test_case_ids)[rows].astype(np.int64)), dtype=object),
+        "route": np.array(_strings(buffer.routes.values, column(buffer.route_ids)[rows]), dtype=object),
+        "run": np.array(_strings(buffer.runs.values, column(buffer.run_ids)[rows]), dtype=object),
+        "timestamp": (column(buffer.timestamps)[rows] * 1e6).astype("datetime64[us]"),
+        "success": column(buffer.success)[rows].astype(bool),
+        "skipped": column(buffer.skipped)[rows].astype(bool),
+        "error": np.array([buffer.errors[i] for i in rows.tolist()], dtype=object),
+        "duration": durations,
+        # Estimated time spent generating: duration minus the structured result re-validation time
+        "generation_time": durations - np.nan_to_num(validation_times),
+        "validation_time": validation_times,
+        "retries": column(buffer.retries)[rows].astype(np.int32),
+        "request_tokens": column(buffer.request_tokens)[rows],
+        "response_tokens": column(buffer.response_tokens)[rows],
+        "cached_tokens": column(buffer.cached_tokens)[rows],
+        "ttft": column(buffer.ttfts)[rows],
+        "loop_lag": column(buffer.loop_lags)[rows],
+        "tool_calls": column(buffer.tool_calls)[rows],
+        "model_turns": column(buffer.model_turns)[rows],
+        "code_passed": column(buffer.code_passed)[rows],
+        "code_total": column(buffer.code_total)[rows],
+        "code_time": column(buffer.code_times)[rows],
+        "response_length": column(buffer.response_lengths)[rows].astype(np.int64),
+        "response_hash": np.array([buffer.response_hashes[i] for i in rows.tolist()], dtype=object),
+    }
+
+class ResultExporter:
+    """Incremental, partitioned columnar export."""
+
+    def __init__(self, root: Path, fmt: Optional[str] = None):
+        """Initialize the exporter.
+
+        Args:
+            root: Export directory
+            fmt: 'parquet' or 'npz' (default: parquet when pyarrow is installed, otherwise npz)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        if fmt is None:
+            fmt = "parquet" if pa is not None else "npz"
+        if fmt == "parquet" and pa is None:
+            raise ValueError("parquet export requires the pyarrow package")
+        if fmt not in ("parquet", "npz"):
+            raise ValueError(f"Unknown export format: {fmt}")
+        self.fmt = fmt
+        self.manifest_file = self.root / "_manifest.json"
+        self.exported: List[str] = []
+        if self.manifest_file.exists():
+            with open(self.manifest_file) as f:
+                self.exported = json.load(f)["exported"]
+
+    def save_manifest(self) -> None:
+        """Persist the list of exported results files."""
+        with open(self.manifest_file, "w") as f:
+            json.dump({"format": self.fmt, "exported": self.exported}, f, indent=2)
+
+    def _write(self, path: Path, columns: Dict[str, np.ndarray]) -> None:
+        if self.fmt == "npz":
+            # Fixed-width unicode keeps the archive loadable without pickle
+            arrays = {
+                name: np.array(["" if v is None else v for v in values], dtype=str) if values.dtype == object else values
+                for name, values in columns.items()
+            }
+            np.savez_compressed(path, **arrays)
+            return
+        arrays = {}
+        for name, values in columns.items():
+            if values.dtype == object:
+                arrays[name] = pa.array(values.tolist(), type=pa.string())
+            elif name in ("request_tokens", "response_tokens", "cached_tokens", "tool_calls", "model_turns", "code_passed", "code_total"):
+                arrays[name] = pa.array(values, mask=values < 0)
+            elif name == "timestamp":
+                arrays[name] = pa.array(values.astype(np.int64), type=pa.timestamp("us", tz="UTC"))
+            else:
+                arrays[name] = pa.array(values, from_pandas=True)  # NaN becomes null
+        pq.write_table(pa.table(arrays), path, compression="zstd")
+
+    def export_buffer(self, buffer: ResultBuffer, name: str) -> List[Path]:
+        """Write the rows of a buffer, one file per date and provider partition.
+
+        Args:
+            buffer: The results to export
+            name: Base name of the written files, unique per source
+
+        Returns:
+            Paths of the written files
+        """
+        if not len(buffer):
+            return []
+        day_codes, days = key_codes(buffer, "day")
+        provider_codes, providers = key_codes(buffer, "provider")
+        partition_ids = day_codes * len(providers) + provider_codes
+
+        suffix = ".parquet" if self.fmt == "parquet" else ".npz"
+        safe_name = name.replace(":", "_").replace("/", "_")
+        written = []
+        for partition in np.unique(partition_ids):
+            rows = np.flatnonzero(partition_ids == partition)
+            day, provider = divmod(int(partition), len(providers))
+            directory = self.root / f"date={days[day]}" / f"provider={providers[provider]}"
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"{safe_name}{suffix}"
+            self._write(path, result_columns(buffer, rows))
+            written.append(path)
+        return written
+
+def read_export(root: Path, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """Read an export back as NumPy columns, including the partition keys.
+
+    Args:
+        root: Export directory
+        columns: Columns to load (default: all)
+
+    Returns:
+        Dict of column name to the concatenated values of all files
+    """
+    names = list(columns or EXPORT_COLUMNS)
+    parts: Dict[str, List[np.ndarray]] = {name: [] for name in ["date", "provider", *names]}
+    for path in sorted(Path(root).glob("date=*/provider=*/*")):
+        if path.suffix == ".npz":
+            with np.load(path) as data:
+                loaded = {name: data[name] for name in names}
+        elif path.suffix == ".parquet":
+            if pq is None:
+                raise ValueError("Reading parquet exports requires the pyarrow package")
+            table = pq.read_table(path, columns=names)
+            loaded = {name: table.column(name).to_numpy(zero_copy_only=False) for name in names}
+        else:
+            continue
+        count = len(next(iter(loaded.values()))) if loaded else 0
+        parts["date"].append(np.full(count, path.parent.parent.name.split("=", 1)[1]))
+        parts["provider"].append(np.full(count, path.parent.name.split("=", 1)[1]))
+        for name, values in loaded.items():
+            parts[name].append(values)
+    return {name: np.concatenate(values) if values else np.empty(0) for name, values in parts.items()}
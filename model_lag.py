@@ -0,0 +1,145 @@
+"""
+Event loop lag monitor.
+
+Request durations are wall-clock times measured on the event loop that
+also parses responses, validates results and runs the harness's
+bookkeeping. While a callback blocks the loop, every other in-flight
+request's timer keeps running, so its measured latency includes time the
+provider was not responsible for.
+
+The monitor sleeps for a fixed interval in a background task and records
+how late it wakes up: the scheduling delay of the loop. Requests register
+while in flight and are annotated with the largest lag seen during their
+lifetime; results whose lag is large, both absolutely and relative to
+their duration, are unreliable.
+"""
+
+import asyncio
+import itertools
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Seconds between lag samples
+DEFAULT_INTERVAL = 0.02
+
+# Upper bounds of the lag histogram buckets in seconds; the last bucket is open
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+# A result is unreliable when the loop lagged at least this long while it was in flight...
+UNRELIABLE_LAG = 0.05
+# ...and the lag is at least this share of its duration
+UNRELIABLE_FRACTION = 0.1
+
+def is_unreliable(loop_lag: Optional[float], duration: float) -> bool:
+    """Check whether a duration was measured under heavy loop lag."""
+    if loop_lag is None:
+        return False
+    return loop_lag >= UNRELIABLE_LAG and loop_lag >= UNRELIABLE_FRACTION * duration
+
+class LoopLagMonitor:
+    """Samples event loop scheduling delay and tracks the worst lag per in-flight request."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between samples; shorter intervals catch shorter stalls
+        """
+        self.interval = interval
+        self.samples: List[float] = []
+        self.histogram = [0] * (len(LAG_BUCKETS) + 1)
+        self._in_flight: Dict[int, float] = {}
+        self._ids = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+        self._next_wakeup: Optional[float] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the monitor is sampling."""
+        return self._task is not None
+
+    def start(self) -> None:
+        """Start sampling on the running event loop, clearing earlier samples."""
+        if self._task is None:
+            self.samples = []
+            self.histogram = [0] * (len(LAG_BUCKETS) + 1)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._next_wakeup = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._next_wakeup = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self._record(max(loop.time() - self._next_wakeup, 0.0))
+
+    def _record(self, lag: float) -> None:
+        self.samples.append(lag)
+        self.histogram[int(np.searchsorted(LAG_BUCKETS, lag, side="left"))] += 1
+        for request, worst in self._in_flight.items():
+            if lag > worst:
+                self._in_flight[request] = lag
+
+    def _pending_lag(self) -> float:
+        """Lag of the sample that is due but has not run yet, e.g. while the loop is blocked."""
+        if self._next_wakeup is None:
+            return 0.0
+        return max(asyncio.get_running_loop().time() - self._next_wakeup, 0.0)
+
+    def begin(self) -> Optional[int]:
+        """Register an in-flight request.
+
+        Returns:
+            Token for end, or None when the monitor is not running
+        """
+        if not self.running:
+            return None
+        token = next(self._ids)
+        self._in_flight[token] = 0.0
+        return token
+
+    def end(self, token: Optional[int]) -> Optional[float]:
+        """Unregister a request.
+
+        Args:
+            token: Token returned by begin
+
+        Returns:
+            Largest loop lag in seconds while the request was in flight, or None if not monitored
+        """
+        if token is None:
+            return None
+        worst = self._in_flight.pop(token, 0.0)
+        return max(worst, self._pending_lag())
+
+    def generate_table(self) -> str:
+        """Generate markdown tables of the lag distribution and histogram."""
+        if not self.samples:
+            return "No loop lag samples"
+        samples = np.array(self.samples) * 1000
+        rows = [
+            "| Samples | Interval (ms) | P50 (ms) | P99 (ms) | Max (ms) | Total Lag (s) |",
+            "|---|---|---|---|---|---|",
+            f"| {len(samples)} | {self.interval * 1000:.0f} | {np.percentile(samples, 50):.2f} | "
+            f"{np.percentile(samples, 99):.2f} | {samples.max():.2f} | {samples.sum() / 1000:.2f} |",
+            "",
+            "| Lag | Samples |",
+            "|---|---|"
+        ]
+        lower = 0.0
+        for upper, count in zip((*LAG_BUCKETS, None), self.histogram):
+            label = f"≥ {lower * 1000:g} ms" if upper is None else f"{lower * 1000:g}–{upper * 1000:g} ms"
+            rows.append(f"| {label} | {count} |")
+            lower = upper
+        return "\n".join(rows)
@@ -0,0 +1,221 @@
+"""
+Long-context latency benchmark and fitted latency model per model.
+
+Synthetic prompts of increasing input size, capped by each model's
+context window, are streamed to measure time to first token (prefill) and
+total latency. A latency model is fitted from the samples:
+
+    ttft     = overhead + prefill * input [+ prefill_above * (input - breakpoint) above the breakpoint]
+    duration = ttft + decode * output tokens
+
+The piecewise term is only used when it explains the samples much better
+than a single line (e.g. when a provider switches hardware or batching for
+long prompts). Fitted models are stored in the model's MODEL_REGISTRY
+entry under "latency_model" and persisted to a JSON file, so the scheduler
+and capacity planning can predict request latency.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from model_utils import MODEL_REGISTRY
+
+# Input sizes in tokens, from 1k to 128k
+BENCHMARK_SIZES = (1_000, 2_000, 4_000, 8_000, 16_000, 32_000, 64_000, 128_000)
+
+# Context window assumed for registry entries without one
+DEFAULT_CONTEXT_WINDOW = 32_000
+
+# Tokens kept free in the context window for the instructions and the answer
+OUTPUT_HEADROOM = 1_000
+
+# Rough size of a token of English text and numbers, used when usage is not reported
+CHARS_PER_TOKEN = 4
+
+# Output size assumed when predicting the latency of a request
+DEFAULT_OUTPUT_TOKENS = 500
+
+# Minimum SSE reduction for the piecewise fit to be used instead of a line
+PIECEWISE_MIN_GAIN = 0.5
+
+BENCHMARK_SYSTEM_PROMPT = "You are a data assistant. Answer exactly as asked, without commentary."
+
+BENCHMARK_QUESTION = "\nList the values of the last 20 records, one per line, in order."
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text."""
+    return len(text) // CHARS_PER_TOKEN
+
+def benchmark_sizes(context_window: int, sizes: Sequence[int] = BENCHMARK_SIZES) -> List[int]:
+    """Get the benchmark input sizes that fit a model's context window."""
+    return [size for size in sizes if size + OUTPUT_HEADROOM <= context_window]
+
+def build_prompt(tokens: int, nonce: str = "") -> str:
+    """Build a synthetic prompt of roughly the given number of input tokens.
+
+    The prompt starts with the nonce, so prompts of different sizes or runs
+    share no prefix that a provider's prompt cache could serve.
+
+    Args:
+        tokens: Target input size in tokens
+        nonce: Unique text placed at the start of the prompt
+
+    Returns:
+        Prompt made of numbered sensor records followed by a question
+    """
+    target_chars = tokens * CHARS_PER_TOKEN - len(BENCHMARK_QUESTION)
+    lines = [f"Benchmark {nonce} ({tokens} tokens). Sensor records:"]
+    size = len(lines[0])
+    i = 0
+    while size < target_chars:
+        line = f"Record {i:06d}: sensor {i % 97:02d} reported value {(i * 7919) % 10007}."
+        lines.append(line)
+        size += len(line) + 1
+        i += 1
+    return "\n".join(lines) + BENCHMARK_QUESTION
+
+class LatencySample(BaseModel):
+    """Latency of one benchmark request."""
+    target_tokens: int
+    input_tokens: int
+    output_tokens: int
+    ttft: float
+    duration: float
+
+class LatencyModel(BaseModel):
+    """Fitted prefill and decode cost of a model."""
+    overhead: float  # Seconds before prefill, e.g. network and queueing
+    prefill_per_1k: float  # Seconds per 1k input tokens
+    breakpoint: Optional[int] = None  # Input tokens above which prefill_above_per_1k is added
+    prefill_above_per_1k: float = 0.0  # Extra seconds per 1k input tokens above the breakpoint
+    decode_per_token: float  # Seconds per output token
+    samples: int
+
+    def ttft(self, input_tokens: int) -> float:
+        """Predict the time to first token of a request."""
+        ttft = self.overhead + self.prefill_per_1k * input_tokens / 1000
+        if self.breakpoint is not None and input_tokens > self.breakpoint:
+            ttft += self.prefill_above_per_1k * (input_tokens - self.breakpoint) / 1000
+        return max(ttft, 0.0)
+
+    def predict(self, input_tokens: int, output_tokens: int = DEFAULT_OUTPUT_TOKENS) -> float:
+        """Predict the total latency of a request."""
+        return self.ttft(input_tokens) + max(self.decode_per_token, 0.0) * output_tokens
+
+def _least_squares(design: np.ndarray, y: np.ndarray) -> tuple:
+    coefficients = np.linalg.lstsq(design, y, rcond=None)[0]
+    residuals = y - design @ coefficients
+    return coefficients, float(residuals @ residuals)
+
+def fit_latency_model(samples: Sequence[LatencySample]) -> LatencyModel:
+    """Fit a latency model to benchmark samples.
+
+    Prefill is fitted on TTFT as a line over input size, or as a continuous
+    two-segment line when one of the interior sample sizes makes a much
+    better breakpoint. Decode is the median time per output token after
+    the first token arrived.
+
+    Args:
+        samples: At least two samples with different input sizes
+
+    Returns:
+        The fitted LatencyModel
+
+    Raises:
+        ValueError: If the samples cannot determine a line
+    """
+    x = np.array([s.input_tokens for s in samples], dtype=float) / 1000
+    y = np.array([s.ttft for s in samples])
+    if len(np.unique(x)) < 2:
+        raise ValueError("Fitting a latency model needs samples of at least two input sizes")
+
+    (overhead, prefill), best_sse = _least_squares(np.column_stack([np.ones_like(x), x]), y)
+    breakpoint, prefill_above = None, 0.0
+    # Candidate breakpoints leave at least two samples on the steeper segment
+    sizes = np.unique(x)
+    for knot in sizes[1:-2] if len(sizes) >= 4 else []:
+        design = np.column_stack([np.ones_like(x), x, np.maximum(x - knot, 0.0)])
+        coefficients, sse = _least_squares(design, y)
+        if sse < best_sse * PIECEWISE_MIN_GAIN:
+            (overhead, prefill, prefill_above), best_sse = coefficients, sse
+            breakpoint = int(round(knot * 1000))
+
+    per_token = [(s.duration - s.ttft) / s.output_tokens for s in samples if s.output_tokens > 0]
+    return LatencyModel(
+        overhead=float(overhead),
+        prefill_per_1k=float(prefill),
+        breakpoint=breakpoint,
+        prefill_above_per_1k=float(prefill_above),
+        decode_per_token=float(np.median(per_token)) if per_token else 0.0,
+        samples=len(samples)
+    )
+
+def register_latency_model(model: str, latency_model: LatencyModel) -> None:
+    """Store a fitted latency model in the model's registry entry."""
+    if model in MODEL_REGISTRY:
+        MODEL_REGISTRY[model]["latency_model"] = latency_model.model_dump()
+
+def get_latency_model(model: str) -> Optional[LatencyModel]:
+    """Get the latency model stored in the registry, if the model was benchmarked."""
+    data = MODEL_REGISTRY.get(model, {}).get("latency_model")
+    return LatencyModel(**data) if data else None
+
+def predict_latency(model: str, input_tokens: int, output_tokens: int = DEFAULT_OUTPUT_TOKENS) -> Optional[float]:
+    """Predict a request's latency from the model's registry entry, if benchmarked."""
+    latency_model = get_latency_model(model)
+    return latency_model.predict(input_tokens, output_tokens) if latency_model else None
+
+def load_latency_models(path: Path) -> Dict[str, LatencyModel]:
+    """Load persisted latency models and store them in the registry."""
+    path = Path(path)
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        models = {model: LatencyModel(**data) for model, data in json.load(f).items()}
+    for model, latency_model in models.items():
+        register_latency_model(model, latency_model)
+    return models
+
+def save_latency_models(path: Path, models: Dict[str, LatencyModel]) -> None:
+    """Persist latency models, keeping those of models not in this benchmark."""
+    path = Path(path)
+    data = {}
+    if path.exists():
+        with open(path) as f:
+            data = json.load(f)
+    data.update({model: latency_model.model_dump() for model, latency_model in models.items()})
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+def generate_benchmark_table(samples: Dict[str, List[LatencySample]]) -> str:
+    """Generate a markdown table of measured latency per model and input size."""
+    rows = [
+        "| Model | Target Tokens | Input Tokens | Output Tokens | TTFT (s) | Total (s) |",
+        "|---|---|---|---|---|---|"
+    ]
+    for model, model_samples in samples.items():
+        for s in model_samples:
+            rows.append(
+                f"| {model} | {s.target_tokens} | {s.input_tokens} | {s.output_tokens} | "
+                f"{s.ttft:.2f} | {s.duration:.2f} |"
+            )
+    return "\n".join(rows)
+
+def generate_model_table(models: Dict[str, LatencyModel]) -> str:
+    """Generate a markdown table of fitted latency models."""
+    rows = [
+        "| Model | Overhead (s) | Prefill (s / 1k) | Breakpoint (tokens) | Extra Prefill Above (s / 1k) | "
+        "Decode (ms / token) | Predicted 8k In / 500 Out (s) | Samples |",
+        "|---|---|---|---|---|---|---|---|"
+    ]
+    for model, m in models.items():
+        rows.append(
+            f"| {model} | {m.overhead:.3f} | {m.prefill_per_1k:.4f} | "
+            f"{m.breakpoint if m.breakpoint is not None else '-'} | {m.prefill_above_per_1k:.4f} | "
+            f"{m.decode_per_token * 1000:.2f} | {m.predict(8_000):.2f} | {m.samples} |"
+        )
+    return "\n".join(rows)
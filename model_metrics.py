@@ -0,0 +1,201 @@
+"""
+Vectorized aggregation of test results.
+
+Computes counts, success rates, means, standard deviations, percentiles and
+throughput per group over the columns of a ResultBuffer with NumPy, for
+any combination of the group keys below.
+"""
+
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from model_results import ResultBuffer
+
+GROUP_KEYS = ("model", "provider", "test_case", "run", "day")
+PERCENTILES = (50, 90, 95, 99)
+
+# Metric columns in the order they are rendered
+METRICS = (
+    "count", "successes", "success_rate", "mean", "std", "min",
+    *(f"p{q}" for q in PERCENTILES), "max", "total", "throughput", "avg_response_length"
+)
+
+class AggregateTable:
+    """Aggregated metrics, one row per group."""
+
+    def __init__(self, group_by: Sequence[str], keys: List[Tuple[str, ...]], metrics: Dict[str, np.ndarray]):
+        self.group_by = list(group_by)
+        self.keys = keys
+        self.metrics = metrics
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Get the groups as dicts of key and metric values."""
+        return [
+            {
+                **dict(zip(self.group_by, key)),
+                **{name: values[i].item() for name, values in self.metrics.items()}
+            }
+            for i, key in enumerate(self.keys)
+        ]
+
+    def get(self, *key: str) -> Optional[Dict[str, Any]]:
+        """Get the metrics of one group, or None if it does not exist."""
+        try:
+            i = self.keys.index(tuple(key))
+        except ValueError:
+            return None
+        return {name: values[i].item() for name, values in self.metrics.items()}
+
+    def sort_by(self, metric: str, descending: bool = False) -> "AggregateTable":
+        """Get a copy of the table ordered by a metric."""
+        order = np.argsort(self.metrics[metric], kind="stable")
+        if descending:
+            order = order[::-1]
+        return AggregateTable(
+            self.group_by,
+            [self.keys[i] for i in order],
+            {name: values[order] for name, values in self.metrics.items()}
+        )
+
+    def to_markdown(self, metrics: Sequence[str] = METRICS) -> str:
+        """Render the table as markdown."""
+        headers = [key.replace("_", " ").title() for key in self.group_by] + [m.replace("_", " ").title() for m in metrics]
+        lines = ["| " + " | ".join(headers) + " |", "|" + "|".join("---" for _ in headers) + "|"]
+        for i, key in enumerate(self.keys):
+            values = []
+            for metric in metrics:
+                value = self.metrics[metric][i]
+                if metric in ("count", "successes"):
+                    values.append(str(int(value)))
+                elif metric == "success_rate":
+                    values.append(f"{value * 100:.1f}%")
+                elif metric == "avg_response_length":
+                    values.append(f"{value:.0f}")
+                else:
+                    values.append(f"{value:.2f}")
+            lines.append("| " + " | ".join([*key, *values]) + " |")
+        return "\n".join(lines)
+
+def column(values) -> np.ndarray:
+    """View an array.array column as a NumPy array without copying."""
+    return np.frombuffer(values, dtype=np.dtype(values.typecode))
+
+def key_codes(buffer: ResultBuffer, key: str) -> Tuple[np.ndarray, List[str]]:
+    """Get integer group codes per row and their labels for a group key."""
+    if key == "model":
+        return column(buffer.model_ids).astype(np.int64), list(buffer.models.values)
+    if key == "test_case":
+        return column(buffer.test_case_ids).astype(np.int64), list(buffer.test_cases.values)
+    if key == "provider":
+        labels: List[str] = []
+        mapping = []
+        for model in buffer.models.values:
+            provider = model.split(":", 1)[0] if ":" in model else "openai"
+            if provider not in labels:
+                labels.append(provider)
+            mapping.append(labels.index(provider))
+        model_codes = column(buffer.model_ids)
+        return np.asarray(mapping, dtype=np.int64)[model_codes], labels
+    if key == "run":
+        # Shift by one so rows without a run id (-1) get the "-" label
+        codes = column(buffer.run_ids).astype(np.int64) + 1
+        return codes, ["-", *buffer.runs.values]
+    if key == "day":
+        days = np.floor(column(buffer.timestamps) / 86400).astype(np.int64)
+        unique_days, codes = np.unique(days, return_inverse=True)
+        labels = [datetime.fromtimestamp(int(day) * 86400, UTC).strftime("%Y-%m-%d") for day in unique_days]
+        return codes.astype(np.int64), labels
+    raise ValueError(f"Unknown group key: {key} (expected one of {', '.join(GROUP_KEYS)})")
+
+def aggregate(
+    buffer: ResultBuffer,
+    group_by: Sequence[str] = ("model",),
+    successful_only: bool = False,
+    where: Optional[np.ndarray] = None
+) -> AggregateTable:
+    """Aggregate duration metrics per group.
+
+    Args:
+        buffer: The results to aggregate
+        group_by: Group keys, any of GROUP_KEYS
+        successful_only: Only aggregate successful results
+        where: Boolean mask selecting the rows to aggregate (default: all)
+
+    Skipped results are never aggregated.
+
+    Returns:
+        AggregateTable with one row per group, ordered by group key
+    """
+    group_by = list(group_by)
+    if len(buffer) == 0:
+        return AggregateTable(group_by, [], {name: np.empty(0) for name in METRICS})
+    codes_and_labels = [key_codes(buffer, key) for key in group_by]
+
+    durations = column(buffer.durations)
+    success = column(buffer.success).astype(np.float64)
+    lengths = column(buffer.response_lengths).astype(np.float64)
+    codes = [c for c, _ in codes_and_labels]
+
+    mask = column(buffer.skipped) == 0
+    if successful_only:
+        mask &= success > 0
+    if where is not None:
+        mask &= where
+    if not mask.all():
+        durations, success, lengths = durations[mask], success[mask], lengths[mask]
+        codes = [c[mask] for c in codes]
+
+    if len(durations) == 0:
+        return AggregateTable(group_by, [], {name: np.empty(0) for name in METRICS})
+
+    # Combine the per-key codes into a single group id per row
+    dims = tuple(max(len(labels), 1) for _, labels in codes_and_labels)
+    combined = np.ravel_multi_index(codes, dims) if group_by else np.zeros(len(durations), dtype=np.int64)
+    unique_groups, group_ids = np.unique(combined, return_inverse=True)
+    n_groups = len(unique_groups)
+
+    counts = np.bincount(group_ids, minlength=n_groups).astype(np.float64)
+    totals = np.bincount(group_ids, weights=durations, minlength=n_groups)
+    means = totals / counts
+    squares = np.bincount(group_ids, weights=durations * durations, minlength=n_groups)
+    stds = np.sqrt(np.maximum(squares / counts - means * means, 0.0))
+    successes = np.bincount(group_ids, weights=success, minlength=n_groups)
+
+    # Sort durations within groups for min, max and percentiles
+    order = np.lexsort((durations, group_ids))
+    sorted_durations = durations[order]
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+    ends = starts + counts.astype(np.int64) - 1
+
+    metrics: Dict[str, np.ndarray] = {
+        "count": counts,
+        "successes": successes,
+        "success_rate": successes / counts,
+        "mean": means,
+        "std": stds,
+        "min": sorted_durations[starts],
+    }
+    for q in PERCENTILES:
+        # Linear interpolation between closest ranks, as numpy.percentile does
+        position = starts + (q / 100) * (counts - 1)
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        fraction = position - lower
+        metrics[f"p{q}"] = sorted_durations[lower] + (sorted_durations[upper] - sorted_durations[lower]) * fraction
+    metrics["max"] = sorted_durations[ends]
+    metrics["total"] = totals
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metrics["throughput"] = np.where(totals > 0, counts / totals, 0.0)
+    metrics["avg_response_length"] = np.bincount(group_ids, weights=lengths, minlength=n_groups) / counts
+
+    unraveled = np.unravel_index(unique_groups, dims) if group_by else ()
+    keys = [
+        tuple(labels[unraveled[k][i]] for k, (_, labels) in enumerate(codes_and_labels))
+        for i in range(n_groups)
+    ]
+    return AggregateTable(group_by, keys, metrics)
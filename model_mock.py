@@ -0,0 +1,517 @@
+"""
+Local mock LLM provider for load-testing the harness without provider quota.
+
+A small asyncio HTTP/1.1 server emulates the endpoints used by
+create_test_agent, with and without streaming:
+
+    POST /v1/chat/completions  OpenAI-compatible chat completions
+    POST /v1/messages          Anthropic messages
+    GET  /stats                Request counters, for checking a sweep
+
+Latency, throughput and failures follow a profile chosen per request from
+the requested model name (e.g. "openai-slow" uses the "slow" profile):
+time to first token is drawn from a lognormal distribution plus a prefill
+cost per input token, tokens are streamed at a fixed rate, a share of
+requests fails with 500 or 429, and requests above the profile's
+concurrency limit are rejected with 429.
+
+Requests offering tools get a tool call with arguments generated from the
+tool's JSON schema, so structured output tests pass validation.
+
+Run it with `python model_mock.py --port 8765` and test the registry's
+mock:* models with MOCK_LLM_URL set (see the README).
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from model_latency import estimate_tokens
+from model_utils import MODEL_REGISTRY
+
+DEFAULT_PORT = 8765
+DEFAULT_MOCK_URL = f"http://127.0.0.1:{DEFAULT_PORT}"
+
+# Environment variable with the server URL; setting it makes the mock provider available
+MOCK_URL_ENV = "MOCK_LLM_URL"
+
+# Words of the generated text, one token each
+FILLER_WORDS = (
+    "the", "model", "returns", "a", "mock", "response", "with", "steady", "latency",
+    "and", "throughput", "for", "load", "testing", "of", "harness", "overhead"
+)
+
+class MockProfile(BaseModel):
+    """Latency, throughput and failure behaviour of mock models."""
+    ttft: float = 0.2  # Median seconds to first token, excluding prefill
+    ttft_sigma: float = 0.25  # Spread of the lognormal TTFT distribution (0: constant)
+    prefill_per_1k: float = 0.0  # Extra seconds to first token per 1k input tokens
+    tokens_per_second: Optional[float] = 100.0  # Output rate; None sends everything at once
+    output_tokens: int = 100  # Output size of text responses, capped by the request's max tokens
+    error_rate: float = 0.0  # Share of requests failing with 500 after the TTFT
+    rate_limit_rate: float = 0.0  # Share of requests rejected with 429
+    max_concurrency: Optional[int] = None  # Requests in flight above this are rejected with 429
+
+PROFILES: Dict[str, MockProfile] = {
+    "instant": MockProfile(ttft=0.0, ttft_sigma=0.0, tokens_per_second=None, output_tokens=20),
+    "fast": MockProfile(ttft=0.2, tokens_per_second=200.0, output_tokens=100),
+    "slow": MockProfile(ttft=1.5, ttft_sigma=0.5, prefill_per_1k=0.05, tokens_per_second=30.0,
+                        output_tokens=300, max_concurrency=8),
+    "flaky": MockProfile(ttft=0.3, ttft_sigma=0.5, tokens_per_second=80.0, output_tokens=100,
+                         error_rate=0.1, rate_limit_rate=0.1, max_concurrency=4),
+}
+
+def get_profile_name(model: str, profiles: Dict[str, MockProfile], default: str = "fast") -> str:
+    """Get the profile of a requested model name, e.g. "slow" for "anthropic-slow-3"."""
+    for part in model.split(":")[-1].split("-"):
+        if part in profiles:
+            return part
+    return default
+
+def fake_value(schema: Dict[str, Any], defs: Optional[Dict[str, Any]] = None) -> Any:
+    """Generate a value that validates against a JSON schema.
+
+    Covers the schemas pydantic generates for result types: references,
+    unions, enums, objects, arrays with a minimum length and scalars.
+
+    Args:
+        schema: JSON schema of the value
+        defs: Definitions that $ref entries point to (default: the schema's own $defs)
+
+    Returns:
+        A JSON-compatible value
+    """
+    defs = schema.get("$defs", defs) or {}
+    if "$ref" in schema:
+        return fake_value(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "default" in schema:
+        return schema["default"]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return fake_value(options[0], defs)
+    kind = schema.get("type", "object")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {name: fake_value(prop, defs) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [fake_value(schema.get("items", {}), defs) for _ in range(max(schema.get("minItems", 1), 1))]
+    if kind == "string":
+        if schema.get("format") == "date-time":
+            return "2025-01-01T00:00:00Z"
+        return "mock".ljust(schema.get("minLength", 0), "x")
+    if kind == "integer":
+        return int(schema.get("minimum", 1))
+    if kind == "number":
+        return float(schema.get("minimum", 1.0))
+    if kind == "boolean":
+        return True
+    return None
+
+class MockReply(BaseModel):
+    """What a mock request answers: text, or a call of one of the offered tools."""
+    text: Optional[str] = None
+    tool_name: Optional[str] = None
+    tool_args: Optional[Dict[str, Any]] = None
+    input_tokens: int
+    output_tokens: int
+
+class MockServer:
+    """OpenAI- and Anthropic-compatible mock server."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 profiles: Optional[Dict[str, MockProfile]] = None, seed: Optional[int] = None):
+        """Initialize the server.
+
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0: any free port)
+            profiles: Profiles by name (default: PROFILES)
+            seed: Seed of the latency and failure draws, for reproducible sweeps
+        """
+        self.host = host
+        self.port = port
+        self.profiles = dict(profiles or PROFILES)
+        self.rng = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+        # Statistics
+        self.requests = 0
+        self.statuses: Dict[int, int] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.peak_in_flight = 0
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """Start listening; with port 0 the chosen port is stored in self.port."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening and close the server."""
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise outlive the server
+            for task in self._connections:
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get request counters."""
+        return {
+            "requests": self.requests,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "in_flight": sum(self.in_flight.values()),
+            "peak_in_flight": self.peak_in_flight,
+        }
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, _ = request_line.decode().split(" ", 2)
+                    headers = {}
+                    while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        name, _, value = line.decode().partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    body = await reader.readexactly(int(headers.get("content-length", 0)))
+                    request = json.loads(body or b"{}")
+                except ValueError as e:
+                    # Malformed request line, Content-Length or JSON body; the stream can't be resynced
+                    await self._send(writer, 400, {"error": {"message": f"Bad request: {e}"}})
+                    break
+                await self._handle_request(method, path.split("?", 1)[0], request, writer)
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, data: Any) -> None:
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        payload = json.dumps(data).encode()
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error"}[status]
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+        )
+        await writer.drain()
+
+    async def _send_error(self, writer: asyncio.StreamWriter, api: str, status: int, message: str) -> None:
+        if api == "anthropic":
+            kind = "rate_limit_error" if status == 429 else "api_error"
+            data = {"type": "error", "error": {"type": kind, "message": message}}
+        else:
+            kind = "rate_limit_exceeded" if status == 429 else "server_error"
+            data = {"error": {"message": message, "type": kind, "code": kind}}
+        await self._send(writer, status, data)
+
+    async def _handle_request(self, method: str, path: str, request: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        if method == "GET" and path == "/stats":
+            await self._send(writer, 200, self.stats())
+            return
+        routes = {"/v1/chat/completions": "openai", "/v1/messages": "anthropic"}
+        if method != "POST" or path not in routes:
+            await self._send(writer, 404, {"error": {"message": f"Unknown endpoint: {method} {path}"}})
+            return
+        api = routes[path]
+        name = get_profile_name(request.get("model", ""), self.profiles)
+        profile = self.profiles[name]
+        self.requests += 1
+
+        if profile.max_concurrency is not None and self.in_flight.get(name, 0) >= profile.max_concurrency:
+            await self._send_error(writer, api, 429, "Rate limit exceeded (mock): too many concurrent requests")
+            return
+        draw = self.rng.random()
+        if draw < profile.rate_limit_rate:
+            await self._send_error(writer, api, 429, "Rate limit exceeded (mock)")
+            return
+
+        self.in_flight[name] = self.in_flight.get(name, 0) + 1
+        self.peak_in_flight = max(self.peak_in_flight, sum(self.in_flight.values()))
+        try:
+            reply = self._reply(api, request, profile)
+            ttft = profile.ttft * math.exp(self.rng.gauss(0.0, profile.ttft_sigma)) if profile.ttft_sigma else profile.ttft
+            await asyncio.sleep(ttft + profile.prefill_per_1k * reply.input_tokens / 1000)
+            if draw < profile.rate_limit_rate + profile.error_rate:
+                await self._send_error(writer, api, 500, "Internal server error (mock)")
+            elif not request.get("stream"):
+                await self._decode_delay(profile, reply.output_tokens)
+                await self._send(writer, 200, self._response(api, request["model"], reply))
+            else:
+                await self._stream(writer, api, request["model"], reply, profile)
+        finally:
+            self.in_flight[name] -= 1
+
+    def _reply(self, api: str, request: Dict[str, Any], profile: MockProfile) -> MockReply:
+        """Decide the reply: call the first offered tool, or answer in text once a tool returned."""
+        messages = request.get("messages", [])
+        text = json.dumps(request.get("system", "")) + json.dumps(messages)
+        input_tokens = max(estimate_tokens(text), 1)
+        last = messages[-1] if messages else {}
+        if api == "anthropic":
+            tools = [(t["name"], t.get("input_schema", {})) for t in request.get("tools", [])]
+            after_tool = isinstance(last.get("content"), list) and any(
+                block.get("type") == "tool_result" for block in last["content"]
+            )
+            text_allowed = request.get("tool_choice", {}).get("type", "auto") == "auto"
+        else:
+            tools = [(t["function"]["name"], t["function"].get("parameters", {})) for t in request.get("tools", [])]
+            after_tool = last.get("role") == "tool"
+            text_allowed = request.get("tool_choice", "auto") == "auto"
+
+        # Function tools come before result tools; after a tool returned,
+        # answer in text or with the last (result) tool
+        if tools and not (after_tool and text_allowed):
+            name, schema = tools[-1] if after_tool else tools[0]
+            args = fake_value(schema)
+            return MockReply(tool_name=name, tool_args=args, input_tokens=input_tokens,
+                             output_tokens=max(estimate_tokens(json.dumps(args)), 1))
+        max_tokens = request.get("max_tokens") or request.get("max_completion_tokens") or profile.output_tokens
+        count = max(min(profile.output_tokens, max_tokens), 1)
+        words = [FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(count)]
+        return MockReply(text=" ".join(words), input_tokens=input_tokens, output_tokens=count)
+
+    async def _decode_delay(self, profile: MockProfile, tokens: int) -> None:
+        if profile.tokens_per_second:
+            await asyncio.sleep(tokens / profile.tokens_per_second)
+
+    def _response(self, api: str, model: str, reply: MockReply) -> Dict[str, Any]:
+        """Build a non-streamed response body."""
+        if api == "anthropic":
+            if reply.tool_name:
+                content = [{"type": "tool_use", "id": f"toolu_{uuid.uuid4().hex[:24]}",
+                            "name": reply.tool_name, "input": reply.tool_args}]
+            else:
+                content = [{"type": "text", "text": reply.text}]
+            return {
+                "id": f"msg_{uuid.uuid4().hex[:24]}", "type": "message", "role": "assistant",
+                "model": model, "content": content,
+                "stop_reason": "tool_use" if reply.tool_name else "end_turn", "stop_sequence": None,
+                "usage": {"input_tokens": reply.input_tokens, "output_tokens": reply.output_tokens},
+            }
+        message: Dict[str, Any] = {"role": "assistant", "content": reply.text}
+        if reply.tool_name:
+            message["tool_calls"] = [{
+                "id": f"call_{uuid.uuid4().hex[:24]}", "type": "function",
+                "function": {"name": reply.tool_name, "arguments": json.dumps(reply.tool_args)},
+            }]
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "object": "chat.completion",
+            "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "message": message,
+                         "finish_reason": "tool_calls" if reply.tool_name else "stop"}],
+            "usage": self._openai_usage(reply),
+        }
+
+    @staticmethod
+    def _openai_usage(reply: MockReply) -> Dict[str, int]:
+        return {
+            "prompt_tokens": reply.input_tokens,
+            "completion_tokens": reply.output_tokens,
+            "total_tokens": reply.input_tokens + reply.output_tokens,
+        }
+
+    def _events(self, api: str, model: str, reply: MockReply) -> Tuple[List[str], List[str], List[str]]:
+        """Build the server-sent events of a streamed response.
+
+        Returns:
+            Tuple of (events before the output, one event per output token, events after the output)
+        """
+        def sse(data: Dict[str, Any], event: Optional[str] = None) -> str:
+            return (f"event: {event}\n" if event else "") + f"data: {json.dumps(data)}\n\n"
+
+        if api == "anthropic":
+            message = self._response(api, model, reply)
+            head = [sse({"type": "message_start", "message": {
+                **message, "content": [], "stop_reason": None,
+                "usage": {"input_tokens": reply.input_tokens, "output_tokens": 0},
+            }}, "message_start")]
+            if reply.tool_name:
+                # Arguments arrive whole with the block start
+                head.append(sse({"type": "content_block_start", "index": 0, "content_block": message["content"][0]},
+                                "content_block_start"))
+                tokens = []
+            else:
+                head.append(sse({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+                                "content_block_start"))
+                tokens = [
+                    sse({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": word}},
+                        "content_block_delta")
+                    for word in self._split(reply.text)
+                ]
+            tail = [
+                sse({"type": "content_block_stop", "index": 0}, "content_block_stop"),
+                sse({"type": "message_delta", "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+                     "usage": {"output_tokens": reply.output_tokens}}, "message_delta"),
+                sse({"type": "message_stop"}, "message_stop"),
+            ]
+            return head, tokens, tail
+
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex[:24]}", "object": "chat.completion.chunk",
+                "created": int(time.time()), "model": model}
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+            return sse({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]})
+
+        if reply.tool_name:
+            head = [chunk({"role": "assistant", "tool_calls": [{
+                "index": 0, "id": f"call_{uuid.uuid4().hex[:24]}", "type": "function",
+                "function": {"name": reply.tool_name, "arguments": json.dumps(reply.tool_args)},
+            }]})]
+            tokens = []
+        else:
+            head = [chunk({"role": "assistant", "content": ""})]
+            tokens = [chunk({"content": word}) for word in self._split(reply.text)]
+        tail = [
+            chunk({}, "tool_calls" if reply.tool_name else "stop"),
+            sse({**base, "choices": [], "usage": self._openai_usage(reply)}),
+            "data: [DONE]\n\n",
+        ]
+        return head, tokens, tail
+
+    @staticmethod
+    def _split(text: str) -> List[str]:
+        words = text.split(" ")
+        return [words[0]] + [f" {word}" for word in words[1:]]
+
+    async def _stream(self, writer: asyncio.StreamWriter, api: str, model: str, reply: MockReply,
+                      profile: MockProfile) -> None:
+        """Stream a response with chunked transfer encoding, pacing tokens at the profile's rate."""
+        self.statuses[200] = self.statuses.get(200, 0) + 1
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n"
+        )
+
+        def write_chunk(data: str) -> None:
+            payload = data.encode()
+            writer.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+
+        head, tokens, tail = self._events(api, model, reply)
+        for event in head:
+            write_chunk(event)
+        await writer.drain()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for i, event in enumerate(tokens):
+            if profile.tokens_per_second:
+                # Paced against the start, so sleep overshoot does not accumulate
+                delay = start + (i + 1) / profile.tokens_per_second - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            write_chunk(event)
+            await writer.drain()
+        if not tokens:
+            await self._decode_delay(profile, reply.output_tokens)
+        for event in tail:
+            write_chunk(event)
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+def mock_model(model_name: str, url: Optional[str] = None):
+    """Create a pydantic_ai model for a mock:* registry entry.
+
+    Clients don't retry, so injected errors reach the harness's own
+    retry, routing and breaker logic.
+
+    Args:
+        model_name: Registry name, e.g. 'mock:openai-fast'
+        url: Server URL (default: MOCK_LLM_URL or the default local port)
+
+    Returns:
+        An OpenAIModel or AnthropicModel talking to the mock server
+    """
+    url = (url or os.getenv(MOCK_URL_ENV) or DEFAULT_MOCK_URL).rstrip("/")
+    name = model_name.split(":", 1)[1]
+    if MODEL_REGISTRY.get(model_name, {}).get("mock_api") == "anthropic":
+        from anthropic import AsyncAnthropic
+        from pydantic_ai.models.anthropic import AnthropicModel
+        return AnthropicModel(name, anthropic_client=AsyncAnthropic(base_url=url, api_key="mock", max_retries=0))
+    from openai import AsyncOpenAI
+    from pydantic_ai.models.openai import OpenAIModel
+    return OpenAIModel(name, openai_client=AsyncOpenAI(base_url=f"{url}/v1", api_key="mock", max_retries=0))
+
+def register_mock_models(count: int, profile: str = "fast", api: str = "openai") -> List[str]:
+    """Add mock models to the registry, e.g. for sweeps over many models.
+
+    Args:
+        count: Number of models to add
+        profile: Profile of the models
+        api: API the models are served through, 'openai' or 'anthropic'
+
+    Returns:
+        The added registry names
+    """
+    names = []
+    for i in range(count):
+        name = f"mock:{api}-{profile}-{i}"
+        MODEL_REGISTRY[name] = {
+            "provider": "mock",
+            "base_name": f"mock-{api}-{profile}-{i}",
+            "context_window": 128_000,
+            "mock_api": api,
+            "capabilities": {
+                "tools": True,
+                "function_calling": True,
+                "json_mode": True,
+                "system_prompt": True,
+                "vision": False,
+                "audio": False
+            }
+        }
+        names.append(name)
+    return names
+
+async def serve(port: int, seed: Optional[int], profiles: Dict[str, MockProfile]) -> None:
+    """Run the server until interrupted."""
+    server = MockServer(port=port, profiles=profiles, seed=seed)
+    await server.start()
+    print(f"Mock provider listening on {server.url} (profiles: {', '.join(server.profiles)})")
+    print(f"Test mock:* models with {MOCK_URL_ENV}={server.url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock LLM provider")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--seed", type=int, help="Seed of latency and failure draws")
+    parser.add_argument("--profiles", type=str, metavar="JSON_FILE",
+                        help="JSON file of profiles by name, added to or replacing the built-in ones")
+    args = parser.parse_args()
+    profiles = dict(PROFILES)
+    if args.profiles:
+        with open(args.profiles) as f:
+            profiles.update({name: MockProfile(**data) for name, data in json.load(f).items()})
+    try:
+        asyncio.run(serve(args.port, args.seed, profiles))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,220 @@
+"""
+Rolling-window latency and error monitoring for synthetic probes.
+
+In monitor mode the harness sends lightweight test cases to every model
+on a fixed schedule. Each probe outcome goes into a fixed-size ring
+buffer per model, so memory stays constant however long the monitor
+runs. Rolling p50/p95 latency and error rate are computed over several
+windows from the buffer, and thresholds are checked after every probe.
+
+An alert fires once when a threshold is breached in a window and resolves
+once the window is back under it. Alerts are appended as JSON lines to a
+local file and, optionally, posted to a webhook.
+"""
+
+import json
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+import numpy as np
+from pydantic import BaseModel
+
+# Seconds between probes of a model
+DEFAULT_PROBE_INTERVAL = 300.0
+
+# Rolling windows in seconds: 15 minutes, 1 hour, 24 hours
+DEFAULT_WINDOWS = (900, 3600, 86400)
+
+# Probe outcomes kept per model; at the default interval this covers more than 24 hours
+DEFAULT_CAPACITY = 512
+
+# Fewer probes in a window than this never fire an alert
+DEFAULT_MIN_SAMPLES = 3
+
+def window_label(seconds: float) -> str:
+    """Format a window length, e.g. 900 -> '15m'."""
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size and seconds % size == 0:
+            return f"{int(seconds // size)}{unit}"
+    return f"{seconds:g}s"
+
+class LatencyRing:
+    """Fixed-size ring buffer of probe timestamps, durations and outcomes."""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        """Initialize the buffer.
+
+        Args:
+            capacity: Number of probes kept; the oldest are overwritten
+        """
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity)
+        self.durations = np.zeros(capacity)
+        self.success = np.zeros(capacity, dtype=bool)
+        self.count = 0  # Probes recorded so far, including overwritten ones
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp: float, duration: float, success: bool) -> None:
+        """Record a probe outcome."""
+        i = self.count % self.capacity
+        self.timestamps[i] = timestamp
+        self.durations[i] = duration
+        self.success[i] = success
+        self.count += 1
+
+    def window(self, now: float, seconds: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the durations and outcomes of probes in the last seconds before now."""
+        n = len(self)
+        mask = self.timestamps[:n] > now - seconds
+        return self.durations[:n][mask], self.success[:n][mask]
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the buffer's arrays."""
+        return self.timestamps.nbytes + self.durations.nbytes + self.success.nbytes
+
+class WindowStats(BaseModel):
+    """Rolling metrics of one model over one window."""
+    window: float
+    count: int
+    p50: Optional[float] = None  # Latency percentiles of successful probes, in seconds
+    p95: Optional[float] = None
+    error_rate: float = 0.0
+
+def window_stats(ring: LatencyRing, now: float, window: float) -> WindowStats:
+    """Compute rolling metrics over a window of a ring buffer."""
+    durations, success = ring.window(now, window)
+    if not len(durations):
+        return WindowStats(window=window, count=0)
+    ok = durations[success]
+    return WindowStats(
+        window=window,
+        count=len(durations),
+        p50=float(np.percentile(ok, 50)) if len(ok) else None,
+        p95=float(np.percentile(ok, 95)) if len(ok) else None,
+        error_rate=float(1 - success.mean())
+    )
+
+class AlertThresholds(BaseModel):
+    """Thresholds checked in every window; unset thresholds are not checked."""
+    p95: Optional[float] = None  # Seconds
+    error_rate: Optional[float] = None  # Fraction of failed probes
+    min_samples: int = DEFAULT_MIN_SAMPLES
+
+class Alert(BaseModel):
+    """A threshold breach that started or ended."""
+    timestamp: datetime
+    model: str
+    window: str
+    metric: str
+    value: float
+    threshold: float
+    state: str  # firing or resolved
+
+class ProbeMonitor:
+    """Ring buffers, rolling metrics and alert state of all probed models."""
+
+    def __init__(
+        self,
+        windows: Sequence[float] = DEFAULT_WINDOWS,
+        thresholds: Optional[AlertThresholds] = None,
+        capacity: int = DEFAULT_CAPACITY
+    ):
+        """Initialize the monitor.
+
+        Args:
+            windows: Rolling window lengths in seconds
+            thresholds: Alert thresholds (default: no alerts)
+            capacity: Probes kept per model
+        """
+        self.windows = sorted(windows)
+        self.thresholds = thresholds or AlertThresholds()
+        self.capacity = capacity
+        self.rings: Dict[str, LatencyRing] = {}
+        self.firing: Dict[Tuple[str, float, str], Alert] = {}
+        self.alerts: List[Alert] = []
+
+    def record(self, model: str, timestamp: float, duration: float, success: bool) -> List[Alert]:
+        """Record a probe outcome and check the model's thresholds.
+
+        Args:
+            model: Probed model
+            timestamp: POSIX time the probe finished
+            duration: Probe latency in seconds
+            success: Whether the probe passed
+
+        Returns:
+            Alerts that started or ended with this probe
+        """
+        ring = self.rings.setdefault(model, LatencyRing(self.capacity))
+        ring.append(timestamp, duration, success)
+        changed = []
+        for window in self.windows:
+            stats = window_stats(ring, timestamp, window)
+            for metric, value, threshold in (
+                ("p95", stats.p95, self.thresholds.p95),
+                ("error_rate", stats.error_rate, self.thresholds.error_rate),
+            ):
+                if threshold is None:
+                    continue
+                key = (model, window, metric)
+                breached = stats.count >= self.thresholds.min_samples and value is not None and value > threshold
+                if breached == (key in self.firing):
+                    continue
+                alert = Alert(
+                    timestamp=datetime.fromtimestamp(timestamp, UTC),
+                    model=model,
+                    window=window_label(window),
+                    metric=metric,
+                    value=value if value is not None else 0.0,
+                    threshold=threshold,
+                    state="firing" if breached else "resolved"
+                )
+                if breached:
+                    self.firing[key] = alert
+                else:
+                    del self.firing[key]
+                changed.append(alert)
+        self.alerts.extend(changed)
+        return changed
+
+    def generate_table(self, now: float) -> str:
+        """Generate a markdown table of rolling metrics per model and window."""
+        rows = [
+            "| Model | Window | Probes | P50 (s) | P95 (s) | Error Rate | Alerts |",
+            "|---|---|---|---|---|---|---|"
+        ]
+        for model in sorted(self.rings):
+            for window in self.windows:
+                stats = window_stats(self.rings[model], now, window)
+                firing = [metric for (m, w, metric) in self.firing if m == model and w == window]
+                rows.append(
+                    f"| {model} | {window_label(window)} | {stats.count} | "
+                    f"{'-' if stats.p50 is None else f'{stats.p50:.2f}'} | "
+                    f"{'-' if stats.p95 is None else f'{stats.p95:.2f}'} | "
+                    f"{stats.error_rate * 100:.1f}% | {', '.join(firing) or '-'} |"
+                )
+        return "\n".join(rows)
+
+def append_alerts(path: Path, alerts: List[Alert]) -> Path:
+    """Append alerts to a JSON lines file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        for alert in alerts:
+            f.write(alert.model_dump_json() + "\n")
+    return path
+
+async def post_alerts(session: aiohttp.ClientSession, url: str, alerts: List[Alert]) -> None:
+    """Post alerts to a webhook as one JSON document.
+
+    Raises:
+        aiohttp.ClientError: If the webhook cannot be reached or rejects the alerts
+    """
+    payload = {"alerts": [json.loads(alert.model_dump_json()) for alert in alerts]}
+    async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=10)) as response:
+        response.raise_for_status()
@@ -0,0 +1,225 @@
+"""
+CPU and memory profiling of the harness itself during a run.
+
+The CPU profiler is a sampling profiler: a background thread records the
+Python stack of every other thread at a fixed interval and counts each
+distinct stack. Samples where a thread only waits (the event loop in
+select, idle writer and executor threads) are counted as idle, so the
+remaining stacks show where the harness spends CPU. Stacks are written in
+the collapsed format read by flamegraph.pl, speedscope and inferno:
+
+    MainThread;run (runners.py:118);...;_generate_metrics_table (model_test.py:1431) 42
+
+Memory profiling traces allocations with tracemalloc and reports the
+lines and call paths that allocated the most during the run. Tracing
+slows allocation-heavy code, so durations of a profiled run are not
+comparable with unprofiled runs.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, peak RSS is not reported there
+    resource = None
+
+# Seconds between stack samples
+DEFAULT_INTERVAL = 0.005
+
+# Frames kept per traced allocation
+TRACE_FRAMES = 10
+
+# Entries of each section of the allocations report
+TOP_ALLOCATIONS = 25
+
+# (file name, function) of leaf frames where a thread waits instead of running
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),  # ThreadPoolExecutor worker waiting for work
+}
+
+IDLE = "(idle)"
+
+def peak_rss() -> Optional[int]:
+    """Get the peak resident set size of the process in bytes, if the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class RunProfiler:
+    """Sampling CPU profiler and allocation tracer for a run."""
+
+    def __init__(self, cpu: bool = True, memory: bool = True, interval: float = DEFAULT_INTERVAL):
+        """Initialize the profiler.
+
+        Args:
+            cpu: Sample thread stacks
+            memory: Trace allocations with tracemalloc
+            interval: Seconds between stack samples
+        """
+        self.cpu = cpu
+        self.memory = memory
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._start_wall = self._start_cpu = 0.0
+        self._end_wall: Optional[float] = None
+        self._end_cpu: Optional[float] = None
+        self._start_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._end_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._traced_start = 0
+        self._traced_peak = 0
+        self._traced_growth = 0
+
+    def start(self) -> None:
+        """Start sampling and tracing."""
+        if self.memory:
+            tracemalloc.start(TRACE_FRAMES)
+            self._start_snapshot = tracemalloc.take_snapshot()
+            self._traced_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        if self.cpu:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample_loop, name="cpu-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and tracing, keeping the results for reports."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self._end_wall = time.perf_counter()
+        self._end_cpu = time.process_time()
+        if self.memory and tracemalloc.is_tracing():
+            self._end_snapshot = tracemalloc.take_snapshot()
+            current, self._traced_peak = tracemalloc.get_traced_memory()
+            self._traced_growth = current - self._traced_start
+            tracemalloc.stop()
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self._record(names.get(ident, str(ident)), frame)
+
+    def _record(self, thread_name: str, frame) -> None:
+        self.samples += 1
+        code = frame.f_code
+        if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+            self.idle_samples += 1
+            self.stacks[f"{thread_name};{IDLE}"] += 1
+            return
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        self.stacks[";".join([thread_name, *reversed(stack)])] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get resource use so far, or of the whole run once stopped."""
+        wall = (self._end_wall or time.perf_counter()) - self._start_wall
+        cpu = (self._end_cpu or time.process_time()) - self._start_cpu
+        if self.memory and tracemalloc.is_tracing():
+            current, traced_peak = tracemalloc.get_traced_memory()
+            traced_growth = current - self._traced_start
+        else:
+            traced_peak, traced_growth = self._traced_peak, self._traced_growth
+        return {
+            "wall_time": wall,
+            "cpu_time": cpu,
+            "cpu_utilization": cpu / wall if wall > 0 else 0.0,
+            "peak_rss": peak_rss(),
+            "traced_peak": traced_peak if self.memory else None,
+            "traced_growth": traced_growth if self.memory else None,
+            "samples": self.samples,
+            "busy_samples": self.samples - self.idle_samples,
+        }
+
+    def generate_table(self) -> str:
+        """Generate a markdown table of the harness's resource use."""
+        stats = self.stats()
+        rows = [
+            "| Metric | Value |",
+            "|---|---|",
+            f"| Wall Time (s) | {stats['wall_time']:.2f} |",
+            f"| CPU Time (s) | {stats['cpu_time']:.2f} |",
+            f"| CPU Utilization | {stats['cpu_utilization'] * 100:.1f}% |",
+        ]
+        if stats["peak_rss"] is not None:
+            rows.append(f"| Peak RSS (MB) | {stats['peak_rss'] / 1e6:.1f} |")
+        if stats["traced_peak"] is not None:
+            rows.append(f"| Peak Traced Allocations (MB) | {stats['traced_peak'] / 1e6:.1f} |")
+            rows.append(f"| Net Allocation Growth (MB) | {stats['traced_growth'] / 1e6:.1f} |")
+        if self.cpu:
+            rows.append(f"| Stack Samples (busy / total) | {stats['busy_samples']} / {stats['samples']} |")
+        return "\n".join(rows)
+
+    def write_folded(self, path: Path) -> Path:
+        """Write sampled stacks in the collapsed format of flamegraph tools."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def write_allocations(self, path: Path, top: int = TOP_ALLOCATIONS) -> Path:
+        """Write the lines and call paths that allocated the most during the run.
+
+        Args:
+            path: Report file
+            top: Entries per section
+
+        Returns:
+            The report path
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = ["Top allocations by line (growth during the run)", ""]
+        for stat in self._end_snapshot.compare_to(self._start_snapshot, "lineno")[:top]:
+            lines.append(str(stat))
+        lines += ["", f"Top allocations by call path ({TRACE_FRAMES} frames)", ""]
+        for i, stat in enumerate(self._end_snapshot.compare_to(self._start_snapshot, "traceback")[:top // 2], 1):
+            lines.append(f"#{i}: {stat.size_diff / 1e3:+.1f} KB in {stat.count_diff:+d} blocks")
+            lines += [f"    {line}" for line in stat.traceback.format(most_recent_first=True)]
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        return path
+
+    def write_reports(self, directory: Path, name: str) -> List[Path]:
+        """Write the flamegraph profile and allocations report of a stopped run.
+
+        Args:
+            directory: Output directory
+            name: Base name of the files, e.g. the run id
+
+        Returns:
+            Paths of the written reports
+        """
+        written = []
+        if self.cpu:
+            written.append(self.write_folded(Path(directory) / f"{name}_cpu.folded"))
+        if self.memory and self._end_snapshot is not None:
+            written.append(self.write_allocations(Path(directory) / f"{name}_allocations.txt"))
+        return written
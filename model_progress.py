@@ -0,0 +1,251 @@
+"""
+Live progress view for test runs.
+
+The scheduler reports queued, started and finished requests here. On a
+terminal the view redraws a per-model table in place with rolling
+throughput, latency percentiles, backoffs and an ETA; messages are printed
+above it instead of interleaving with it. When output is not a TTY (CI
+logs, pipes) it falls back to one plain line per finished test case plus
+a periodic summary line.
+"""
+
+import asyncio
+import sys
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, TextIO
+
+import numpy as np
+
+class ModelProgress:
+    """Counters of one model."""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.backoffs = 0  # Rate limits and failovers to another route
+        self.skipped = 0
+        self.durations: List[float] = []
+
+class ProgressView:
+    """Live progress of a test run."""
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        live: Optional[bool] = None,
+        interval: float = 0.5,
+        log_interval: float = 10.0,
+        window: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """Initialize the view.
+
+        Args:
+            stream: Output stream (default: stdout)
+            live: Redraw in place (default: when the stream is a TTY)
+            interval: Seconds between redraws of the live view
+            log_interval: Seconds between summary lines in plain-log mode
+            window: Window in seconds for the rolling request rate
+            clock: Monotonic clock, replaceable in tests
+        """
+        self.stream = stream or sys.stdout
+        self.live = self.stream.isatty() if live is None else live
+        self.interval = interval
+        self.log_interval = log_interval
+        self.window = window
+        self.clock = clock
+        self.models: Dict[str, ModelProgress] = {}
+        self.started_at = clock()
+        self._finished_at: Deque[float] = deque()
+        self._drawn_lines = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _model(self, model: str) -> ModelProgress:
+        if model not in self.models:
+            self.models[model] = ModelProgress(model.split(":", 1)[0] if ":" in model else "openai")
+        return self.models[model]
+
+    def add_jobs(self, model: str, count: int) -> None:
+        """Queue test cases of a model."""
+        self._model(model).queued += count
+
+    def request_started(self, model: str) -> None:
+        """Record a request that passed its concurrency limiter."""
+        progress = self._model(model)
+        if progress.queued > 0:
+            progress.queued -= 1
+        progress.in_flight += 1
+
+    def request_finished(self, model: str) -> None:
+        """Record the end of a request, before the test case may fail over."""
+        progress = self._model(model)
+        progress.in_flight -= 1
+        # Until the test case completes it still counts as pending work
+        progress.queued += 1
+
+    def backoff(self, model: str) -> None:
+        """Record a rate limit or transient failure that caused a failover."""
+        self._model(model).backoffs += 1
+
+    def complete(self, model: str, test_case: str, duration: float, success: bool) -> None:
+        """Record a finished test case."""
+        progress = self._model(model)
+        if progress.queued > 0:
+            progress.queued -= 1
+        progress.completed += 1
+        if not success:
+            progress.failed += 1
+        progress.durations.append(duration)
+        self._finished_at.append(self.clock())
+        if not self.live:
+            done, total = self._totals()
+            self._write(f"[{done}/{total}] {model} {test_case} {'✓' if success else '✗'} {duration:.2f}s")
+
+    def skip(self, model: str, test_case: str, reason: str) -> None:
+        """Record a test case that was not run."""
+        progress = self._model(model)
+        if progress.queued > 0:
+            progress.queued -= 1
+        progress.skipped += 1
+        if not self.live:
+            done, total = self._totals()
+            self._write(f"[{done}/{total}] {model} {test_case} skipped: {reason}")
+
+    def cancel_pending(self) -> None:
+        """Count queued and in-flight test cases of a cancelled run as skipped."""
+        for progress in self.models.values():
+            progress.skipped += progress.queued + progress.in_flight
+            progress.queued = progress.in_flight = 0
+
+    def log(self, message: str) -> None:
+        """Print a message without breaking the live view."""
+        if self.live and self._task is not None:
+            self._clear()
+            self._write(message)
+            self._draw()
+        else:
+            self._write(message)
+
+    def _write(self, text: str) -> None:
+        self.stream.write(text + "\n")
+        self.stream.flush()
+
+    def _totals(self) -> tuple:
+        done = sum(p.completed + p.skipped for p in self.models.values())
+        total = done + sum(p.queued + p.in_flight for p in self.models.values())
+        return done, total
+
+    def rate(self) -> float:
+        """Get the rolling number of finished test cases per second."""
+        now = self.clock()
+        while self._finished_at and self._finished_at[0] < now - self.window:
+            self._finished_at.popleft()
+        elapsed = min(self.window, now - self.started_at)
+        return len(self._finished_at) / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> Optional[float]:
+        """Get the estimated seconds until all queued test cases finish."""
+        done, total = self._totals()
+        rate = self.rate()
+        if done == total:
+            return 0.0
+        return (total - done) / rate if rate > 0 else None
+
+    def bottleneck(self) -> Optional[str]:
+        """Get the provider with the most estimated remaining work."""
+        remaining: Dict[str, float] = {}
+        for progress in self.models.values():
+            pending = progress.queued + progress.in_flight
+            if not pending:
+                continue
+            latency = float(np.median(progress.durations)) if progress.durations else 1.0
+            remaining[progress.provider] = remaining.get(progress.provider, 0.0) + pending * latency
+        return max(remaining, key=remaining.get) if remaining else None
+
+    def _percentiles(self) -> tuple:
+        durations = [d for p in self.models.values() for d in p.durations]
+        if not durations:
+            return 0.0, 0.0
+        p50, p95 = np.percentile(durations, [50, 95])
+        return float(p50), float(p95)
+
+    def summary_line(self) -> str:
+        """Get a one-line summary of the run so far."""
+        done, total = self._totals()
+        in_flight = sum(p.in_flight for p in self.models.values())
+        backoffs = sum(p.backoffs for p in self.models.values())
+        p50, p95 = self._percentiles()
+        eta = self.eta()
+        line = (
+            f"{done}/{total} done, {in_flight} in flight, {self.rate():.2f} req/s, "
+            f"p50 {p50:.2f}s, p95 {p95:.2f}s, {backoffs} backoffs, "
+            f"ETA {'-' if eta is None else f'{eta:.0f}s'}"
+        )
+        if skipped := sum(p.skipped for p in self.models.values()):
+            line += f", {skipped} skipped"
+        if bottleneck := self.bottleneck():
+            line += f", bottleneck: {bottleneck}"
+        return line
+
+    def render(self) -> List[str]:
+        """Render the per-model table and summary line."""
+        lines = [
+            f"{'Model':<45} {'Done':>5} {'Run':>4} {'Queue':>5} {'Fail':>4} {'Backoff':>7} {'P50 (s)':>8}",
+        ]
+        bottleneck = self.bottleneck()
+        for model, progress in sorted(self.models.items()):
+            p50 = float(np.median(progress.durations)) if progress.durations else 0.0
+            marker = " *" if progress.provider == bottleneck and (progress.queued or progress.in_flight) else ""
+            lines.append(
+                f"{model[:45]:<45} {progress.completed:>5} {progress.in_flight:>4} {progress.queued:>5} "
+                f"{progress.failed:>4} {progress.backoffs:>7} {p50:>8.2f}{marker}"
+            )
+        lines.append(self.summary_line())
+        return lines
+
+    def _clear(self) -> None:
+        if self._drawn_lines:
+            # Move to the first line of the view and clear to the end of the screen
+            self.stream.write(f"\x1b[{self._drawn_lines}F\x1b[J")
+            self._drawn_lines = 0
+
+    def _draw(self) -> None:
+        self._clear()
+        lines = self.render()
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+        self._drawn_lines = len(lines)
+
+    async def _refresh(self) -> None:
+        while True:
+            if self.live:
+                self._draw()
+                await asyncio.sleep(self.interval)
+            else:
+                await asyncio.sleep(self.log_interval)
+                self._write(f"progress: {self.summary_line()}")
+
+    def start(self) -> None:
+        """Start refreshing the view in the background."""
+        self.started_at = self.clock()
+        if self._task is None:
+            self._task = asyncio.create_task(self._refresh())
+
+    async def stop(self) -> None:
+        """Stop refreshing and leave the final state on screen."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.live:
+            self._draw()
+            self._drawn_lines = 0
+        else:
+            self._write(f"progress: {self.summary_line()}")
@@ -0,0 +1,294 @@
+"""
+Columnar in-memory storage for test results.
+
+At dataset scale the per-object overhead of pydantic TestResult models
+dominates memory and serialization time. ResultBuffer keeps results in
+array-backed columns with interned model and test case names and holds
+responses by reference. TestResult objects are only built on request at
+API and serialization boundaries.
+"""
+
+import math
+from array import array
+from datetime import datetime, UTC
+from typing import Any, Dict, Iterable, List, Optional
+
+class StringTable:
+    """Interned strings addressed by small integer ids."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        """Get the id of a string, adding it if needed."""
+        if (idx := self._ids.get(value)) is None:
+            idx = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+    def id_of(self, value: str) -> Optional[int]:
+        """Get the id of a string without adding it."""
+        return self._ids.get(value)
+
+    def __getitem__(self, idx: int) -> str:
+        return self.values[idx]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+class ResultBuffer:
+    """Append-only columnar store of test results."""
+
+    def __init__(self):
+        self.models = StringTable()
+        self.test_cases = StringTable()
+        self.routes = StringTable()
+        self.runs = StringTable()
+
+        # Numeric columns
+        self.model_ids = array("I")
+        self.test_case_ids = array("I")
+        self.route_ids = array("i")  # -1 when no route was recorded
+        self.run_ids = array("i")  # -1 when no run id was given
+        self.success = array("B")
+        self.skipped = array("B")
+        self.durations = array("d")
+        self.validation_times = array("d")  # NaN when not a structured result
+        self.retries = array("I")
+        self.request_tokens = array("i")  # -1 when not reported
+        self.response_tokens = array("i")  # -1 when not reported
+        self.cached_tokens = array("i")  # -1 when not reported
+        self.ttfts = array("d")  # NaN when the response was not streamed
+        self.loop_lags = array("d")  # NaN when the event loop was not monitored
+        self.tool_calls = array("i")  # -1 when not a tool-use test case
+        self.model_turns = array("i")  # -1 when not a tool-use test case
+        self.code_passed = array("i")  # -1 when the code was not checked
+        self.code_total = array("i")  # -1 when the code was not checked
+        self.code_times = array("d")  # NaN when the code was not checked
+        self.timestamps = array("d")  # POSIX seconds, UTC
+        self.response_lengths = array("I")
+
+        # Object columns, held by reference
+        self.responses: List[Optional[str]] = []
+        self.response_hashes: List[Optional[str]] = []
+        self.errors: List[Optional[str]] = []
+        self.turn_durations: List[Optional[List[float]]] = []  # Per-turn latency of multi-turn test cases
+        self.turn_context_tokens: List[Optional[List[Optional[int]]]] = []
+        self.tool_round_trips: List[Optional[List[float]]] = []  # Tool round trip latency of tool-use test cases
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    def append_row(
+        self,
+        model: str,
+        test_case: str,
+        success: bool,
+        duration: float,
+        response: Optional[str] = None,
+        response_hash: Optional[str] = None,
+        route: Optional[str] = None,
+        error: Optional[str] = None,
+        validation_time: Optional[float] = None,
+        retries: int = 0,
+        skipped: bool = False,
+        request_tokens: Optional[int] = None,
+        response_tokens: Optional[int] = None,
+        cached_tokens: Optional[int] = None,
+        ttft: Optional[float] = None,
+        loop_lag: Optional[float] = None,
+        turn_durations: Optional[List[float]] = None,
+        turn_context_tokens: Optional[List[Optional[int]]] = None,
+        tool_calls: Optional[int] = None,
+        model_turns: Optional[int] = None,
+        tool_round_trips: Optional[List[float]] = None,
+        code_passed: Optional[int] = None,
+        code_total: Optional[int] = None,
+        code_time: Optional[float] = None,
+        timestamp: Optional[datetime] = None,
+        run: Optional[str] = None,
+        response_length: Optional[int] = None
+    ) -> int:
+        """Append a result from raw fields.
+
+        Args:
+            run: Identifier of the run the result belongs to
+            response_length: Length of the response, for rows loaded without the response text
+
+        Returns:
+            Row index of the appended result
+        """
+        self.model_ids.append(self.models.intern(model))
+        self.test_case_ids.append(self.test_cases.intern(test_case))
+        self.route_ids.append(self.routes.intern(route) if route else -1)
+        self.success.append(1 if success else 0)
+        self.skipped.append(1 if skipped else 0)
+        self.durations.append(duration)
+        self.validation_times.append(math.nan if validation_time is None else validation_time)
+        self.retries.append(retries)
+        self.request_tokens.append(-1 if request_tokens is None else request_tokens)
+        self.response_tokens.append(-1 if response_tokens is None else response_tokens)
+        self.cached_tokens.append(-1 if cached_tokens is None else cached_tokens)
+        self.ttfts.append(math.nan if ttft is None else ttft)
+        self.loop_lags.append(math.nan if loop_lag is None else loop_lag)
+        self.tool_calls.append(-1 if tool_calls is None else tool_calls)
+        self.model_turns.append(-1 if model_turns is None else model_turns)
+        self.code_passed.append(-1 if code_passed is None else code_passed)
+        self.code_total.append(-1 if code_total is None else code_total)
+        self.code_times.append(math.nan if code_time is None else code_time)
+        self.run_ids.append(self.runs.intern(run) if run else -1)
+        self.timestamps.append((timestamp or datetime.now(UTC)).timestamp())
+        if response_length is None:
+            response_length = len(response) if response else 0
+        self.response_lengths.append(response_length)
+        self.responses.append(response)
+        self.response_hashes.append(response_hash)
+        self.errors.append(error)
+        self.turn_durations.append(turn_durations)
+        self.turn_context_tokens.append(turn_context_tokens)
+        self.tool_round_trips.append(tool_round_trips)
+        return len(self) - 1
+
+    def append(self, result: Any, run: Optional[str] = None) -> int:
+        """Append a TestResult (or any object with the same attributes)."""
+        return self.append_row(
+            model=result.model,
+            test_case=result.test_case,
+            success=result.success,
+            duration=result.duration,
+            response=result.response,
+            response_hash=result.response_hash,
+            route=result.route,
+            error=result.error,
+            validation_time=result.validation_time,
+            retries=result.retries,
+            skipped=result.skipped,
+            request_tokens=result.request_tokens,
+            response_tokens=result.response_tokens,
+            cached_tokens=result.cached_tokens,
+            ttft=result.ttft,
+            loop_lag=result.loop_lag,
+            turn_durations=result.turn_durations,
+            turn_context_tokens=result.turn_context_tokens,
+            tool_calls=result.tool_calls,
+            model_turns=result.model_turns,
+            tool_round_trips=result.tool_round_trips,
+            code_passed=result.code_passed,
+            code_total=result.code_total,
+            code_time=result.code_time,
+            timestamp=result.timestamp,
+            run=run
+        )
+
+    @classmethod
+    def from_results(cls, results: Iterable[Any]) -> "ResultBuffer":
+        """Build a buffer from TestResult objects."""
+        buffer = cls()
+        for result in results:
+            buffer.append(result)
+        return buffer
+
+    def rows_for_model(self, model: str) -> List[int]:
+        """Get the row indices of a model's results, in insertion order."""
+        model_id = self.models.id_of(model)
+        if model_id is None:
+            return []
+        return [i for i, mid in enumerate(self.model_ids) if mid == model_id]
+
+    def row(self, idx: int) -> Dict[str, Any]:
+        """Get a single row as a dict of TestResult fields."""
+        route_id = self.route_ids[idx]
+        validation_time = self.validation_times[idx]
+        request_tokens = self.request_tokens[idx]
+        response_tokens = self.response_tokens[idx]
+        cached_tokens = self.cached_tokens[idx]
+        ttft = self.ttfts[idx]
+        loop_lag = self.loop_lags[idx]
+        tool_calls = self.tool_calls[idx]
+        model_turns = self.model_turns[idx]
+        code_total = self.code_total[idx]
+        return {
+            "model": self.models[self.model_ids[idx]],
+            "test_case": self.test_cases[self.test_case_ids[idx]],
+            "success": bool(self.success[idx]),
+            "response": self.responses[idx],
+            "response_hash": self.response_hashes[idx],
+            "route": self.routes[route_id] if route_id >= 0 else None,
+            "error": self.errors[idx],
+            "duration": self.durations[idx],
+            "validation_time": None if math.isnan(validation_time) else validation_time,
+            "retries": self.retries[idx],
+            "skipped": bool(self.skipped[idx]),
+            "request_tokens": request_tokens if request_tokens >= 0 else None,
+            "response_tokens": response_tokens if response_tokens >= 0 else None,
+            "cached_tokens": cached_tokens if cached_tokens >= 0 else None,
+            "ttft": None if math.isnan(ttft) else ttft,
+            "loop_lag": None if math.isnan(loop_lag) else loop_lag,
+            "turn_durations": self.turn_durations[idx],
+            "turn_context_tokens": self.turn_context_tokens[idx],
+            "tool_calls": tool_calls if tool_calls >= 0 else None,
+            "model_turns": model_turns if model_turns >= 0 else None,
+            "tool_round_trips": self.tool_round_trips[idx],
+            "code_passed": self.code_passed[idx] if code_total >= 0 else None,
+            "code_total": code_total if code_total >= 0 else None,
+            "code_time": self.code_times[idx] if code_total >= 0 else None,
+            "timestamp": datetime.fromtimestamp(self.timestamps[idx], UTC)
+        }
+
+    def to_records(self, indices: Optional[Iterable[int]] = None, include_response: bool = False) -> List[Dict[str, Any]]:
+        """Get rows as JSON-ready dicts without building pydantic models.
+
+        Timestamps are formatted the way json.dump(default=str) formats datetimes.
+
+        Args:
+            indices: Rows to include (default: all)
+            include_response: Include the full response text
+
+        Returns:
+            List of dicts
+        """
+        records = []
+        for idx in range(len(self)) if indices is None else indices:
+            record = self.row(idx)
+            record["timestamp"] = str(record["timestamp"])
+            # Kept so aggregation over history doesn't need the response text
+            record["response_length"] = self.response_lengths[idx]
+            if not include_response:
+                del record["response"]
+            records.append(record)
+        return records
+
+    def to_results(self, result_cls: type, indices: Optional[Iterable[int]] = None) -> List[Any]:
+        """Build result objects for the given rows.
+
+        Args:
+            result_cls: The pydantic result model (TestResult)
+            indices: Rows to include (default: all)
+        """
+        return [
+            result_cls.model_construct(**self.row(idx))
+            for idx in (range(len(self)) if indices is None else indices)
+        ]
+
+    def rows_by_model(self) -> Dict[str, List[int]]:
+        """Get the row indices of every model's results in one pass, in first-seen model order."""
+        grouped: Dict[int, List[int]] = {}
+        for idx, model_id in enumerate(self.model_ids):
+            grouped.setdefault(model_id, []).append(idx)
+        return {self.models[mid]: rows for mid, rows in grouped.items()}
+
+    def by_model(self, result_cls: type) -> Dict[str, List[Any]]:
+        """Build result objects grouped by model, in first-seen model order."""
+        return {model: self.to_results(result_cls, rows) for model, rows in self.rows_by_model().items()}
+
+    def nbytes(self) -> int:
+        """Approximate size of the numeric columns in bytes."""
+        columns = (
+            self.model_ids, self.test_case_ids, self.route_ids, self.run_ids, self.success, self.skipped,
+            self.durations, self.validation_times, self.retries, self.request_tokens,
+            self.response_tokens, self.cached_tokens, self.ttfts, self.loop_lags,
+            self.tool_calls, self.model_turns, self.code_passed, self.code_total, self.code_times,
+            self.timestamps, self.response_lengths
+        )
+        return sum(column.itemsize * len(column) for column in columns)
@@ -0,0 +1,120 @@
+"""
+Latency-aware routing for models reachable through several providers.
+
+The router keeps an EWMA of latency and error rate for every
+(base model, provider) route, sends each request to the fastest healthy
+route and falls back to the remaining routes when a request fails.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+class RouteStats(BaseModel):
+    """Running performance statistics for a single route."""
+    model: str
+    base_name: str
+    requests: int = 0
+    failures: int = 0
+    ewma_latency: Optional[float] = None
+    ewma_error_rate: float = 0.0
+    unhealthy_since: Optional[float] = None  # time.monotonic() when marked unhealthy
+
+class ModelRouter:
+    """Pick the fastest healthy route per base model."""
+
+    def __init__(self, alpha: float = 0.3, error_threshold: float = 0.5, cooldown: float = 60.0):
+        """Initialize the router.
+
+        Args:
+            alpha: EWMA smoothing factor for latency and error rate
+            error_threshold: Routes whose error-rate EWMA reaches this are unhealthy
+            cooldown: Seconds before an unhealthy route is tried first again
+        """
+        self.alpha = alpha
+        self.error_threshold = error_threshold
+        self.cooldown = cooldown
+        self.routes: Dict[str, List[str]] = {}
+        self.stats: Dict[str, RouteStats] = {}
+
+    def add_route(self, base_name: str, model: str) -> None:
+        """Register a full model name as a route for a base model."""
+        if model in self.stats:
+            return
+        self.routes.setdefault(base_name, []).append(model)
+        self.stats[model] = RouteStats(model=model, base_name=base_name)
+
+    def has_alternatives(self) -> bool:
+        """Check whether any base model has more than one route."""
+        return any(len(routes) > 1 for routes in self.routes.values())
+
+    def _is_healthy(self, stats: RouteStats) -> bool:
+        if stats.unhealthy_since is None:
+            return True
+        # Let an unhealthy route compete again after the cooldown
+        return time.monotonic() - stats.unhealthy_since >= self.cooldown
+
+    def ranked_routes(self, base_name: str) -> List[str]:
+        """Get the routes for a base model in the order they should be tried.
+
+        Healthy routes come first, fastest first; routes without measurements
+        are tried before measured ones so every route gets explored. Unhealthy
+        routes follow as a last resort.
+
+        Args:
+            base_name: The base model name
+
+        Returns:
+            Full model names ordered by preference
+        """
+        stats = [self.stats[model] for model in self.routes.get(base_name, [])]
+        healthy = [s for s in stats if self._is_healthy(s)]
+        unhealthy = [s for s in stats if not self._is_healthy(s)]
+        healthy.sort(key=lambda s: (s.ewma_latency is not None, s.ewma_latency or 0.0))
+        unhealthy.sort(key=lambda s: s.ewma_error_rate)
+        return [s.model for s in healthy + unhealthy]
+
+    def record(self, model: str, latency: float, success: bool) -> None:
+        """Record the outcome of a request sent through a route.
+
+        Args:
+            model: Full model name of the route
+            latency: Request duration in seconds
+            success: Whether the request succeeded
+        """
+        stats = self.stats[model]
+        stats.requests += 1
+        error = 0.0 if success else 1.0
+        stats.ewma_error_rate = self.alpha * error + (1 - self.alpha) * stats.ewma_error_rate
+        if success:
+            stats.ewma_latency = latency if stats.ewma_latency is None else (
+                self.alpha * latency + (1 - self.alpha) * stats.ewma_latency
+            )
+        else:
+            stats.failures += 1
+
+        if stats.ewma_error_rate >= self.error_threshold:
+            if stats.unhealthy_since is None or self._is_healthy(stats):
+                stats.unhealthy_since = time.monotonic()
+        elif success:
+            stats.unhealthy_since = None
+
+    def generate_route_table(self) -> str:
+        """Generate a markdown table of per-route performance."""
+        headers = ["Base Model", "Route", "Requests", "Failures", "EWMA Latency (s)", "EWMA Error Rate", "Status"]
+        rows = ["| " + " | ".join(headers) + " |", "|" + "|".join("---" for _ in headers) + "|"]
+        for base_name, models in sorted(self.routes.items()):
+            for model in self.ranked_routes(base_name):
+                stats = self.stats[model]
+                row = [
+                    base_name,
+                    model,
+                    str(stats.requests),
+                    str(stats.failures),
+                    f"{stats.ewma_latency:.2f}" if stats.ewma_latency is not None else "-",
+                    f"{stats.ewma_error_rate:.2f}",
+                    "healthy" if self._is_healthy(stats) else "unhealthy"
+                ]
+                rows.append("| " + " | ".join(row) + " |")
+        return "\n".join(rows)
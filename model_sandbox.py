@@ -0,0 +1,365 @@
+"""
+Sandboxed execution of generated code as a functional check.
+
+Fenced ```python blocks are extracted from a response and run together
+with hidden unit tests for the test case in a separate, isolated Python
+process with CPU time, memory and wall-clock limits. Checks run in
+parallel, one subprocess per check, bounded by the number of CPU cores.
+
+Hidden tests can't know the names the model picked, so they look up
+functions and classes in the executed namespace by shape (e.g. a class
+with an insert method).
+"""
+
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+try:
+    import resource
+except ImportError:  # Not available on Windows, limits are skipped there
+    resource = None
+
+_CODE_BLOCK = re.compile(r"```(?:python|py)[^\n]*\n(.*?)```", re.DOTALL)
+
+class CodeCheckResult(BaseModel):
+    """Outcome of running hidden tests against generated code."""
+    passed: int = 0
+    total: int = 0
+    duration: float = 0.0  # Wall-clock execution time in seconds
+    error: Optional[str] = None
+
+    @property
+    def pass_rate(self) -> float:
+        return self.passed / self.total if self.total else 0.0
+
+def extract_code_blocks(text: str) -> List[str]:
+    """Get the contents of the fenced Python code blocks of a response."""
+    return [block.strip("\n") for block in _CODE_BLOCK.findall(text or "")]
+
+# Runs in the sandboxed process: executes the solution, then every test_* function
+_RUNNER = r'''
+import json, sys, types
+
+# Generated stores may import redis; give them an in-memory stand-in
+class _FakeRedis:
+    def __init__(self, *args, **kwargs):
+        self._data = {}
+    def get(self, key):
+        value = self._data.get(key)
+        return value.encode() if isinstance(value, str) else value
+    def set(self, key, value, *args, **kwargs):
+        self._data[key] = value
+        return True
+    def delete(self, *keys):
+        return sum(1 for key in keys if self._data.pop(key, None) is not None)
+    def exists(self, *keys):
+        return sum(1 for key in keys if key in self._data)
+    def keys(self, pattern="*"):
+        return [key.encode() if isinstance(key, str) else key for key in self._data]
+    def ping(self):
+        return True
+_redis = types.ModuleType("redis")
+_redis.Redis = _redis.StrictRedis = _FakeRedis
+_redis.from_url = lambda *args, **kwargs: _FakeRedis()
+_redis.RedisError = _redis.ConnectionError = Exception
+_redis.exceptions = types.SimpleNamespace(RedisError=Exception, ConnectionError=Exception)
+sys.modules["redis"] = _redis
+
+payload = json.loads(sys.stdin.read())
+ns = {"__name__": "solution"}
+try:
+    exec(compile(payload["solution"], "solution.py", "exec"), ns)
+except BaseException as e:
+    print(json.dumps({"passed": 0, "total": 0, "error": f"solution failed: {type(e).__name__}: {e}"}))
+    sys.exit(0)
+
+tests = {}
+exec(compile(payload["tests"], "hidden_tests.py", "exec"), tests)
+passed, total, errors = 0, 0, []
+for name, test in tests.items():
+    if not name.startswith("test_") or not callable(test):
+        continue
+    total += 1
+    try:
+        test(ns)
+        passed += 1
+    except BaseException as e:
+        errors.append(f"{name}: {type(e).__name__}: {e}")
+print(json.dumps({"passed": passed, "total": total, "error": "; ".join(errors) or None}))
+'''
+
+_HELPERS = r'''
+import inspect
+
+def find_function(ns, arity):
+    for value in ns.values():
+        if inspect.isfunction(value) and value.__module__ == "solution":
+            params = [p for p in inspect.signature(value).parameters.values()
+                      if p.default is p.empty and p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)]
+            if len(params) == arity:
+                return value
+    raise LookupError(f"no function with {arity} parameters")
+
+def find_class(ns, *methods, exclude_abstract=True):
+    for value in ns.values():
+        if inspect.isclass(value) and value.__module__ == "solution" and all(hasattr(value, m) for m in methods):
+            if exclude_abstract and inspect.isabstract(value):
+                continue
+            return value
+    raise LookupError(f"no class with {', '.join(methods)}")
+
+def method(obj, *names):
+    for name in names:
+        if callable(getattr(obj, name, None)):
+            return getattr(obj, name)
+    raise LookupError(f"no method named {' or '.join(names)}")
+'''
+
+# Hidden tests per test case, each test_* function gets the solution namespace
+HIDDEN_TESTS: Dict[str, str] = {
+    "code_generation": _HELPERS + r'''
+def test_adds_integers(ns):
+    add = find_function(ns, 2)
+    assert add(2, 3) == 5
+    assert add(-4, 4) == 0
+
+def test_adds_floats(ns):
+    assert abs(find_function(ns, 2)(0.1, 0.2) - 0.3) < 1e-9
+''',
+    "complex_code": _HELPERS + r'''
+import random
+
+def _tree(ns):
+    cls = find_class(ns, "insert")
+    tree = cls()
+    keys = random.Random(1).sample(range(1000), 200)
+    for key in keys:
+        tree.insert(key)
+    return tree, keys
+
+def _children(node):
+    return getattr(node, "left", None), getattr(node, "right", None)
+
+def _is_nil(node):
+    return node is None or getattr(node, "key", getattr(node, "value", None)) is None
+
+def _is_red(node):
+    if _is_nil(node):
+        return False
+    color = getattr(node, "color", getattr(node, "colour", None))
+    if color is None:
+        return bool(getattr(node, "red", False))
+    return str(getattr(color, "name", color)).lower() in ("red", "r", "1", "true")
+
+def _key(node):
+    return getattr(node, "key", getattr(node, "value", None))
+
+def _in_order(node, out):
+    if _is_nil(node):
+        return out
+    left, right = _children(node)
+    _in_order(left, out)
+    out.append(_key(node))
+    _in_order(right, out)
+    return out
+
+def _black_height(node):
+    if _is_nil(node):
+        return 1
+    left, right = _children(node)
+    if _is_red(node):
+        assert not _is_red(left) and not _is_red(right), "red node with red child"
+    lh, rh = _black_height(left), _black_height(right)
+    assert lh == rh, "unequal black heights"
+    return lh + (0 if _is_red(node) else 1)
+
+def test_in_order_traversal_is_sorted(ns):
+    tree, keys = _tree(ns)
+    assert _in_order(tree.root, []) == sorted(keys)
+
+def test_root_is_black(ns):
+    tree, _ = _tree(ns)
+    assert not _is_red(tree.root)
+
+def test_red_black_invariants(ns):
+    tree, _ = _tree(ns)
+    _black_height(tree.root)
+''',
+    "problem_solving": _HELPERS + r'''
+import random, statistics
+
+def _median_finder(ns):
+    for candidate in [v for v in ns.values() if isinstance(v, type) and v.__module__ == "solution"]:
+        try:
+            finder = candidate()
+            add = method(finder, "add_num", "addNum", "add", "insert", "add_number", "push")
+            median = method(finder, "find_median", "findMedian", "get_median", "median")
+            return add, median
+        except (LookupError, TypeError):
+            continue
+    raise LookupError("no median finder")
+
+def test_median_of_stream(ns):
+    add, median = _median_finder(ns)
+    values = random.Random(2).choices(range(-100, 100), k=301)
+    for i, value in enumerate(values, 1):
+        add(value)
+        if i % 50 == 1 or i == len(values):
+            assert float(median()) == float(statistics.median(values[:i]))
+
+def test_even_count_median(ns):
+    add, median = _median_finder(ns)
+    for value in (5, 1, 3, 2):
+        add(value)
+    assert float(median()) == 2.5
+''',
+    "key_value_store": _HELPERS + r'''
+import os, tempfile
+
+def _local_store(ns):
+    candidates = [v for v in ns.values() if isinstance(v, type) and v.__module__ == "solution"
+                  and not inspect.isabstract(v) and "redis" not in v.__name__.lower()
+                  and any(callable(getattr(v, m, None)) for m in ("get", "get_value"))]
+    path = os.path.join(tempfile.mkdtemp(), "store.json")
+    for cls in candidates:
+        for args in ((path,), (), (os.path.dirname(path),)):
+            try:
+                return cls(*args)
+            except Exception:
+                continue
+    raise LookupError("no constructible local store")
+
+def test_local_store_round_trip(ns):
+    store = _local_store(ns)
+    put = method(store, "set", "put", "set_value", "store")
+    get = method(store, "get", "get_value")
+    put("answer", "42")
+    assert get("answer") in ("42", 42)
+
+def test_local_store_delete(ns):
+    store = _local_store(ns)
+    method(store, "set", "put", "set_value", "store")("key", "value")
+    method(store, "delete", "remove", "delete_value")("key")
+    try:
+        assert method(store, "get", "get_value")("key") is None
+    except KeyError:
+        pass
+''',
+}
+
+def prepare_solution(blocks: List[str]) -> str:
+    """Join code blocks into one module.
+
+    Imports between the generated files (e.g. `from src.store... import`)
+    are dropped since all blocks share one namespace.
+    """
+    lines = []
+    for block in blocks:
+        for line in block.splitlines():
+            if re.match(r"\s*from\s+(src|store|\.)[\w.]*\s+import\b", line) or re.match(r"\s*import\s+src\b", line):
+                continue
+            lines.append(line)
+        lines.append("")
+    return "\n".join(lines)
+
+class CodeChecker:
+    """Runs hidden tests against generated code in sandboxed subprocesses."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        timeout: float = 10.0,
+        cpu_seconds: int = 5,
+        memory_mb: int = 512
+    ):
+        """Initialize the checker.
+
+        Args:
+            workers: Checks run at once (default: number of CPU cores)
+            timeout: Wall-clock limit per check in seconds
+            cpu_seconds: CPU time limit per check
+            memory_mb: Address space limit per check
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self._semaphore = asyncio.Semaphore(self.workers)
+
+    def supports(self, test_case: str) -> bool:
+        """Check if a test case has hidden tests."""
+        return test_case in HIDDEN_TESTS
+
+    def _limit_resources(self) -> None:
+        # Runs in the child before exec
+        os.setsid()
+        if resource is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, (self.cpu_seconds, self.cpu_seconds))
+            memory = self.memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+            resource.setrlimit(resource.RLIMIT_FSIZE, (10 * 1024 * 1024, 10 * 1024 * 1024))
+
+    async def check(self, test_case: str, response: str) -> CodeCheckResult:
+        """Run the hidden tests of a test case against a response.
+
+        Args:
+            test_case: Test case name, must have hidden tests
+            response: The model's markdown response
+
+        Returns:
+            CodeCheckResult with the number of passed tests and execution time
+        """
+        blocks = extract_code_blocks(response)
+        total = HIDDEN_TESTS[test_case].count("\ndef test_")
+        if not blocks:
+            return CodeCheckResult(total=total, error="no python code blocks")
+        payload = json.dumps({"solution": prepare_solution(blocks), "tests": HIDDEN_TESTS[test_case]})
+
+        async with self._semaphore:
+            with tempfile.TemporaryDirectory() as workdir:
+                start = time.perf_counter()
+                process = await asyncio.create_subprocess_exec(
+                    sys.executable, "-I", "-c", _RUNNER,
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=workdir,
+                    env={"PATH": os.environ.get("PATH", ""), "HOME": workdir, "TMPDIR": workdir},
+                    preexec_fn=self._limit_resources if os.name == "posix" else None
+                )
+                try:
+                    stdout, _ = await asyncio.wait_for(process.communicate(payload.encode()), self.timeout)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+                    return CodeCheckResult(total=total, duration=time.perf_counter() - start,
+                                           error=f"timed out after {self.timeout:.0f}s")
+                finally:
+                    if process.returncode is None:
+                        process.kill()
+                        await process.wait()
+                duration = time.perf_counter() - start
+
+        lines = stdout.decode(errors="replace").strip().splitlines()
+        try:
+            outcome = json.loads(lines[-1])
+        except (IndexError, ValueError):
+            if process.returncode is not None and process.returncode < 0:
+                error = f"killed by signal {-process.returncode} (CPU or memory limit)"
+            else:
+                error = f"sandbox exited with code {process.returncode}"
+            return CodeCheckResult(total=total, duration=duration, error=error)
+        return CodeCheckResult(
+            passed=outcome["passed"],
+            total=outcome["total"] or total,
+            duration=duration,
+            error=outcome["error"]
+        )
@@ -0,0 +1,115 @@
+"""
+Makespan-aware ordering of test jobs.
+
+Each (model, test case) job gets a duration estimate from recorded
+history. Jobs are started longest-processing-time first (LPT) within each
+provider's concurrency limit, so slow jobs don't start last and extend the
+tail of the run. The plan's makespan is simulated for LPT and for plain
+list order so it can be compared with the actual run time.
+"""
+
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Estimate used for jobs without any recorded durations
+DEFAULT_ESTIMATE = 10.0
+
+Job = Tuple[str, str]  # (model, test case)
+
+def simulate_makespan(durations: Sequence[float], workers: int) -> float:
+    """Simulate list scheduling of durations, in order, on identical workers.
+
+    Args:
+        durations: Job durations in start order
+        workers: Number of jobs that can run at once
+
+    Returns:
+        Time until the last job finishes
+    """
+    finish_times = [0.0] * max(workers, 1)
+    for duration in durations:
+        heapq.heappush(finish_times, heapq.heappop(finish_times) + duration)
+    return max(finish_times)
+
+def estimate_durations(
+    jobs: Sequence[Job],
+    recorded: Dict[str, Dict[str, float]],
+    default: float = DEFAULT_ESTIMATE,
+    predicted: Optional[Dict[Job, float]] = None
+) -> Dict[Job, float]:
+    """Estimate job durations from recorded per-test-case durations.
+
+    Falls back to the duration predicted by the model's fitted latency
+    model, then to the model's mean recorded duration, then to the test
+    case's mean across models, then to the default.
+
+    Args:
+        jobs: Jobs to estimate
+        recorded: Recorded duration per test case, per model
+        default: Estimate for jobs without any related history
+        predicted: Predicted duration of jobs whose model has a latency model
+
+    Returns:
+        Estimated duration per job
+    """
+    by_case: Dict[str, List[float]] = {}
+    for durations in recorded.values():
+        for test_case, duration in durations.items():
+            by_case.setdefault(test_case, []).append(duration)
+
+    predicted = predicted or {}
+    estimates = {}
+    for model, test_case in jobs:
+        model_durations = recorded.get(model, {})
+        if test_case in model_durations:
+            estimates[(model, test_case)] = model_durations[test_case]
+        elif (model, test_case) in predicted:
+            estimates[(model, test_case)] = predicted[(model, test_case)]
+        elif model_durations:
+            estimates[(model, test_case)] = sum(model_durations.values()) / len(model_durations)
+        elif test_case in by_case:
+            estimates[(model, test_case)] = sum(by_case[test_case]) / len(by_case[test_case])
+        else:
+            estimates[(model, test_case)] = default
+    return estimates
+
+class SchedulePlan:
+    """LPT plan of a run, grouped by provider."""
+
+    def __init__(self, estimates: Dict[Job, float], providers: Dict[Job, str], workers: Dict[str, int]):
+        """Initialize the plan.
+
+        Args:
+            estimates: Estimated duration per job
+            providers: Provider whose concurrency limit gates each job
+            workers: Concurrency limit per provider at planning time
+        """
+        self.estimates = estimates
+        self.workers = workers
+        self.jobs: Dict[str, List[Job]] = {}
+        for job in estimates:
+            self.jobs.setdefault(providers[job], []).append(job)
+
+    def priority(self, model: str, test_case: str) -> float:
+        """Get the start priority of a job; longer jobs start first."""
+        return self.estimates.get((model, test_case), 0.0)
+
+    def planned_makespan(self, lpt: bool = True) -> float:
+        """Simulate the run's makespan with LPT or list (insertion) order."""
+        makespan = 0.0
+        for provider, jobs in self.jobs.items():
+            durations = [self.estimates[job] for job in jobs]
+            if lpt:
+                durations.sort(reverse=True)
+            makespan = max(makespan, simulate_makespan(durations, self.workers.get(provider, 1)))
+        return makespan
+
+    def generate_table(self, actual: float) -> str:
+        """Generate a markdown table comparing planned and actual makespan."""
+        rows = [
+            "| Jobs | Planned (LPT) (s) | Planned (List Order) (s) | Actual (s) |",
+            "|---|---|---|---|",
+            f"| {len(self.estimates)} | {self.planned_makespan():.2f} | "
+            f"{self.planned_makespan(lpt=False):.2f} | {actual:.2f} |"
+        ]
+        return "\n".join(rows)
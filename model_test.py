@@ -14,24 +14,73 @@ Usage:
 import argparse
 import asyncio
 import json
+import math
 import os
+import re
+import time
 from datetime import datetime, UTC
 from enum import Enum
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
 
+import aiohttp
 import logfire
+import numpy as np
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
 
 from model_utils import (
+    MODEL_REGISTRY,
     KnownModelName,
     get_model_by_provider,
     get_latest_model,
-    get_model_info
+    get_model_info,
+    get_routes
 )
-from model_agents import create_test_agent, run_test
+from model_agents import create_test_agent, run_conversation, run_test, run_tool_task
+from model_artifacts import ArtifactStore
+from model_export import ResultExporter
+from model_latency import (
+    BENCHMARK_SIZES,
+    BENCHMARK_SYSTEM_PROMPT,
+    DEFAULT_CONTEXT_WINDOW,
+    LatencyModel,
+    LatencySample,
+    benchmark_sizes,
+    build_prompt,
+    estimate_tokens,
+    fit_latency_model,
+    generate_benchmark_table,
+    generate_model_table,
+    load_latency_models,
+    predict_latency,
+    register_latency_model,
+    save_latency_models
+)
+from model_breaker import CIRCUIT_OPEN_ERROR, BreakerTransition, CircuitBreakers
+from model_mock import MOCK_URL_ENV, PROFILES as MOCK_PROFILES, register_mock_models
+from model_batch import BATCH_BACKENDS, BatchJob, get_batch_backend, run_batch
+from model_concurrency import CANCELLED, TRANSIENT_OUTCOMES, ConcurrencyController, classify_error
+from model_metrics import GROUP_KEYS, aggregate, column
+from model_monitor import (
+    DEFAULT_PROBE_INTERVAL,
+    DEFAULT_WINDOWS,
+    Alert,
+    AlertThresholds,
+    ProbeMonitor,
+    append_alerts,
+    post_alerts
+)
+from model_lag import UNRELIABLE_FRACTION, UNRELIABLE_LAG, LoopLagMonitor, is_unreliable
+from model_profile import RunProfiler
+from model_progress import ProgressView
+from model_sandbox import CodeChecker
+from model_schedule import SchedulePlan, estimate_durations
+from model_results import ResultBuffer
+from model_routing import ModelRouter
+from model_writer import BackgroundWriter, write_json, write_text
 
 # Load environment variables from .env file
 load_dotenv()
@@ -43,6 +92,10 @@ class TestScenario(str, Enum):
     """Available test scenarios."""
     STANDARD = "standard"  # Basic markdown and reasoning tests
     MULTI_FILE = "multi-file"  # Tests involving multiple file generation
+    STRUCTURED = "structured"  # Structured (JSON/tool) output tests
+    PROMPT_CACHING = "prompt-caching"  # Repeated requests sharing a long prompt prefix
+    MULTI_TURN = "multi-turn"  # Conversations carrying message history across turns
+    TOOL_USE = "tool-use"  # Multi-step tasks solved by calling local tools
 
 class ModelCapabilities(BaseModel):
     """Model capabilities tracking."""
@@ -69,6 +122,10 @@ class TestCase(BaseModel):
     timeout: int = 30  # seconds
     retries: int = 2
     required_capabilities: List[str] = []  # List of required capabilities for this test
+    sequence_group: Optional[str] = None  # Test cases of a group run one after another, in order
+    stream: bool = False  # Stream the response to measure time to first token
+    turns: List[str] = []  # Follow-up user turns sent after the prompt, in one conversation
+    tools: List[str] = []  # Local tools registered on the agent (see model_tools.py)
 
 class TestResult(BaseModel):
     """Results from running a test case."""
@@ -76,8 +133,26 @@ class TestResult(BaseModel):
     test_case: str
     success: bool
     response: Optional[str] = None
+    response_hash: Optional[str] = None  # Content address in the artifact store
+    route: Optional[str] = None  # Full model name of the provider route that served the request
     error: Optional[str] = None
     duration: float
+    validation_time: Optional[float] = None  # Structured result re-validation time in seconds, an estimate of the validation cost
+    retries: int = 0  # Retries requested because of invalid structured output
+    request_tokens: Optional[int] = None  # Prompt tokens reported by the provider
+    response_tokens: Optional[int] = None  # Completion tokens reported by the provider
+    cached_tokens: Optional[int] = None  # Prompt tokens served from the provider's prompt cache
+    ttft: Optional[float] = None  # Time to first token in seconds, for streamed test cases
+    loop_lag: Optional[float] = None  # Largest event loop lag in seconds while the request was in flight
+    turn_durations: Optional[List[float]] = None  # Latency of each turn of a multi-turn test case
+    turn_context_tokens: Optional[List[Optional[int]]] = None  # Cumulative prompt tokens of each turn
+    tool_calls: Optional[int] = None  # Local tool calls made by a tool-use test case
+    model_turns: Optional[int] = None  # Model responses a tool-use test case needed to answer
+    tool_round_trips: Optional[List[float]] = None  # Seconds from each model request to its tool results
+    skipped: bool = False  # Not run: the wall-time budget expired or a circuit breaker was open
+    code_passed: Optional[int] = None  # Hidden tests passed by the generated code
+    code_total: Optional[int] = None  # Hidden tests run against the generated code
+    code_time: Optional[float] = None  # Sandboxed execution time in seconds
     timestamp: datetime = Field(default_factory=lambda: datetime.now(UTC))
 
 class ModelTestHistory(BaseModel):
@@ -91,6 +166,8 @@ class ModelTestHistory(BaseModel):
     failure_count: int = 0
     success_count: int = 0
     known_issues: List[str] = []
+    durations: Dict[str, float] = {}  # Duration EWMA of successful runs per test case
+    breaker_transitions: List[BreakerTransition] = []  # Circuit breaker state changes caused by this model
 
 # Standard test cases
 STANDARD_TESTS = [
@@ -196,28 +273,427 @@ Follow these guidelines:
     )
 ]
 
+# Structured output result types
+class MathSolution(BaseModel):
+    """Step-by-step solution to a math problem."""
+    steps: List[str] = Field(..., description="Solution steps in order")
+    answer: float = Field(..., description="The final numeric answer")
+    unit: Optional[str] = Field(None, description="Unit of the answer, if any")
+
+class FunctionSpec(BaseModel):
+    """A generated Python function."""
+    name: str = Field(..., description="Function name")
+    parameters: List[str] = Field(..., description="Parameter names with type hints")
+    return_type: str = Field(..., description="Return type hint")
+    code: str = Field(..., description="Complete function source code")
+
+class DesignComponent(BaseModel):
+    """A component of a system design."""
+    name: str
+    responsibility: str
+    scales_horizontally: bool
+
+class SystemDesign(BaseModel):
+    """A structured system design."""
+    summary: str
+    components: List[DesignComponent] = Field(..., min_length=2)
+    consistency_model: str
+    failure_modes: List[str]
+
+# Structured output test cases
+STRUCTURED_TESTS = [
+    TestCase(
+        name="structured_math",
+        prompt="If a train travels 120 kilometers in 2 hours, what is its speed in kilometers per hour?",
+        expected_type="json",
+        system_prompt="You are a physics teacher. Solve problems step by step.",
+        result_type=MathSolution,
+        required_capabilities=["json_mode"]
+    ),
+    TestCase(
+        name="structured_function",
+        prompt="Write a Python function that adds two numbers with type hints and a docstring.",
+        expected_type="json",
+        system_prompt="You are a code instructor. Write clean, simple Python code.",
+        result_type=FunctionSpec,
+        required_capabilities=["json_mode"]
+    ),
+    TestCase(
+        name="structured_design",
+        prompt="Design a distributed rate limiter. Consider scalability, fault tolerance, and consistency.",
+        expected_type="json",
+        system_prompt="You are a senior system architect. Provide concise, complete system designs.",
+        result_type=SystemDesign,
+        required_capabilities=["json_mode"]
+    )
+]
+
+# Reference implementation shared by the prompt caching tests. Together with
+# the multi-file system prompt it forms a prefix above the 1024 token minimum
+# of automatic prompt caching (OpenAI, Gemini).
+KEY_VALUE_STORE_REFERENCE = '''
+```python
+# src/store/interfaces/key_value_store.py
+from abc import ABC, abstractmethod
+from typing import Any, Iterator, Optional
+
+
+class KeyValueStoreError(Exception):
+    """Base error of all key-value store implementations."""
+
+
+class KeyNotFoundError(KeyValueStoreError, KeyError):
+    """Raised when a key does not exist in the store."""
+
+
+class KeyValueStore(ABC):
+    """Abstract interface of a key-value store with string keys."""
+
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        """Get the value of a key.
+
+        Raises:
+            KeyNotFoundError: If the key does not exist
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Set the value of a key, optionally expiring after ttl seconds."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete a key. Returns True if the key existed."""
+
+    @abstractmethod
+    def keys(self, prefix: str = "") -> Iterator[str]:
+        """Iterate over the keys starting with prefix."""
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self.get(key)
+        except KeyNotFoundError:
+            return False
+        return True
+```
+
+```python
+# src/store/implementations/local_store.py
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from src.store.interfaces.key_value_store import KeyNotFoundError, KeyValueStore, KeyValueStoreError
+
+
+class LocalFileStore(KeyValueStore):
+    """Key-value store persisted as a JSON file, written atomically."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._data: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                self._data = json.loads(self.path.read_text())
+            except (OSError, json.JSONDecodeError) as e:
+                raise KeyValueStoreError(f"Cannot read store file {self.path}: {e}") from e
+
+    def _flush(self) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._data, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            os.unlink(tmp)
+            raise KeyValueStoreError(f"Cannot write store file {self.path}: {e}") from e
+
+    def get(self, key: str) -> Any:
+        entry = self._data.get(key)
+        if entry is None or (entry["expires"] is not None and entry["expires"] < time.time()):
+            raise KeyNotFoundError(key)
+        return entry["value"]
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self._data[key] = {"value": value, "expires": time.time() + ttl if ttl else None}
+        self._flush()
+
+    def delete(self, key: str) -> bool:
+        existed = self._data.pop(key, None) is not None
+        if existed:
+            self._flush()
+        return existed
+
+    def keys(self, prefix: str = "") -> Iterator[str]:
+        return (key for key in list(self._data) if key.startswith(prefix) and key in self)
+```
+
+```python
+# src/store/implementations/redis_store.py
+import json
+from typing import Any, Iterator, Optional
+
+import redis
+
+from src.store.interfaces.key_value_store import KeyNotFoundError, KeyValueStore, KeyValueStoreError
+
+
+class RedisStore(KeyValueStore):
+    """Key-value store backed by Redis, with JSON-encoded values."""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", namespace: str = "kv"):
+        self.client = redis.Redis.from_url(url)
+        self.namespace = namespace
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Any:
+        try:
+            raw = self.client.get(self._key(key))
+        except redis.RedisError as e:
+            raise KeyValueStoreError(str(e)) from e
+        if raw is None:
+            raise KeyNotFoundError(key)
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        try:
+            self.client.set(self._key(key), json.dumps(value), ex=ttl)
+        except redis.RedisError as e:
+            raise KeyValueStoreError(str(e)) from e
+
+    def delete(self, key: str) -> bool:
+        try:
+            return bool(self.client.delete(self._key(key)))
+        except redis.RedisError as e:
+            raise KeyValueStoreError(str(e)) from e
+
+    def keys(self, prefix: str = "") -> Iterator[str]:
+        offset = len(self.namespace) + 1
+        for raw in self.client.scan_iter(match=f"{self._key(prefix)}*"):
+            yield raw.decode()[offset:]
+```
+'''
+
+PROMPT_CACHE_PREFIX = (
+    MULTI_FILE_TESTS[0].system_prompt
+    + "\n\nThe team's original request was:\n\n" + MULTI_FILE_TESTS[0].prompt
+    + "\nThis is the reviewed reference implementation. Answer questions about it concisely in markdown.\n"
+    + KEY_VALUE_STORE_REFERENCE
+)
+
+# Prompt caching test cases: the cold request writes the shared prefix to the
+# provider's cache, the warm requests that follow it should read from it
+PROMPT_CACHING_TESTS = [
+    TestCase(
+        name="cache_cold",
+        prompt="List the methods of the KeyValueStore interface in a markdown table with one row per method.",
+        expected_type="markdown",
+        system_prompt=PROMPT_CACHE_PREFIX,
+        result_type=str,
+        validation_rules={"pattern": r"\|.*get.*\|"},
+        required_capabilities=["system_prompt"],
+        sequence_group="key_value_store_reference",
+        stream=True
+    ),
+    TestCase(
+        name="cache_warm_1",
+        prompt="Which exceptions can LocalFileStore raise, and when? Answer with a markdown list.",
+        expected_type="markdown",
+        system_prompt=PROMPT_CACHE_PREFIX,
+        result_type=str,
+        validation_rules={"pattern": r"KeyNotFoundError"},
+        required_capabilities=["system_prompt"],
+        sequence_group="key_value_store_reference",
+        stream=True
+    ),
+    TestCase(
+        name="cache_warm_2",
+        prompt="Write a pytest test for LocalFileStore.get with an expired key.",
+        expected_type="markdown",
+        system_prompt=PROMPT_CACHE_PREFIX,
+        result_type=str,
+        validation_rules={"pattern": r"```python"},
+        required_capabilities=["system_prompt"],
+        sequence_group="key_value_store_reference",
+        stream=True
+    ),
+    TestCase(
+        name="cache_warm_3",
+        prompt="Suggest one improvement to RedisStore.keys and show the changed code.",
+        expected_type="markdown",
+        system_prompt=PROMPT_CACHE_PREFIX,
+        result_type=str,
+        validation_rules={"pattern": r"```python"},
+        required_capabilities=["system_prompt"],
+        sequence_group="key_value_store_reference",
+        stream=True
+    )
+]
+
+# Share of the input price saved on cached prompt tokens, per provider
+PROMPT_CACHE_DISCOUNTS = {
+    "openai": 0.5,
+    "anthropic": 0.9,
+    "google-gla": 0.75,
+    "google-vertex": 0.75,
+    "groq": 0.5
+}
+
+# Multi-turn test cases: each follow-up turn is sent with the history of
+# the conversation so far
+MULTI_TURN_TESTS = [
+    TestCase(
+        name="iterative_code_review",
+        prompt="Write a Python function that parses ISO 8601 dates (YYYY-MM-DD) into datetime.date objects.",
+        expected_type="markdown",
+        system_prompt="You are a senior Python developer pairing with a colleague. Answer in markdown with code blocks.",
+        result_type=str,
+        required_capabilities=["system_prompt"],
+        turns=[
+            "Add error handling for malformed input with a custom exception.",
+            "Now also accept datetimes with a UTC offset, returning the date in UTC.",
+            "Write pytest tests covering everything we have added so far.",
+            "Summarize all changes we made in this conversation in a markdown table."
+        ]
+    ),
+    TestCase(
+        name="design_discussion",
+        prompt="We need a URL shortener for about 100 requests per second. Propose a simple design.",
+        expected_type="markdown",
+        system_prompt="You are a pragmatic system architect. Keep answers short and use markdown headers and lists.",
+        result_type=str,
+        required_capabilities=["system_prompt"],
+        turns=[
+            "Traffic is now expected to grow to 50,000 requests per second. What changes?",
+            "How would you generate short codes without collisions across regions?",
+            "Which of the components you proposed so far is the biggest operational risk, and why?"
+        ]
+    )
+]
+
+# Tool-use test cases: multi-step tasks whose inputs are only available
+# through the deterministic local tools, so every model needs the same
+# lookups and the answer can be checked
+TOOL_USE_SYSTEM_PROMPT = (
+    "You are an assistant with tools. Look up every value you need with the lookup tool "
+    "and do all arithmetic with the calculate tool. Answer with the final number only."
+)
+
+TOOL_USE_TESTS = [
+    TestCase(
+        name="order_total",
+        prompt="What is the total for 3 widgets and 2 gadgets including default tax, in USD rounded to cents?",
+        system_prompt=TOOL_USE_SYSTEM_PROMPT,
+        result_type=str,
+        validation_rules={"pattern": r"56\.42"},
+        required_capabilities=["tools", "function_calling"],
+        tools=["lookup", "calculate"]
+    ),
+    TestCase(
+        name="plan_conversion",
+        prompt="How much does the premium plan cost per month in EUR, rounded to cents?",
+        system_prompt=TOOL_USE_SYSTEM_PROMPT,
+        result_type=str,
+        validation_rules={"pattern": r"45\.08"},
+        required_capabilities=["tools", "function_calling"],
+        tools=["lookup", "calculate"]
+    ),
+    TestCase(
+        name="stock_runway",
+        prompt="For how many days does the stock of sku-7 last at its daily sales rate?",
+        system_prompt=TOOL_USE_SYSTEM_PROMPT,
+        result_type=str,
+        validation_rules={"pattern": r"\b28\b"},
+        required_capabilities=["tools", "function_calling"],
+        tools=["lookup", "calculate"]
+    )
+]
+
+SCENARIO_TESTS = {
+    TestScenario.STANDARD: STANDARD_TESTS,
+    TestScenario.MULTI_FILE: MULTI_FILE_TESTS,
+    TestScenario.STRUCTURED: STRUCTURED_TESTS,
+    TestScenario.PROMPT_CACHING: PROMPT_CACHING_TESTS,
+    TestScenario.MULTI_TURN: MULTI_TURN_TESTS,
+    TestScenario.TOOL_USE: TOOL_USE_TESTS
+}
+
+# Scenario of each test case, for per-scenario breakdowns
+TEST_SCENARIOS = {tc.name: scenario for scenario, tests in SCENARIO_TESTS.items() for tc in tests}
+
+# Scenario argument that selects every scenario
+ALL_SCENARIOS = "all"
+
+def resolve_scenarios(scenarios: Union[str, Sequence[str]]) -> List[TestScenario]:
+    """Expand scenario arguments into distinct scenarios, keeping their order.
+    
+    Args:
+        scenarios: One scenario or several, where "all" stands for every scenario
+        
+    Returns:
+        The scenarios to run
+    """
+    if isinstance(scenarios, str):
+        scenarios = [scenarios]
+    resolved: List[TestScenario] = []
+    for value in scenarios:
+        for scenario in (list(TestScenario) if value == ALL_SCENARIOS else [TestScenario(value)]):
+            if scenario not in resolved:
+                resolved.append(scenario)
+    return resolved
+
+# Smoothing factor for the recorded duration per test case
+DURATION_EWMA_ALPHA = 0.3
+
 class ModelTester:
     """Handles testing of different models and recording results."""
     
-    def __init__(self, scenario: TestScenario = TestScenario.STANDARD):
+    def __init__(
+        self,
+        scenario: Union[str, Sequence[str]] = TestScenario.STANDARD,
+        output_dir: Union[str, Path] = "test_results"
+    ):
         """Initialize the model tester.
         
         Args:
-            scenario: The test scenario to run
+            scenario: The test scenario to run, several scenarios, or "all"
+            output_dir: Directory for results, history, summaries and learned state
         """
-        self.scenario = scenario
-        self.results_dir = Path("test_results")
-        self.markdown_dir = Path("test_results/markdown")
-        self.results_dir.mkdir(exist_ok=True)
-        self.markdown_dir.mkdir(exist_ok=True)
+        self.results_dir = Path(output_dir)
+        self.markdown_dir = self.results_dir / "markdown"
+        self.markdown_dir.mkdir(parents=True, exist_ok=True)
         self.history_file = self.results_dir / "test_history.json"
+        self.artifacts = ArtifactStore(self.results_dir / "artifacts")
+        # Files written during async runs go through the writer thread
+        self.writer = BackgroundWriter()
+        self.concurrency = ConcurrencyController(self.results_dir / "concurrency_limits.json")
+        # Fitted latency models from earlier context benchmarks go into the registry
+        self.latency_file = self.results_dir / "latency_models.json"
+        load_latency_models(self.latency_file)
+        self.router = ModelRouter()
+        self.breakers = CircuitBreakers(on_transition=self._record_transition)
+        self.profiler: Optional[RunProfiler] = None
+        self.lag_monitor = LoopLagMonitor()
+        self.results = ResultBuffer()
+        self.run_id: Optional[str] = None
+        # Called with the JSON-ready record of each result as it is recorded,
+        # e.g. to stream results of a daemon job
+        self.on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.progress = ProgressView()
+        self.max_wall_time: Optional[float] = None
+        self.timed_out = False
+        self.plan: Optional[SchedulePlan] = None
+        self.code_checker: Optional[CodeChecker] = None
+        self.makespan = 0.0
         self.test_history: Dict[str, ModelTestHistory] = self._load_history()
         
         # Select test cases based on scenario
-        if scenario == TestScenario.STANDARD:
-            self.test_cases = STANDARD_TESTS
-        else:
-            self.test_cases = MULTI_FILE_TESTS
+        self.set_scenarios(scenario)
         
         # Available providers based on environment
         self.available_providers: Set[str] = set()
@@ -238,7 +714,9 @@ class ModelTester:
             "groq": "GROQ_API_KEY",
             "cohere": "COHERE_API_KEY",
             # Meta providers
-            "openrouter": "OPENROUTER_API_KEY"
+            "openrouter": "OPENROUTER_API_KEY",
+            # Local mock server, available when its URL is set
+            "mock": MOCK_URL_ENV
         }
         
         # Check each provider
@@ -249,6 +727,18 @@ class ModelTester:
             else:
                 self.missing_providers.add(provider)
 
+    def set_scenarios(self, scenarios: Union[str, Sequence[str]]) -> None:
+        """Select the test cases of the next run.
+        
+        The cases of all scenarios form one job set, so they share agents,
+        connection pools, concurrency limits and circuit breakers.
+        
+        Args:
+            scenarios: One scenario or several, where "all" stands for every scenario
+        """
+        self.scenarios = resolve_scenarios(scenarios)
+        self.test_cases = [tc for scenario in self.scenarios for tc in SCENARIO_TESTS[scenario]]
+
     def _load_history(self) -> Dict[str, ModelTestHistory]:
         """Load test history from file."""
         if not self.history_file.exists():
@@ -282,38 +772,33 @@ class ModelTester:
             print(f"Warning: Could not load test history: {str(e)}")
             return {}
 
+    def _history_snapshot(self) -> Dict[str, Any]:
+        """Get the test history as JSON-ready data."""
+        return {model: history.model_dump() for model, history in self.test_history.items()}
+
     def _save_history(self):
         """Save test history to file."""
-        with open(self.history_file, "w") as f:
-            json.dump(
-                {model: history.model_dump() for model, history in self.test_history.items()},
-                f,
-                indent=2,
-                default=str
-            )
+        write_json(self.history_file, self._history_snapshot())
 
     def _get_latest_models(self) -> List[KnownModelName]:
-        """Get list of latest models from available providers, eliminating duplicates and preferring prefixed versions."""
+        """Get list of latest models from available providers, eliminating duplicates.
+        
+        Models are taken from the registry, one per base model. Every other
+        available provider serving the same base model is registered with the
+        router as an alternative route.
+        """
         latest_models = []
         seen_base_names = set()
         
-        # Add Claude-3-Sonnet
-        if "anthropic" in self.available_providers:
-            latest_models.append("anthropic:claude-3-5-sonnet-latest")
-            seen_base_names.add("claude-3-5-sonnet")
-        
-        # Add specific Groq models
-        if "groq" in self.available_providers:
-            priority_groq_models = [
-                "groq:deepseek-r1-distill-llama-70b-specdec",
-                "groq:qwen-2.5-coder-32b"
-            ]
-            for model in priority_groq_models:
-                model_info = get_model_info(model)
-                base_name = model_info["base_name"]
-                if base_name not in seen_base_names:
-                    latest_models.append(model)
-                    seen_base_names.add(base_name)
+        for model, model_info in MODEL_REGISTRY.items():
+            base_name = model_info["base_name"]
+            if model_info["provider"] not in self.available_providers or base_name in seen_base_names:
+                continue
+            latest_models.append(model)
+            seen_base_names.add(base_name)
+            for route in get_routes(base_name):
+                if get_model_info(route)["provider"] in self.available_providers:
+                    self.router.add_route(base_name, route)
         
         return latest_models
 
@@ -322,112 +807,514 @@ class ModelTester:
         capabilities = model_info["capabilities"]
         return all(capabilities.get(cap, False) for cap in test_case.required_capabilities)
 
-    async def _run_test_case(self, model: str, test_case: TestCase) -> TestResult:
-        """Run a single test case for a model."""
-        try:
-            agent = self.agents[model]
-            result = await run_test(
-                agent=agent,
-                system_prompt=test_case.system_prompt,
-                user_prompt=test_case.prompt
-            )
-            
-            return TestResult(
-                model=model,
-                test_case=test_case.name,
-                success=True,
-                response=result.content,
-                duration=result.duration,
-                timestamp=datetime.now(UTC)
+    def _get_agent(self, model: str, result_type: type = str, tools: Sequence[str] = ()) -> Agent:
+        """Get the agent for a model, result type and set of tools, creating it if needed."""
+        key = model if result_type is str else f"{model}#{result_type.__name__}"
+        if tools:
+            key = f"{key}+{','.join(sorted(tools))}"
+        if key not in self.agents:
+            model_info = get_model_info(model)
+            self.agents[key] = create_test_agent(
+                model_name=model,
+                api_key=os.getenv(f"{model_info['provider'].upper()}_API_KEY"),
+                result_type=result_type,
+                tools=tools
             )
-            
-        except Exception as e:
-            error_msg = str(e)
-            
-            return TestResult(
-                model=model,
-                test_case=test_case.name,
-                success=False,
-                error=error_msg,
-                duration=0
+        return self.agents[key]
+
+    def _circuit_open_result(self, model: str, route: str, test_case: TestCase) -> Dict[str, Any]:
+        """Build the skipped result fields of a request failed fast by an open breaker."""
+        open_breakers = self.breakers.open_breakers(get_model_info(route)["provider"], route)
+        return dict(
+            model=model,
+            test_case=test_case.name,
+            route=route,
+            success=False,
+            skipped=True,
+            error=f"{CIRCUIT_OPEN_ERROR} ({', '.join(open_breakers)})",
+            duration=0
+        )
+
+    async def _run_on_route(self, model: str, route: str, test_case: TestCase) -> Dict[str, Any]:
+        """Run a single test case through one provider route.
+        
+        Requests whose provider or model breaker is open fail fast with a
+        skipped result, also when the breaker opened while they waited for
+        a concurrency slot.
+        
+        Returns:
+            The result as raw fields of ResultBuffer.append_row
+        """
+        provider = get_model_info(route)["provider"]
+        if not self.breakers.allow(provider, route, model):
+            return self._circuit_open_result(model, route, test_case)
+        limiter = self.concurrency.get(provider)
+        try:
+            await limiter.acquire(self.plan.priority(model, test_case.name) if self.plan else 0.0)
+        except asyncio.CancelledError:
+            # Let another request probe if this one was the half-open probe
+            self.breakers.cancel(provider, route)
+            raise
+        if self.breakers.is_open(provider, route):
+            await limiter.release(0, CANCELLED, key=f"{route}:{test_case.name}")
+            return self._circuit_open_result(model, route, test_case)
+        self.progress.request_started(model)
+        lag_token = self.lag_monitor.begin()
+        result = None
+        try:
+            try:
+                agent = self._get_agent(route, test_case.result_type, test_case.tools)
+                if test_case.tools:
+                    response = await run_tool_task(
+                        agent=agent,
+                        system_prompt=test_case.system_prompt,
+                        user_prompt=test_case.prompt
+                    )
+                elif test_case.turns:
+                    response = await run_conversation(
+                        agent=agent,
+                        system_prompt=test_case.system_prompt,
+                        user_prompts=[test_case.prompt, *test_case.turns]
+                    )
+                else:
+                    response = await run_test(
+                        agent=agent,
+                        system_prompt=test_case.system_prompt,
+                        user_prompt=test_case.prompt,
+                        result_type=test_case.result_type,
+                        stream=test_case.stream
+                    )
+                
+                # run_test reports failures as "Error: ..." content
+                failed = response.content.startswith("Error:")
+                result = dict(
+                    model=model,
+                    test_case=test_case.name,
+                    route=route,
+                    success=not failed,
+                    response=None if failed else response.content,
+                    error=response.content if failed else None,
+                    duration=response.duration,
+                    validation_time=response.validation_time,
+                    retries=response.retries,
+                    request_tokens=response.request_tokens,
+                    response_tokens=response.response_tokens,
+                    cached_tokens=response.cached_tokens,
+                    ttft=response.ttft,
+                    loop_lag=self.lag_monitor.end(lag_token),
+                    turn_durations=response.turn_durations,
+                    turn_context_tokens=response.turn_context_tokens,
+                    tool_calls=response.tool_calls,
+                    model_turns=response.model_turns,
+                    tool_round_trips=response.tool_round_trips,
+                    timestamp=datetime.now(UTC)
+                )
+                
+            except Exception as e:
+                error_msg = str(e)
+                
+                result = dict(
+                    model=model,
+                    test_case=test_case.name,
+                    route=route,
+                    success=False,
+                    error=error_msg,
+                    duration=0,
+                    loop_lag=self.lag_monitor.end(lag_token),
+                    timestamp=datetime.now(UTC)
+                )
+            return result
+        finally:
+            self.lag_monitor.end(lag_token)  # Unregisters cancelled requests
+            self.progress.request_finished(model)
+            await limiter.release(
+                result["duration"] if result else 0,
+                # No result means the request was cancelled by the wall-time budget
+                classify_error(result["error"]) if result else CANCELLED,
+                key=f"{route}:{test_case.name}"
             )
+            if result and route in self.router.stats:
+                self.router.record(route, result["duration"], result["success"])
+            if result:
+                self.breakers.record(provider, route, result["success"], result["error"], model)
+            else:
+                self.breakers.cancel(provider, route)
+
+    async def _run_test_case(self, model: str, test_case: TestCase, pinned_route: Optional[str] = None) -> Dict[str, Any]:
+        """Run a single test case for a model.
+        
+        The request goes to the fastest healthy route for the model's base
+        name, or to the pinned route if given. Transient failures (rate
+        limits, timeouts, server errors) fail over to the remaining routes;
+        the reported duration includes the time spent on failed attempts.
+        Routes with an open circuit breaker are passed over; the test case
+        is skipped if no route was tried.
+        
+        Returns:
+            The result of the last attempt as raw fields of ResultBuffer.append_row
+        """
+        # Routes registered by earlier runs may belong to providers excluded from this one
+        routes = [
+            route for route in self.router.ranked_routes(get_model_info(model)["base_name"])
+            if get_model_info(route)["provider"] in self.available_providers
+        ] or [model]
+        if pinned_route in routes:
+            routes = [pinned_route] + [route for route in routes if route != pinned_route]
+        
+        result = skipped = None
+        total_duration = 0.0
+        loop_lags = []
+        for route in routes:
+            attempt = await self._run_on_route(model, route, test_case)
+            if attempt.get("skipped"):
+                skipped = attempt
+                continue
+            result = attempt
+            total_duration += result["duration"]
+            if result["loop_lag"] is not None:
+                loop_lags.append(result["loop_lag"])
+            if result["success"] or classify_error(result["error"]) not in TRANSIENT_OUTCOMES:
+                break
+            # Shown as a backoff count in the progress view
+            self.progress.backoff(model)
+        if result is None:
+            self.progress.skip(model, test_case.name, "circuit open")
+            return skipped
+        result["duration"] = total_duration
+        result["loop_lag"] = max(loop_lags) if loop_lags else None
+        self.progress.complete(model, test_case.name, total_duration, result["success"])
+        return result
 
     async def test_model(self, model: str) -> List[TestResult]:
         """Run all test cases for a specific model."""
+        return self.results.to_results(TestResult, await self._run_model(model))
+
+    async def _run_model(self, model: str) -> List[int]:
+        """Run all test cases for a model and get the buffer rows of its results."""
         try:
             model_info = get_model_info(model)
             
-            # Create agent if needed
-            if model not in self.agents:
-                try:
-                    self.agents[model] = create_test_agent(
-                        model_name=model,
-                        api_key=os.getenv(f"{model_info['provider'].upper()}_API_KEY")
-                    )
-                except Exception as e:
-                    print(f"\nError creating agent for {model}: {str(e)}")
-                    return [TestResult(
+            # Create agent if needed; other routes can still serve the model
+            try:
+                self._get_agent(model)
+            except Exception as e:
+                self.progress.log(f"Error creating agent for {model}: {str(e)}")
+                if len(self.router.routes.get(model_info["base_name"], [])) <= 1:
+                    return [self._store_result(dict(
                         model=model,
                         test_case="agent_creation",
                         success=False,
                         error=f"Failed to create agent: {str(e)}",
                         duration=0,
                         timestamp=datetime.now(UTC)
-                    )]
-
-            agent = self.agents[model]
-            
-            results = []
+                    ))]
             
             # Initialize or update model history with capabilities
-            if model not in self.test_history:
-                self.test_history[model] = ModelTestHistory(
-                    model=model,
-                    provider=model_info["provider"],
-                    base_name=model_info["base_name"],
-                    capabilities=ModelCapabilities(**model_info["capabilities"])
-                )
+            self._ensure_history(model, model_info)
             
-            print(f"\nTesting {model}:")
-            print("Provider:", model_info["provider"])
-            print("Base Name:", model_info["base_name"])
-            print("\nRunning tests:")
+            # Requests are gated by each provider's adaptive concurrency limit
+            test_cases = [tc for tc in self.test_cases if self._can_run_test(model_info, tc)]
+            if not test_cases:
+                self.progress.log(f"No test cases in this scenario match the capabilities of {model}")
+                return []
+            self.progress.add_jobs(model, len(test_cases))
             
-            # Run tests with rate limiting
-            for test_case in self.test_cases:
-                await asyncio.sleep(0.5)  # 500ms delay between tests
-                result = await self._run_test_case(model, test_case)
-                results.append(result)
-                
-                # Update history
-                history = self.test_history[model]
-                if result.success:
-                    history.last_success = result.timestamp
-                    history.success_count += 1
-                else:
-                    history.last_failure = result.timestamp
-                    history.failure_count += 1
-                    if result.error:
-                        history.known_issues.append(result.error)
+            async def run_and_record(test_case: TestCase, pinned_route: Optional[str] = None) -> Tuple[int, Optional[str]]:
+                # Record each result as it finishes so a cancelled run keeps it
+                result = await self._run_test_case(model, test_case, pinned_route)
+                await self._check_code(result)
+                return self._record_result(model, result), result.get("route")
+            
+            # Test cases of a sequence group run in order, e.g. so warm prompt
+            # cache requests follow the cold one; groups run concurrently
+            groups: Dict[str, List[TestCase]] = {}
+            for tc in test_cases:
+                groups.setdefault(tc.sequence_group or tc.name, []).append(tc)
             
-            # Print test summary for this model
-            success_count = sum(1 for r in results if r.success)
-            print(f"\nModel Summary:")
-            print(f"Tests passed: {success_count}/{len(results)}")
-            print(f"Success rate: {(success_count/len(results))*100:.1f}%")
+            async def run_group(group: List[TestCase]) -> List[int]:
+                # The group stays on the route that served it so far, e.g. the
+                # provider holding its prompt cache; it moves only on failover
+                rows, route = [], None
+                for tc in group:
+                    idx, served_by = await run_and_record(tc, route)
+                    route = served_by or route
+                    rows.append(idx)
+                return rows
+            
+            rows = [
+                idx
+                for group_rows in await asyncio.gather(*(run_group(group) for group in groups.values()))
+                for idx in group_rows
+            ]
+            
+            # Log test summary for this model
+            success_count = sum(self.results.success[idx] for idx in rows)
+            self.progress.log(
+                f"{model}: {success_count}/{len(rows)} tests passed "
+                f"({(success_count/len(rows))*100:.1f}%)"
+            )
             
-            return results
+            return rows
             
         except Exception as e:
-            print(f"\nUnexpected error testing {model}: {str(e)}")
-            return [TestResult(
+            self.progress.log(f"Unexpected error testing {model}: {str(e)}")
+            return [self._store_result(dict(
                 model=model,
                 test_case="unexpected_error",
                 success=False,
                 error=str(e),
                 duration=0,
                 timestamp=datetime.now(UTC)
-            )]
+            ))]
+
+    async def _check_code(self, result: Dict[str, Any]) -> None:
+        """Run the hidden tests of a successful result's test case against its code, if enabled."""
+        if self.code_checker and result["success"] and self.code_checker.supports(result["test_case"]):
+            check = await self.code_checker.check(result["test_case"], result["response"])
+            result.update(code_passed=check.passed, code_total=check.total, code_time=check.duration)
+
+    def _ensure_history(self, model: str, model_info: Dict[str, Any]) -> None:
+        """Create the history entry for a model if it does not exist yet."""
+        if model not in self.test_history:
+            self.test_history[model] = ModelTestHistory(
+                model=model,
+                provider=model_info["provider"],
+                base_name=model_info["base_name"],
+                capabilities=ModelCapabilities(**model_info["capabilities"])
+            )
+
+    def _record_transition(self, transition: BreakerTransition) -> None:
+        """Log a circuit breaker state change and add it to the model's history."""
+        self.progress.log(
+            f"Circuit {transition.breaker}: {transition.from_state} → {transition.to_state} ({transition.reason})"
+        )
+        if transition.model in self.test_history:
+            self.test_history[transition.model].breaker_transitions.append(transition)
+
+    def _store_result(self, result: Dict[str, Any]) -> int:
+        """Append a result's raw fields to the run's buffer and pass its record to the result listener.
+        
+        Returns:
+            Row index of the result
+        """
+        idx = self.results.append_row(**result, run=self.run_id)
+        if self.on_result:
+            self.on_result(self.results.to_records([idx])[0])
+        return idx
+
+    def _record_result(self, model: str, result: Dict[str, Any]) -> int:
+        """Store a single test result and update model history with it.
+        
+        Skipped results are stored but are neither successes nor failures.
+        
+        Returns:
+            Row index of the result
+        """
+        idx = self._store_result(result)
+        if result.get("skipped"):
+            return idx
+        history = self.test_history[model]
+        timestamp = datetime.fromtimestamp(self.results.timestamps[idx], UTC)
+        test_case, duration = result["test_case"], result["duration"]
+        if result["success"]:
+            history.last_success = timestamp
+            history.success_count += 1
+            previous = history.durations.get(test_case)
+            history.durations[test_case] = duration if previous is None else (
+                DURATION_EWMA_ALPHA * duration + (1 - DURATION_EWMA_ALPHA) * previous
+            )
+        else:
+            history.last_failure = timestamp
+            history.failure_count += 1
+            error = result.get("error")
+            if error and error not in history.known_issues:
+                history.known_issues.append(error)
+        return idx
+
+    @staticmethod
+    def _is_batchable(test_case: TestCase) -> bool:
+        """Check whether a test case is a single plain text request, which is all a batch job carries."""
+        return test_case.result_type is str and not test_case.turns and not test_case.tools
+
+    async def run_batch_tests(self, models: List[str]) -> Dict[str, List[TestResult]]:
+        """Run all test cases for the given models through provider batch endpoints.
+
+        Jobs are grouped into one batch submission per provider. Models whose
+        provider has no batch endpoint fall back to test_model. Test cases a
+        batch job cannot express (structured output, conversations, tools) run as individual
+        requests next to the batches.
+
+        Args:
+            models: Models to test
+
+        Returns:
+            Dictionary mapping model names to their test results
+        """
+        return {
+            model: self.results.to_results(TestResult, rows)
+            for model, rows in (await self._run_batch(models)).items()
+        }
+
+    async def _run_batch(self, models: List[str]) -> Dict[str, List[int]]:
+        """Run the batch mode of run_batch_tests and get the buffer rows of each model's results."""
+        jobs_by_provider: Dict[str, List[BatchJob]] = {}
+        individual_jobs: List[Tuple[str, TestCase]] = []
+        job_count = 0
+        fallback_models = []
+
+        for model in models:
+            model_info = get_model_info(model)
+            provider = model_info["provider"]
+            if provider not in BATCH_BACKENDS:
+                fallback_models.append(model)
+                continue
+            self._ensure_history(model, model_info)
+            for test_case in self.test_cases:
+                if not self._can_run_test(model_info, test_case):
+                    continue
+                self.progress.add_jobs(model, 1)
+                if not self._is_batchable(test_case):
+                    individual_jobs.append((model, test_case))
+                    continue
+                job_count += 1
+                jobs_by_provider.setdefault(provider, []).append(BatchJob(
+                    custom_id=f"job-{job_count}",
+                    model=model,
+                    test_case=test_case.name,
+                    system_prompt=test_case.system_prompt,
+                    user_prompt=test_case.prompt
+                ))
+
+        async def run_provider(provider: str, jobs: List[BatchJob]) -> Dict[str, Any]:
+            self.progress.log(f"Submitting batch of {len(jobs)} jobs to {provider}")
+            backend = get_batch_backend(provider, api_key=self.provider_keys.get(provider))
+            return await run_batch(backend, jobs)
+
+        async def run_individually(model: str, test_case: TestCase) -> None:
+            result = await self._run_test_case(model, test_case)
+            await self._check_code(result)
+            all_rows[model].append(self._record_result(model, result))
+
+        for model in fallback_models:
+            self.progress.log(f"No batch endpoint for {model}, running tests individually")
+        
+        # Batch submissions, individual requests and individually tested models run side by side
+        all_rows: Dict[str, List[int]] = {model: [] for model in models if model not in fallback_models}
+        providers = list(jobs_by_provider)
+        outputs = await asyncio.gather(
+            *(run_provider(p, jobs_by_provider[p]) for p in providers),
+            *(self._run_model(model) for model in fallback_models),
+            *(run_individually(model, test_case) for model, test_case in individual_jobs),
+            return_exceptions=True
+        )
+        batch_outputs = outputs[:len(providers)]
+        fallback_outputs = outputs[len(providers):len(providers) + len(fallback_models)]
+        batch_results: List[Dict[str, Any]] = []
+        for provider, output in zip(providers, batch_outputs):
+            for job in jobs_by_provider[provider]:
+                if isinstance(output, Exception):
+                    result = dict(
+                        model=job.model,
+                        test_case=job.test_case,
+                        success=False,
+                        error=f"Batch failed: {str(output)}",
+                        duration=0
+                    )
+                else:
+                    response = output[job.custom_id]
+                    failed = response.content.startswith("Error:")
+                    result = dict(
+                        model=job.model,
+                        test_case=job.test_case,
+                        success=not failed,
+                        response=None if failed else response.content,
+                        error=response.content if failed else None,
+                        duration=response.duration
+                    )
+                batch_results.append(result)
+        
+        # Batch outputs get the same hidden-test checks as individual requests
+        await asyncio.gather(*(self._check_code(result) for result in batch_results))
+        for result in batch_results:
+            all_rows[result["model"]].append(self._record_result(result["model"], result))
+            self.progress.complete(result["model"], result["test_case"], result["duration"], result["success"])
+
+        for model, model_rows in zip(fallback_models, fallback_outputs):
+            if isinstance(model_rows, Exception):
+                self.progress.log(f"Error testing {model}: {str(model_rows)}")
+                continue
+            all_rows[model] = model_rows
+
+        for (model, test_case), output in zip(individual_jobs, outputs[len(providers) + len(fallback_models):]):
+            if isinstance(output, Exception):
+                self.progress.log(f"Error testing {model} {test_case.name}: {str(output)}")
+
+        return all_rows
+
+    def _plan_schedule(self, models: List[str]) -> SchedulePlan:
+        """Plan longest-first job ordering from recorded durations.
+        
+        Args:
+            models: Models planned for the run
+            
+        Returns:
+            SchedulePlan with an estimate per (model, test case) job
+        """
+        providers, predicted = {}, {}
+        for model in models:
+            model_info = get_model_info(model)
+            for test_case in self.test_cases:
+                if self._can_run_test(model_info, test_case):
+                    providers[(model, test_case.name)] = model_info["provider"]
+                    # Used for jobs without recorded durations if the model was benchmarked
+                    latency = predict_latency(model, estimate_tokens(test_case.system_prompt + test_case.prompt))
+                    if latency is not None:
+                        predicted[(model, test_case.name)] = latency
+        recorded = {model: history.durations for model, history in self.test_history.items()}
+        workers = {provider: int(self.concurrency.get(provider).limit) for provider in set(providers.values())}
+        return SchedulePlan(estimate_durations(list(providers), recorded, predicted=predicted), providers, workers)
+
+    def _record_skipped(self, models: List[str]) -> int:
+        """Add skipped results for planned test cases that did not finish.
+        
+        Skipped results go to the result buffer only; they are not failures
+        and do not change model history.
+        
+        Args:
+            models: Models planned for the run
+            
+        Returns:
+            Number of skipped test cases
+        """
+        finished = {
+            (self.results.models[mid], self.results.test_cases[tid])
+            for mid, tid in zip(self.results.model_ids, self.results.test_case_ids)
+        }
+        skipped = 0
+        for model in models:
+            model_info = get_model_info(model)
+            for test_case in self.test_cases:
+                if (model, test_case.name) in finished or not self._can_run_test(model_info, test_case):
+                    continue
+                self._store_result(dict(
+                    model=model,
+                    test_case=test_case.name,
+                    success=False,
+                    skipped=True,
+                    error=f"Skipped: wall-time budget of {self.max_wall_time:.0f}s exceeded",
+                    duration=0
+                ))
+                skipped += 1
+        return skipped
+
+    def _new_run_id(self) -> str:
+        """Get the id of a new run: its start time, with a counter if the previous run started in the same second."""
+        run_id = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+        if self.run_id and self.run_id.split("-")[0] == run_id:
+            # Daemon jobs can start within the same second
+            previous = self.run_id.partition("-")[2]
+            run_id = f"{run_id}-{int(previous or 1) + 1}"
+        return run_id
 
     def _clean_model_name(self, model: str) -> str:
         """Clean model name for file naming.
@@ -450,46 +1337,338 @@ class ModelTester:
         
         return base_name
 
-    def save_results(self, model: str, results: List[TestResult]):
+    def save_results(self, model: str, results: Optional[List[TestResult]] = None):
         """Save test results to files.
         
-        Saves both JSON results and markdown content.
+        Responses go to the content-addressed artifact store and the JSON
+        results reference them by hash. Markdown views are rendered on demand
+        with render_markdown.
+        
+        Args:
+            model: Full model name
+            results: Results to save (default: the model's rows in the result buffer)
         """
-        timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+        if results is None:
+            self._write_results(model, self.results, self.results.rows_for_model(model))
+            return
+        
+        buffer = ResultBuffer.from_results(results)
+        rows = list(range(len(buffer)))
+        self._write_results(model, buffer, rows)
+        for result, idx in zip(results, rows):
+            result.response_hash = buffer.response_hashes[idx]
+
+    def _write_results(self, model: str, buffer: ResultBuffer, rows: List[int], run: Optional[str] = None) -> Path:
+        """Store the responses of buffer rows and write their JSON results file, named by run id or the time."""
+        timestamp = run or datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+        for idx in rows:
+            if response := buffer.responses[idx]:
+                buffer.response_hashes[idx] = self.artifacts.put(response)
         
         # Save JSON results
-        result_file = self.results_dir / f"{model}_{timestamp}.json"
-        with open(result_file, "w") as f:
-            json.dump(
-                [result.model_dump() for result in results],
-                f,
-                indent=2,
-                default=str
+        return write_json(self.results_dir / f"{model}_{timestamp}.json", buffer.to_records(rows))
+
+    def load_results(self, result_file: Path) -> List[TestResult]:
+        """Load saved test results, resolving responses from the artifact store.
+        
+        Args:
+            result_file: Path to a per-run JSON results file
+            
+        Returns:
+            List of test results with responses filled in
+        """
+        with open(result_file) as f:
+            data = json.load(f)
+        
+        results = []
+        for item in data:
+            result = TestResult(**item)
+            if result.response is None and result.response_hash:
+                try:
+                    result.response = self.artifacts.get(result.response_hash)
+                except KeyError:
+                    print(f"Warning: Missing artifact {result.response_hash} for {result.model}")
+            results.append(result)
+        return results
+
+    def _result_files(self) -> List[Path]:
+        """Get all saved per-run results files, oldest first per model."""
+        return sorted(self.results_dir.glob("*:*_*.json"))
+
+    def load_result_history(self, result_files: Optional[List[Path]] = None) -> ResultBuffer:
+        """Load saved per-run results into a result buffer for aggregation.
+        
+        Responses are not loaded; the run id of each row is the timestamp of its
+        results file.
+        
+        Args:
+            result_files: Results files to load (default: all saved results)
+        
+        Returns:
+            ResultBuffer with one row per saved result
+        """
+        buffer = ResultBuffer()
+        for result_file in self._result_files() if result_files is None else result_files:
+            run = "_".join(result_file.stem.rsplit("_", 2)[1:])
+            with open(result_file) as f:
+                data = json.load(f)
+            for item in data:
+                response = item.get("response")
+                buffer.append_row(
+                    model=item["model"],
+                    test_case=item["test_case"],
+                    success=item["success"],
+                    duration=item["duration"],
+                    response_hash=item.get("response_hash"),
+                    route=item.get("route"),
+                    error=item.get("error"),
+                    validation_time=item.get("validation_time"),
+                    retries=item.get("retries", 0),
+                    skipped=item.get("skipped", False),
+                    code_passed=item.get("code_passed"),
+                    code_total=item.get("code_total"),
+                    code_time=item.get("code_time"),
+                    request_tokens=item.get("request_tokens"),
+                    response_tokens=item.get("response_tokens"),
+                    cached_tokens=item.get("cached_tokens"),
+                    ttft=item.get("ttft"),
+                    loop_lag=item.get("loop_lag"),
+                    turn_durations=item.get("turn_durations"),
+                    turn_context_tokens=item.get("turn_context_tokens"),
+                    tool_calls=item.get("tool_calls"),
+                    model_turns=item.get("model_turns"),
+                    tool_round_trips=item.get("tool_round_trips"),
+                    timestamp=datetime.fromisoformat(item["timestamp"]),
+                    run=run,
+                    response_length=item.get("response_length", len(response) if response else 0)
+                )
+        return buffer
+
+    def export_results(self, export_dir: Optional[Path] = None, fmt: Optional[str] = None) -> List[Path]:
+        """Export saved results not exported yet to partitioned columnar files.
+        
+        Results files are exported one at a time, so memory use does not grow
+        with the size of the history.
+        
+        Args:
+            export_dir: Export directory (default: <results_dir>/export)
+            fmt: 'parquet' or 'npz' (default: parquet when pyarrow is installed)
+            
+        Returns:
+            Paths of the written files
+        """
+        exporter = ResultExporter(export_dir or self.results_dir / "export", fmt)
+        written = []
+        for result_file in self._result_files():
+            if result_file.name in exporter.exported:
+                continue
+            written.extend(exporter.export_buffer(self.load_result_history([result_file]), result_file.stem))
+            exporter.exported.append(result_file.name)
+            exporter.save_manifest()
+        return written
+
+    async def run_context_benchmark(self, sizes: Optional[List[int]] = None) -> Dict[str, LatencyModel]:
+        """Measure latency at increasing input sizes and fit a latency model per model.
+        
+        Sizes run one after another per model, so a model's requests don't
+        compete with each other; models run concurrently. A model stops at
+        the first failed size, since larger inputs would fail as well. The
+        fitted models are stored in the registry and the latency file, and a
+        markdown report is written.
+        
+        Args:
+            sizes: Input sizes in tokens (default: 1k to 128k), capped by each model's context window
+            
+        Returns:
+            Dict of model name to fitted latency model, for models with at least two samples
+        """
+        nonce = datetime.now(UTC).strftime("%Y%m%d%H%M%S")
+        
+        async def benchmark(model: str) -> List[LatencySample]:
+            context_window = get_model_info(model).get("context_window", DEFAULT_CONTEXT_WINDOW)
+            samples = []
+            try:
+                agent = self._get_agent(model)
+            except Exception as e:
+                print(f"Error creating agent for {model}: {str(e)}")
+                return samples
+            for size in benchmark_sizes(context_window, sizes or BENCHMARK_SIZES):
+                response = await run_test(agent, BENCHMARK_SYSTEM_PROMPT, build_prompt(size, nonce), stream=True)
+                if response.content.startswith("Error:") or response.ttft is None:
+                    print(f"{model}: stopping at {size} tokens: {response.content[:200]}")
+                    break
+                samples.append(LatencySample(
+                    target_tokens=size,
+                    input_tokens=response.request_tokens or size,
+                    output_tokens=response.response_tokens or estimate_tokens(response.content),
+                    ttft=response.ttft,
+                    duration=response.duration
+                ))
+                print(f"{model}: {size} tokens, TTFT {response.ttft:.2f}s, total {response.duration:.2f}s")
+            return samples
+        
+        models = self._get_latest_models()
+        samples = dict(zip(models, await asyncio.gather(*(benchmark(model) for model in models))))
+        fitted = {
+            model: fit_latency_model(model_samples)
+            for model, model_samples in samples.items()
+            if len({s.input_tokens for s in model_samples}) >= 2
+        }
+        for model, latency_model in fitted.items():
+            register_latency_model(model, latency_model)
+        await self.writer.submit(self.latency_file, partial(save_latency_models, self.latency_file, fitted))
+        
+        timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+        report = self.markdown_dir / f"context_benchmark_{timestamp}.md"
+        content = (
+            "# Long-Context Latency Benchmark\n\n"
+            f"Run: {datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n"
+            "## Measurements\n\n"
+            + generate_benchmark_table(samples)
+        )
+        if fitted:
+            content += "\n\n## Fitted Latency Models\n\n" + generate_model_table(fitted)
+        await self.writer.submit(report, partial(write_text, report, content))
+        await self.writer.close()
+        print(f"Benchmark report saved to: {report}")
+        return fitted
+
+    async def run_monitor(
+        self,
+        interval: float = DEFAULT_PROBE_INTERVAL,
+        probe_cases: Sequence[str] = ("basic_response",),
+        windows: Sequence[float] = DEFAULT_WINDOWS,
+        thresholds: Optional[AlertThresholds] = None,
+        alert_file: Optional[Path] = None,
+        webhook: Optional[str] = None,
+        duration: Optional[float] = None
+    ) -> ProbeMonitor:
+        """Probe every available model on a fixed schedule and alert on rolling-window metrics.
+        
+        Each model is probed directly, without failover to other routes, so a
+        degraded provider is not hidden by routing. Probes of different models
+        are staggered across the interval. Probe results only update the
+        monitor; they are not added to the model history or results files.
+        
+        Args:
+            interval: Seconds between probes of a model
+            probe_cases: Names of the test cases sent on each probe
+            windows: Rolling window lengths in seconds
+            thresholds: Alert thresholds (default: no alerts)
+            alert_file: JSON lines file alerts are appended to (default: monitor_alerts.jsonl in the results directory)
+            webhook: URL alerts are posted to
+            duration: Stop after this many seconds (default: run until interrupted)
+            
+        Returns:
+            The monitor with the probes of the last windows and all alerts
+        """
+        all_tests = {tc.name: tc for tests in SCENARIO_TESTS.values() for tc in tests}
+        cases = [all_tests[name] for name in probe_cases]
+        models = [model for model, info in MODEL_REGISTRY.items() if info["provider"] in self.available_providers]
+        monitor = ProbeMonitor(windows, thresholds)
+        alert_file = alert_file or self.results_dir / "monitor_alerts.jsonl"
+        status_file = self.results_dir / "monitor_status.md"
+        alert_count = 0
+        
+        if not models:
+            print("\n❌ No models available for monitoring with current API keys.")
+            return monitor
+        print(f"Monitoring {len(models)} models every {interval:g}s with {', '.join(probe_cases)}")
+        
+        async def emit(session: aiohttp.ClientSession, alerts: List[Alert]) -> None:
+            nonlocal alert_count
+            for alert in alerts:
+                print(
+                    f"[{alert.state.upper()}] {alert.model} {alert.metric} over {alert.window}: "
+                    f"{alert.value:.2f} (threshold {alert.threshold:g})"
+                )
+            # Appends must not be coalesced, so every batch gets its own key
+            alert_count += 1
+            await self.writer.submit(f"alerts:{alert_count}", partial(append_alerts, alert_file, alerts))
+            if webhook:
+                try:
+                    await post_alerts(session, webhook, alerts)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"Alert webhook failed: {e}")
+        
+        async def probe_loop(session: aiohttp.ClientSession, model: str, offset: float) -> None:
+            runnable = [tc for tc in cases if self._can_run_test(get_model_info(model), tc)]
+            await asyncio.sleep(offset)
+            while True:
+                started = time.monotonic()
+                for test_case in runnable:
+                    result = await self._run_on_route(model, model, test_case)
+                    if result.get("skipped"):
+                        continue
+                    if alerts := monitor.record(model, result["timestamp"].timestamp(), result["duration"], result["success"]):
+                        await emit(session, alerts)
+                await asyncio.sleep(max(interval - (time.monotonic() - started), 0))
+        
+        async def write_status() -> None:
+            content = (
+                "# Synthetic Monitoring\n\n"
+                f"Updated: {datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n"
+                + monitor.generate_table(time.time())
             )
+            await self.writer.submit(status_file, partial(write_text, status_file, content))
         
-        # Save markdown content
-        clean_name = self._clean_model_name(model)
-        for result in results:
-            if result.success and result.response:
-                # Create markdown file with clean model name
-                md_file = self.markdown_dir / f"{clean_name}.md"
-                
-                # Add metadata header
-                metadata = {
-                    "model": model,
-                    "test_case": result.test_case,
-                    "timestamp": timestamp,
-                    "duration": f"{result.duration:.2f}s"
-                }
-                
-                with open(md_file, "w") as f:
-                    # Write metadata as YAML frontmatter
-                    f.write("---\n")
-                    for key, value in metadata.items():
-                        f.write(f"{key}: {value}\n")
-                    f.write("---\n\n")
-                    # Write the actual response
-                    f.write(result.response)
+        async def report_loop() -> None:
+            while True:
+                await asyncio.sleep(interval)
+                await write_status()
+        
+        async with aiohttp.ClientSession() as session:
+            tasks = [
+                probe_loop(session, model, i * interval / len(models))
+                for i, model in enumerate(models)
+            ]
+            try:
+                await asyncio.wait_for(asyncio.gather(report_loop(), *tasks), timeout=duration)
+            except asyncio.TimeoutError:
+                pass
+        
+        print("\nRolling Metrics:")
+        print(monitor.generate_table(time.time()))
+        await write_status()
+        await self.writer.close()
+        print(f"\nMonitor status saved to: {status_file}")
+        if monitor.alerts:
+            print(f"{len(monitor.alerts)} alerts appended to: {alert_file}")
+        return monitor
+
+    def render_markdown(self, model: str) -> Optional[str]:
+        """Render the latest saved results of a model to markdown.
+        
+        Every successful test case of the run gets its own section.
+        
+        Args:
+            model: Full model name
+            
+        Returns:
+            Path to the rendered markdown file, or None if no results exist
+        """
+        result_files = sorted(self.results_dir.glob(f"{model}_*.json"))
+        if not result_files:
+            return None
+        latest = result_files[-1]
+        results = self.load_results(latest)
+        
+        md_file = self.markdown_dir / f"{self._clean_model_name(model)}.md"
+        with open(md_file, "w") as f:
+            # Write metadata as YAML frontmatter
+            f.write("---\n")
+            f.write(f"model: {model}\n")
+            f.write(f"timestamp: {latest.stem[len(model) + 1:]}\n")
+            f.write("---\n\n")
+            for result in results:
+                if not (result.success and result.response):
+                    continue
+                f.write(f"# {result.test_case}\n\n")
+                f.write(f"Duration: {result.duration:.2f}s\n\n")
+                f.write(result.response)
+                f.write("\n\n")
+        
+        return str(md_file)
 
     def _generate_capability_table(self, models_info: List[tuple[str, Dict[str, Any]]]) -> str:
         """Generate a markdown table of model capabilities.
@@ -536,7 +1715,8 @@ class ModelTester:
         categories = {
             "Major Providers": ["anthropic", "openai", "google-gla", "google-vertex"],
             "Additional Providers": ["mistral", "fireworks", "groq", "cohere"],
-            "Meta Providers": ["openrouter"]
+            "Meta Providers": ["openrouter"],
+            "Local": ["mock"]
         }
         
         for category, providers in categories.items():
@@ -562,161 +1742,482 @@ class ModelTester:
         if "mistral" in self.missing_providers and "groq" in self.missing_providers:
             print("\n⚠️  No access to Mistral models (need either MISTRAL_API_KEY or GROQ_API_KEY)")
 
-    def _generate_metrics_table(self, all_results: Dict[str, List[TestResult]]) -> str:
-        """Generate a detailed metrics table for all models.
+    def _generate_metrics_table(self, results: ResultBuffer) -> str:
+        """Generate a detailed metrics table for all models.
+        
+        Args:
+            results: Result buffer of the run
+            
+        Returns:
+            Markdown formatted table with metrics
+        """
+        headers = [
+            "Model",
+            "Test Case",
+            "Success",
+            "Duration (s)",
+            "Response Length",
+            "Has Headers",
+            "Has Lists",
+            "Has Code Blocks"
+        ]
+        
+        separator = "|" + "|".join("---" for _ in range(len(headers))) + "|"
+        header_row = "| " + " | ".join(headers) + " |"
+        
+        summary = aggregate(results)
+        
+        rows = []
+        for model, indices in sorted(results.rows_by_model().items()):
+            for idx in indices:
+                if not results.success[idx]:
+                    continue
+                    
+                response = results.responses[idx] or ""
+                has_headers = "#" in response
+                has_lists = "*" in response or "-" in response
+                has_code = "```" in response
+                
+                row = [
+                    model,
+                    results.test_cases[results.test_case_ids[idx]],
+                    "✓" if results.success[idx] else "✗",
+                    f"{results.durations[idx]:.2f}",
+                    str(len(response)),
+                    "✓" if has_headers else "✗",
+                    "✓" if has_lists else "✗",
+                    "✓" if has_code else "✗"
+                ]
+                rows.append("| " + " | ".join(row) + " |")
+            
+            # Add summary row for model
+            if metrics := summary.get(model):
+                summary_row = [
+                    f"{model} (Summary)",
+                    "ALL",
+                    f"{metrics['success_rate'] * 100:.1f}%",
+                    f"{metrics['mean']:.2f}",
+                    f"{metrics['avg_response_length']:.0f}",
+                    "-",
+                    "-",
+                    "-"
+                ]
+                rows.append("| " + " | ".join(summary_row) + " |")
+                rows.append(separator)
+        
+        return "\n".join([header_row, separator] + rows)
+
+    def _generate_speed_ranking(self, results: ResultBuffer) -> str:
+        """Generate a speed ranking summary for all models."""
+        if not len(results):
+            return "No test results available"
+        
+        # Aggregate speed metrics per model, skipping models without timing data
+        table = aggregate(results)
+        speed_metrics = [
+            {"model": model, **metrics}
+            for (model,), metrics in zip(table.keys, table.rows())
+            if metrics["max"] > 0
+        ]
+        
+        if not speed_metrics:
+            return "No valid timing data available"
+        
+        # Sort by average duration (faster first)
+        speed_metrics.sort(key=lambda x: x["mean"])
+        
+        # Count timed results measured while the event loop lagged behind;
+        # rows without a lag sample hold NaN, which is never unreliable
+        unreliable = {
+            model: (
+                sum(is_unreliable(results.loop_lags[idx], results.durations[idx]) for idx in timed),
+                len(timed)
+            )
+            for model, indices in results.rows_by_model().items()
+            for timed in [[idx for idx in indices if not results.skipped[idx]]]
+        }
+        
+        # Generate table
+        headers = [
+            "Rank",
+            "Model",
+            "Avg Time (s)",
+            "P50 (s)",
+            "P95 (s)",
+            "Min Time (s)",
+            "Max Time (s)",
+            "Total Time (s)",
+            "Relative Speed",
+            "Unreliable"
+        ]
+        
+        header_row = "| " + " | ".join(headers) + " |"
+        separator = "|" + "|".join("---" for _ in range(len(headers))) + "|"
+        
+        # Calculate relative speed compared to slowest
+        slowest_avg = max(m["mean"] for m in speed_metrics)
+        
+        rows = []
+        for rank, metrics in enumerate(speed_metrics, 1):
+            relative_speed = slowest_avg / metrics["mean"]
+            row = [
+                str(rank),
+                metrics["model"],
+                f"{metrics['mean']:.2f}",
+                f"{metrics['p50']:.2f}",
+                f"{metrics['p95']:.2f}",
+                f"{metrics['min']:.2f}",
+                f"{metrics['max']:.2f}",
+                f"{metrics['total']:.2f}",
+                f"{relative_speed:.1f}x faster",
+                "{}/{}".format(*unreliable.get(metrics["model"], (0, 0)))
+            ]
+            rows.append("| " + " | ".join(row) + " |")
+        
+        lines = [
+            "\n## Speed Rankings (Lower is Better)",
+            header_row,
+            separator
+        ] + rows
+        if any(count for count, _ in unreliable.values()):
+            lines.append(
+                f"\nUnreliable results were in flight while the event loop lagged at least "
+                f"{UNRELIABLE_LAG * 1000:.0f} ms and {UNRELIABLE_FRACTION:.0%} of their duration; "
+                "their times include harness delay."
+            )
+        return "\n".join(lines)
+
+    def _generate_scenario_table(self, results: ResultBuffer) -> str:
+        """Generate per-scenario metrics of a run across several scenarios.
+        
+        Returns:
+            A markdown table, or an empty string when the results cover fewer than two scenarios
+        """
+        # Row masks per scenario, from the scenario of each interned test case
+        case_scenarios = [TEST_SCENARIOS.get(name) for name in results.test_cases.values]
+        by_scenario: Dict[TestScenario, np.ndarray] = {
+            scenario: np.isin(
+                column(results.test_case_ids),
+                [case_id for case_id, s in enumerate(case_scenarios) if s == scenario]
+            )
+            for scenario in set(case_scenarios) - {None}
+        }
+        if len(by_scenario) < 2:
+            return ""
+        
+        rows = [
+            "| Scenario | Model | Tests | Passed | Success Rate | Avg Time (s) | P50 (s) | P95 (s) |",
+            "|---|---|---|---|---|---|---|---|"
+        ]
+        for scenario in TestScenario:
+            if scenario not in by_scenario:
+                continue
+            table = aggregate(results, where=by_scenario[scenario])
+            for (model,), metrics in sorted(zip(table.keys, table.rows()), key=lambda item: item[0]):
+                if not metrics["count"]:
+                    continue
+                rows.append(
+                    f"| {scenario.value} | {model} | {int(metrics['count'])} | {int(metrics['successes'])} | "
+                    f"{metrics['success_rate'] * 100:.1f}% | {metrics['mean']:.2f} | "
+                    f"{metrics['p50']:.2f} | {metrics['p95']:.2f} |"
+                )
+        return "\n".join(rows)
+
+    def _generate_structured_output_table(self, results: ResultBuffer) -> str:
+        """Generate a table splitting structured output cost into generation and validation.
+        
+        Validation cost is the time to re-validate the result after the run
+        (see measure_validation), so the generation column is an estimate:
+        total duration minus that re-validation time.
+        
+        Args:
+            results: Result buffer of the run
+            
+        Returns:
+            Markdown formatted table, or an empty string without structured results
+        """
+        headers = [
+            "Model",
+            "Tests",
+            "Valid",
+            "Avg Total (s)",
+            "Avg Generation, est. (s)",
+            "Avg Re-validation (ms)",
+            "Retries"
+        ]
+        
+        structured_ids = {results.test_cases.id_of(tc.name) for tc in STRUCTURED_TESTS}
+        validation_times = results.validation_times
+        rows = []
+        for model, indices in sorted(results.rows_by_model().items()):
+            structured = [idx for idx in indices if not math.isnan(validation_times[idx])]
+            if not structured:
+                continue
+            count = len(structured)
+            avg_total = sum(results.durations[idx] for idx in structured) / count
+            avg_validation = sum(validation_times[idx] for idx in structured) / count
+            row = [
+                model,
+                str(sum(1 for idx in indices if results.test_case_ids[idx] in structured_ids)),
+                str(count),
+                f"{avg_total:.2f}",
+                f"{avg_total - avg_validation:.2f}",
+                f"{avg_validation * 1000:.3f}",
+                str(sum(results.retries[idx] for idx in structured))
+            ]
+            rows.append("| " + " | ".join(row) + " |")
+        
+        if not rows:
+            return ""
+        
+        header_row = "| " + " | ".join(headers) + " |"
+        separator = "|" + "|".join("---" for _ in range(len(headers))) + "|"
+        return "\n".join([header_row, separator] + rows)
+
+    def _generate_code_check_table(self, results: ResultBuffer) -> str:
+        """Generate a table of hidden test results for generated code.
+        
+        Args:
+            results: Result buffer of the run
+            
+        Returns:
+            Markdown formatted table, or an empty string without checked results
+        """
+        headers = [
+            "Model",
+            "Checked",
+            "Tests Passed",
+            "Pass Rate",
+            "Fully Passing",
+            "Avg Exec Time (s)"
+        ]
+        
+        rows = []
+        for model, indices in sorted(results.rows_by_model().items()):
+            # Unchecked rows hold -1
+            checked = [idx for idx in indices if results.code_total[idx] > 0]
+            if not checked:
+                continue
+            passed = sum(results.code_passed[idx] for idx in checked)
+            total = sum(results.code_total[idx] for idx in checked)
+            row = [
+                model,
+                str(len(checked)),
+                f"{passed}/{total}",
+                f"{passed / total * 100:.1f}%",
+                str(sum(1 for idx in checked if results.code_passed[idx] == results.code_total[idx])),
+                f"{sum(results.code_times[idx] for idx in checked) / len(checked):.2f}"
+            ]
+            rows.append("| " + " | ".join(row) + " |")
+        
+        if not rows:
+            return ""
+        
+        header_row = "| " + " | ".join(headers) + " |"
+        separator = "|" + "|".join("---" for _ in range(len(headers))) + "|"
+        return "\n".join([header_row, separator] + rows)
+
+    def _generate_cache_table(self, results: ResultBuffer) -> str:
+        """Generate a table comparing cold and warm prompt prefix requests.
+        
+        The first test case of the prompt caching scenario is the cold request,
+        the rest reuse its prefix. Savings are estimated from the provider's
+        discount on cached input tokens.
         
         Args:
-            all_results: Dictionary mapping model names to their test results
+            results: Result buffer of the run
             
         Returns:
-            Markdown formatted table with metrics
+            Markdown formatted table, or an empty string without caching results
         """
         headers = [
             "Model",
-            "Test Case",
-            "Success",
-            "Duration (s)",
-            "Response Length",
-            "Has Headers",
-            "Has Lists",
-            "Has Code Blocks"
+            "Cold (s)",
+            "Warm Avg (s)",
+            "Speedup",
+            "Cold TTFT (s)",
+            "Warm TTFT (s)",
+            "Warm Cache Hits",
+            "Cached Prompt Share",
+            "Est. Input Savings"
         ]
-        
-        separator = "|" + "|".join("---" for _ in range(len(headers))) + "|"
-        header_row = "| " + " | ".join(headers) + " |"
+        cold_id = results.test_cases.id_of(PROMPT_CACHING_TESTS[0].name)
+        warm_ids = {results.test_cases.id_of(tc.name) for tc in PROMPT_CACHING_TESTS[1:]}
+        durations, ttfts = results.durations, results.ttfts
         
         rows = []
-        for model, results in all_results.items():
-            model_metrics = {
-                "total_duration": 0,
-                "total_success": 0,
-                "avg_response_length": 0
-            }
-            
-            for result in results:
-                if not result.success:
-                    continue
-                    
-                response = result.response or ""
-                has_headers = "#" in response
-                has_lists = "*" in response or "-" in response
-                has_code = "```" in response
-                
-                row = [
-                    model,
-                    result.test_case,
-                    "✓" if result.success else "✗",
-                    f"{result.duration:.2f}",
-                    str(len(response)),
-                    "✓" if has_headers else "✗",
-                    "✓" if has_lists else "✗",
-                    "✓" if has_code else "✗"
-                ]
-                rows.append("| " + " | ".join(row) + " |")
-                
-                # Update metrics
-                model_metrics["total_duration"] += result.duration
-                model_metrics["total_success"] += 1
-                model_metrics["avg_response_length"] += len(response)
-            
-            # Add summary row for model
-            if results:
-                avg_duration = model_metrics["total_duration"] / len(results)
-                success_rate = (model_metrics["total_success"] / len(results)) * 100
-                avg_length = model_metrics["avg_response_length"] / len(results)
-                
-                summary_row = [
-                    f"{model} (Summary)",
-                    "ALL",
-                    f"{success_rate:.1f}%",
-                    f"{avg_duration:.2f}",
-                    f"{avg_length:.0f}",
-                    "-",
-                    "-",
-                    "-"
-                ]
-                rows.append("| " + " | ".join(summary_row) + " |")
-                rows.append(separator)
+        for model, indices in sorted(results.rows_by_model().items()):
+            successful = [idx for idx in indices if results.success[idx]]
+            cold = next((idx for idx in successful if results.test_case_ids[idx] == cold_id), None)
+            warm = [idx for idx in successful if results.test_case_ids[idx] in warm_ids]
+            if cold is None or not warm:
+                continue
+            warm_duration = sum(durations[idx] for idx in warm) / len(warm)
+            warm_ttfts = [ttfts[idx] for idx in warm if not math.isnan(ttfts[idx])]
+            # Token counts not reported by the provider hold -1
+            reported = [idx for idx in warm if results.cached_tokens[idx] >= 0 and results.request_tokens[idx] > 0]
+            if reported:
+                cached = sum(results.cached_tokens[idx] for idx in reported)
+                share = cached / sum(results.request_tokens[idx] for idx in reported)
+                discount = PROMPT_CACHE_DISCOUNTS.get(get_model_info(model)["provider"], 0.0)
+                hits = f"{sum(1 for idx in reported if results.cached_tokens[idx] > 0)}/{len(warm)}"
+                share_cell, savings_cell = f"{share * 100:.1f}%", f"{share * discount * 100:.1f}%"
+            else:
+                hits = share_cell = savings_cell = "n/a"
+            row = [
+                model,
+                f"{durations[cold]:.2f}",
+                f"{warm_duration:.2f}",
+                f"{durations[cold] / warm_duration:.2f}x",
+                f"{ttfts[cold]:.2f}" if not math.isnan(ttfts[cold]) else "-",
+                f"{sum(warm_ttfts) / len(warm_ttfts):.2f}" if warm_ttfts else "-",
+                hits,
+                share_cell,
+                savings_cell
+            ]
+            rows.append("| " + " | ".join(row) + " |")
+        
+        if not rows:
+            return ""
         
+        header_row = "| " + " | ".join(headers) + " |"
+        separator = "|" + "|".join("---" for _ in range(len(headers))) + "|"
         return "\n".join([header_row, separator] + rows)
 
-    def _generate_speed_ranking(self, all_results: Dict[str, List[TestResult]]) -> str:
-        """Generate a speed ranking summary for all models."""
-        if not all_results:
-            return "No test results available"
-        
-        # Calculate speed metrics for each model
-        speed_metrics = []
-        for model, results in all_results.items():
-            # Skip if all durations are 0
-            durations = [r.duration for r in results]
-            if not any(durations):  # if all durations are 0
-                continue
-            
-            metrics = {
-                "model": model,
-                "avg_duration": sum(durations) / len(durations),
-                "min_duration": min(durations),
-                "max_duration": max(durations),
-                "total_duration": sum(durations)
-            }
-            speed_metrics.append(metrics)
-        
-        if not speed_metrics:
-            return "No valid timing data available"
+    def _generate_tool_use_table(self, results: ResultBuffer) -> str:
+        """Generate a table of how efficiently models complete tool-use tasks.
         
-        # Sort by average duration (faster first)
-        speed_metrics.sort(key=lambda x: x["avg_duration"])
+        An answer is correct when it matches the test case's validation
+        pattern. Turns, tool calls and time to answer are averaged over
+        finished tasks; round trip percentiles are taken over all their
+        round trips. Models are sorted by time to answer.
         
-        # Generate table
+        Args:
+            results: Result buffer of the run
+            
+        Returns:
+            Markdown formatted table, or an empty string without tool-use results
+        """
         headers = [
-            "Rank",
             "Model",
-            "Avg Time (s)",
-            "Min Time (s)",
-            "Max Time (s)",
-            "Total Time (s)",
-            "Relative Speed"
+            "Tasks",
+            "Correct",
+            "Avg Turns",
+            "Avg Tool Calls",
+            "Round Trip P50 (s)",
+            "Round Trip P95 (s)",
+            "Time to Answer (s)"
         ]
         
+        patterns = {
+            case_id: (tc.validation_rules or {}).get("pattern")
+            for tc in TOOL_USE_TESTS
+            if (case_id := results.test_cases.id_of(tc.name)) is not None
+        }
+        rows = []
+        for model, indices in results.rows_by_model().items():
+            tasks = [idx for idx in indices if results.test_case_ids[idx] in patterns and not results.skipped[idx]]
+            finished = [idx for idx in tasks if results.success[idx] and results.model_turns[idx] >= 0]
+            if not tasks:
+                continue
+            correct = sum(
+                1 for idx in finished
+                if (response := results.responses[idx]) and (
+                    (pattern := patterns[results.test_case_ids[idx]]) is None or re.search(pattern, response)
+                )
+            )
+            round_trips = [t for idx in finished for t in results.tool_round_trips[idx] or []]
+            time_to_answer = np.mean([results.durations[idx] for idx in finished]) if finished else None
+            row = [
+                model,
+                str(len(tasks)),
+                f"{correct}/{len(tasks)}",
+                f"{np.mean([results.model_turns[idx] for idx in finished]):.1f}" if finished else "n/a",
+                f"{np.mean([results.tool_calls[idx] for idx in finished]):.1f}" if finished else "n/a",
+                f"{np.percentile(round_trips, 50):.2f}" if round_trips else "n/a",
+                f"{np.percentile(round_trips, 95):.2f}" if round_trips else "n/a",
+                f"{time_to_answer:.2f}" if time_to_answer is not None else "n/a"
+            ]
+            rows.append((time_to_answer if time_to_answer is not None else float("inf"), "| " + " | ".join(row) + " |"))
+        
+        if not rows:
+            return ""
+        
+        rows.sort(key=lambda item: item[0])
         header_row = "| " + " | ".join(headers) + " |"
         separator = "|" + "|".join("---" for _ in range(len(headers))) + "|"
+        return "\n".join([header_row, separator] + [row for _, row in rows])
+
+    def _generate_multi_turn_table(self, results: ResultBuffer) -> str:
+        """Generate a table of turn latency against cumulative conversation context.
         
-        # Calculate relative speed compared to slowest
-        slowest_avg = max(m["avg_duration"] for m in speed_metrics)
+        The slope is a least-squares fit of turn latency on the turn's prompt
+        tokens over all turns of the model's conversations.
+        
+        Args:
+            results: Result buffer of the run
+            
+        Returns:
+            Markdown formatted table, or an empty string without multi-turn results
+        """
+        headers = [
+            "Model",
+            "Conversations",
+            "Turns",
+            "First Turn (s)",
+            "Last Turn (s)",
+            "Context First → Last (tokens)",
+            "Latency per 1k Context Tokens (ms)"
+        ]
         
         rows = []
-        for rank, metrics in enumerate(speed_metrics, 1):
-            relative_speed = slowest_avg / metrics["avg_duration"]
+        for model, indices in sorted(results.rows_by_model().items()):
+            conversations = [idx for idx in indices if results.success[idx] and results.turn_durations[idx]]
+            if not conversations:
+                continue
+            turn_durations = [results.turn_durations[idx] for idx in conversations]
+            context_sizes = [results.turn_context_tokens[idx] or [] for idx in conversations]
+            points = [
+                (tokens, duration)
+                for sizes, durations in zip(context_sizes, turn_durations)
+                for tokens, duration in zip(sizes, durations)
+                if tokens is not None
+            ]
+            context = np.array([tokens for tokens, _ in points], dtype=float)
+            latency = np.array([duration for _, duration in points])
+            slope = np.polyfit(context, latency, 1)[0] if len(np.unique(context)) > 1 else None
+            first_tokens = [sizes[0] for sizes in context_sizes if sizes and sizes[0] is not None]
+            last_tokens = [sizes[-1] for sizes in context_sizes if sizes and sizes[-1] is not None]
             row = [
-                str(rank),
-                metrics["model"],
-                f"{metrics['avg_duration']:.2f}",
-                f"{metrics['min_duration']:.2f}",
-                f"{metrics['max_duration']:.2f}",
-                f"{metrics['total_duration']:.2f}",
-                f"{relative_speed:.1f}x faster"
+                model,
+                str(len(conversations)),
+                str(sum(len(durations) for durations in turn_durations)),
+                f"{np.mean([durations[0] for durations in turn_durations]):.2f}",
+                f"{np.mean([durations[-1] for durations in turn_durations]):.2f}",
+                f"{np.mean(first_tokens):.0f} → {np.mean(last_tokens):.0f}" if first_tokens and last_tokens else "n/a",
+                f"{slope * 1e6:.1f}" if slope is not None else "n/a"
             ]
             rows.append("| " + " | ".join(row) + " |")
         
-        return "\n".join([
-            "\n## Speed Rankings (Lower is Better)",
-            header_row,
-            separator
-        ] + rows)
+        if not rows:
+            return ""
+        
+        header_row = "| " + " | ".join(headers) + " |"
+        separator = "|" + "|".join("---" for _ in range(len(headers))) + "|"
+        return "\n".join([header_row, separator] + rows)
 
-    def save_test_summary(self, all_results: Dict[str, List[TestResult]], timestamp: str) -> str:
+    def save_test_summary(self, results: ResultBuffer, timestamp: str) -> str:
         """Save test results summary to a markdown file.
         
         Args:
-            all_results: Dictionary mapping model names to their test results
+            results: Result buffer of the run
             timestamp: Timestamp for the filename
             
         Returns:
             Path to the created markdown file
         """
         # Create markdown directory if it doesn't exist
-        markdown_dir = Path("test_results/markdown")
+        markdown_dir = self.markdown_dir
         markdown_dir.mkdir(parents=True, exist_ok=True)
         
         # Create filename with timestamp
@@ -727,15 +2228,90 @@ class ModelTester:
             # Write header
             f.write("# Model Test Results Summary\n\n")
             f.write(f"Test run: {datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S UTC')}\n\n")
+            f.write(f"Scenarios: {', '.join(scenario.value for scenario in self.scenarios)}\n\n")
+            skipped = sum(
+                1 for idx in range(len(results))
+                if results.skipped[idx] and not (results.errors[idx] or "").startswith(CIRCUIT_OPEN_ERROR)
+            )
+            if self.timed_out and skipped:
+                f.write(
+                    f"**Partial run:** the wall-time budget of {self.max_wall_time:.0f}s expired; "
+                    f"{skipped} test cases were skipped.\n\n"
+                )
             
             # Write metrics table
             f.write("## Detailed Metrics\n\n")
-            f.write(self._generate_metrics_table(all_results))
+            f.write(self._generate_metrics_table(results))
             f.write("\n\n")
             
             # Write speed rankings
             f.write("## Speed Rankings (Lower is Better)\n\n")
-            f.write(self._generate_speed_ranking(all_results))
+            f.write(self._generate_speed_ranking(results))
+            
+            # Write the breakdown of a sweep across scenarios
+            if scenario_table := self._generate_scenario_table(results):
+                f.write("\n\n## Scenarios\n\n")
+                f.write(scenario_table)
+            
+            # Write structured output cost
+            if structured_table := self._generate_structured_output_table(results):
+                f.write("\n\n## Structured Output Cost\n\n")
+                f.write(structured_table)
+            
+            # Write functional checks of generated code
+            if code_table := self._generate_code_check_table(results):
+                f.write("\n\n## Code Execution\n\n")
+                f.write(code_table)
+            
+            # Write cold vs warm prompt prefix latency and savings
+            if cache_table := self._generate_cache_table(results):
+                f.write("\n\n## Prompt Caching\n\n")
+                f.write(cache_table)
+            
+            # Write latency scaling with conversation depth
+            if turn_table := self._generate_multi_turn_table(results):
+                f.write("\n\n## Multi-Turn Latency\n\n")
+                f.write(turn_table)
+            
+            # Write model turns, tool round trips and time to answer of tool tasks
+            if tool_table := self._generate_tool_use_table(results):
+                f.write("\n\n## Tool Use\n\n")
+                f.write(tool_table)
+            
+            # Write event loop scheduling delay, which inflates measured durations
+            if self.lag_monitor.samples:
+                f.write("\n\n## Event Loop Lag\n\n")
+                f.write(self.lag_monitor.generate_table())
+            
+            # Write breaker states and transitions
+            if self.breakers.transitions:
+                f.write("\n\n## Circuit Breakers\n\n")
+                f.write(self.breakers.generate_table())
+            
+            # Write planned vs actual makespan
+            if self.plan and self.plan.estimates:
+                f.write("\n\n## Schedule\n\n")
+                f.write(self.plan.generate_table(self.makespan))
+            
+            # Write per-route performance for models with several providers
+            if self.router.has_alternatives():
+                f.write("\n\n## Route Performance\n\n")
+                f.write(self.router.generate_route_table())
+            
+            # Write adaptive concurrency state
+            if self.concurrency.limiters:
+                f.write("\n\n## Concurrency Control\n\n")
+                f.write(self.concurrency.generate_state_table())
+            
+            # Write artifact store I/O
+            if self.artifacts.bytes_in:
+                f.write("\n\n## Response Storage\n\n")
+                f.write(self.artifacts.generate_stats_table())
+            
+            # Write the harness's own CPU and memory use, up to this summary
+            if self.profiler:
+                f.write("\n\n## Harness Resources\n\n")
+                f.write(self.profiler.generate_table())
         
         return str(filepath)
 
@@ -750,7 +2326,7 @@ class ModelTester:
             Path to the created markdown file
         """
         # Create markdown directory if it doesn't exist
-        markdown_dir = Path("test_results/markdown")
+        markdown_dir = self.markdown_dir
         markdown_dir.mkdir(parents=True, exist_ok=True)
         
         # Create filename
@@ -780,21 +2356,72 @@ class ModelTester:
         
         return str(filepath)
 
-    async def run_all_tests(self, failed_only: bool = False):
-        """Run tests for all available models concurrently while tracking individual progress."""
+    async def run_all_tests(
+        self,
+        failed_only: bool = False,
+        batch: bool = False,
+        max_wall_time: Optional[float] = None,
+        check_code: bool = False,
+        profile_cpu: bool = False,
+        profile_mem: bool = False,
+        models: Optional[Sequence[str]] = None
+    ) -> Optional[str]:
+        """Run tests for all available models concurrently while tracking individual progress.
+
+        Args:
+            failed_only: Only test models that have failed before
+            batch: Submit test cases through provider batch endpoints instead of per-request calls
+            max_wall_time: Cancel the run after this many seconds and report partial results
+            check_code: Run hidden tests against generated code in a sandbox
+            profile_cpu: Sample the harness's stacks and write a flamegraph profile
+            profile_mem: Trace the harness's allocations and write a top allocations report
+            models: Models to test, of available providers (default: latest model of each base model)
+            
+        Returns:
+            Path to the summary file, or None if nothing was tested
+        """
+        if not (profile_cpu or profile_mem):
+            return await self._run_all_tests(failed_only, batch, max_wall_time, check_code, models)
+        
+        self.profiler = RunProfiler(cpu=profile_cpu, memory=profile_mem)
+        self.profiler.start()
+        try:
+            return await self._run_all_tests(failed_only, batch, max_wall_time, check_code, models)
+        finally:
+            self.profiler.stop()
+            print("\nHarness Resources:")
+            print(self.profiler.generate_table())
+            name = self.run_id or datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+            for path in self.profiler.write_reports(self.results_dir / "profiles", name):
+                print(f"Profile saved to: {path}")
+
+    async def _run_all_tests(
+        self,
+        failed_only: bool,
+        batch: bool,
+        max_wall_time: Optional[float],
+        check_code: bool,
+        models: Optional[Sequence[str]] = None
+    ) -> Optional[str]:
+        """Run the tests of run_all_tests."""
         # Check provider availability first
         self._check_provider_availability()
         
         if not self.available_providers:
             print("\n❌ Cannot proceed with testing - no API keys available.")
-            return
+            return None
             
-        # Get latest models from each provider
+        # Get latest models from each provider; this also registers their routes
         latest_models = self._get_latest_models()
+        if models is not None:
+            latest_models = [
+                model for model in models
+                if model in MODEL_REGISTRY and get_model_info(model)["provider"] in self.available_providers
+            ]
         
         if not latest_models:
             print("\n❌ No models available for testing with current API keys.")
-            return
+            return None
         
         print(f"\nPreparing to test {len(latest_models)} models:")
         for model in latest_models:
@@ -810,49 +2437,134 @@ class ModelTester:
         print("\nModel Capabilities:")
         print(self._generate_capability_table(models_info))
         
-        print("\nStarting concurrent model testing...")
+        # Results of this run are collected in the columnar buffer
+        self.results = ResultBuffer()
+        self.run_id = self._new_run_id()
+        
+        async def run_models():
+            if batch:
+                await self.run_batch_tests(sorted(latest_models))
+                return
+            
+            # Run all tests concurrently
+            test_tasks = [
+                self.test_model(model)
+                for model in sorted(latest_models)
+            ]
+            
+            # Wait for all tests to complete
+            results = await asyncio.gather(*test_tasks, return_exceptions=True)
+            
+            for model, model_results in zip(sorted(latest_models), results):
+                if isinstance(model_results, Exception):
+                    self.progress.log(f"Error testing {model}: {str(model_results)}")
+        
+        print(f"\nStarting {'batch' if batch else 'concurrent'} model testing...")
         print("=" * 80)
         
-        # Run all tests concurrently
-        test_tasks = [
-            self.test_model(model)
-            for model in sorted(latest_models)
-        ]
+        self.code_checker = CodeChecker() if check_code else None
         
-        # Wait for all tests to complete
-        results = await asyncio.gather(*test_tasks, return_exceptions=True)
+        # Longest jobs start first within each provider's concurrency limit
+        self.plan = None if batch else self._plan_schedule(sorted(latest_models))
         
-        # Collect all results
-        all_results = {}
-        for model, model_results in zip(latest_models, results):
-            if isinstance(model_results, Exception):
-                print(f"\nError testing {model}: {str(model_results)}")
-                continue
-            all_results[model] = model_results
-            # Save results for each model
-            self.save_results(model, model_results)
+        # Progress is reported through the live view while requests run
+        self.progress = ProgressView()
+        self.progress.start()
+        # Annotates results with the loop lag seen while they were in flight
+        self.lag_monitor.start()
+        self.max_wall_time = max_wall_time
+        self.timed_out = False
+        start_time = time.perf_counter()
+        try:
+            # Cancels in-flight requests when the budget expires; finished
+            # results are already recorded
+            await asyncio.wait_for(run_models(), timeout=max_wall_time)
+        except asyncio.TimeoutError:
+            self.timed_out = True
+            skipped = self._record_skipped(sorted(latest_models))
+            self.progress.cancel_pending()
+            self.progress.log(
+                f"Wall-time budget of {max_wall_time:.0f}s exceeded: "
+                f"in-flight requests cancelled, {skipped} test cases skipped"
+            )
+        self.makespan = time.perf_counter() - start_time
+        await self.lag_monitor.stop()
+        await self.progress.stop()
+        
+        # Files are written on the writer thread, so the event loop never
+        # blocks on disk. Rows are selected now; writes run in this order.
+        for model in self.results.models.values:
+            await self.writer.submit(
+                f"results:{self.run_id}:{model}",
+                partial(self._write_results, model, self.results, self.results.rows_for_model(model), self.run_id)
+            )
+        
+        # Reports aggregate the buffer's columns directly
+        results = self.results
         
         print("\n" + "=" * 80)
-        print("Testing completed. Detailed Metrics:\n")
-        print(self._generate_metrics_table(all_results))
+        if self.timed_out:
+            print("Testing stopped at the wall-time budget (partial results). Detailed Metrics:\n")
+        else:
+            print("Testing completed. Detailed Metrics:\n")
+        print(self._generate_metrics_table(results))
         
         # Add speed ranking
         print("\nSpeed Performance Summary:")
-        print(self._generate_speed_ranking(all_results))
+        print(self._generate_speed_ranking(results))
+        
+        if code_table := self._generate_code_check_table(results):
+            print("\nCode Execution:")
+            print(code_table)
+        
+        if tool_table := self._generate_tool_use_table(results):
+            print("\nTool Use:")
+            print(tool_table)
+        
+        if self.plan and self.plan.estimates:
+            print("\nSchedule (Makespan):")
+            print(self.plan.generate_table(self.makespan))
+        
+        if self.breakers.transitions:
+            print("\nCircuit Breakers:")
+            print(self.breakers.generate_table())
+        
+        if self.lag_monitor.samples:
+            print("\nEvent Loop Lag:")
+            print(self.lag_monitor.generate_table())
+        
+        if self.router.has_alternatives():
+            print("\nRoute Performance:")
+            print(self.router.generate_route_table())
+        
+        # Show and persist learned concurrency limits
+        if self.concurrency.limiters:
+            print("\nConcurrency Control:")
+            print(self.concurrency.generate_state_table())
+            await self.writer.submit(self.concurrency.state_file, self.concurrency.save)
         
         # Save updated history
-        self._save_history()
+        await self.writer.submit(self.history_file, partial(write_json, self.history_file, self._history_snapshot()))
 
-        # Generate timestamp for filename
-        timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+        # Reports are named by run, like the results files
+        timestamp = self.run_id
         
-        # Save results to markdown file
-        summary_file = self.save_test_summary(all_results, timestamp)
-        print(f"\nTest summary saved to: {summary_file}")
+        # Save results to markdown file; rendered after the results writes,
+        # so the response storage statistics are complete
+        summary_file = await self.writer.submit(
+            f"summary:{timestamp}", partial(self.save_test_summary, results, timestamp)
+        )
 
         # Save capabilities summary
-        capabilities_file = self.save_capabilities_summary(models_info, timestamp)
-        print(f"\nCapabilities summary saved to: {capabilities_file}")
+        capabilities_file = await self.writer.submit(
+            f"capabilities:{timestamp}", partial(self.save_capabilities_summary, models_info, timestamp)
+        )
+        
+        await self.writer.close()
+        print(f"\nTest summary saved to: {summary_file.result()}")
+        print(f"\nCapabilities summary saved to: {capabilities_file.result()}")
+        print(f"Persistence: {self.writer.summary_line()}")
+        return summary_file.result()
 
 
 def get_parser() -> argparse.ArgumentParser:
@@ -883,6 +2595,30 @@ Examples:
     
     # Run specific test scenario
     python model_test.py --run-tests --scenario multi-file
+    
+    # Run several scenarios in one sweep
+    python model_test.py --run-tests --scenario standard structured
+    
+    # Run tests through provider batch APIs
+    python model_test.py --run-tests --batch
+    
+    # Probe every model every 5 minutes and alert on p95 latency or errors
+    python model_test.py --monitor --alert-p95 10 --alert-error-rate 0.2
+    
+    # Aggregate all saved results by provider and test case
+    python model_test.py --aggregate --group-by provider test_case
+    
+    # Export new results to partitioned Parquet (or .npz without pyarrow)
+    python model_test.py --export
+    
+    # Bound a scheduled run to 20 minutes
+    python model_test.py --run-tests --max-wall-time 1200
+    
+    # Check generated code against hidden unit tests
+    python model_test.py --run-tests --check-code
+    
+    # Fit per-model latency models from 1k to 32k token prompts
+    python model_test.py --benchmark-context --context-sizes 1000 4000 16000 32000
     """
     )
     
@@ -903,6 +2639,31 @@ Examples:
         action="store_true",
         help="Show test history for all models"
     )
+    group.add_argument(
+        "--render-markdown",
+        action="store_true",
+        help="Render markdown views of the latest saved responses"
+    )
+    group.add_argument(
+        "--aggregate",
+        action="store_true",
+        help="Aggregate all saved results (see --group-by)"
+    )
+    group.add_argument(
+        "--export",
+        action="store_true",
+        help="Export saved results not exported yet to partitioned columnar files"
+    )
+    group.add_argument(
+        "--benchmark-context",
+        action="store_true",
+        help="Measure latency at increasing input sizes and fit a latency model per model"
+    )
+    group.add_argument(
+        "--monitor",
+        action="store_true",
+        help="Probe every model on a schedule and alert on rolling p95 latency and error rate"
+    )
     group.add_argument(
         "--help-verbose",
         action="store_true",
@@ -914,7 +2675,7 @@ Examples:
         "--providers",
         nargs="+",
         choices=["anthropic", "openai", "google-gla", "google-vertex", 
-                "mistral", "fireworks", "groq", "cohere", "openrouter"],
+                "mistral", "fireworks", "groq", "cohere", "openrouter", "mock"],
         help="Specific providers to test (default: all available)"
     )
     parser.add_argument(
@@ -924,10 +2685,10 @@ Examples:
     )
     parser.add_argument(
         "--scenario",
-        type=TestScenario,
-        choices=list(TestScenario),
-        default=TestScenario.STANDARD,
-        help="Test scenario to run (default: standard)"
+        nargs="+",
+        choices=[scenario.value for scenario in TestScenario] + [ALL_SCENARIOS],
+        default=[TestScenario.STANDARD.value],
+        help="Test scenarios to run in one sweep, or all (default: standard)"
     )
     parser.add_argument(
         "--output-dir",
@@ -940,6 +2701,114 @@ Examples:
         action="store_true",
         help="Run tests concurrently across models"
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit tests through provider batch APIs (slower, cheaper; for offline sweeps)"
+    )
+    parser.add_argument(
+        "--max-wall-time",
+        type=float,
+        metavar="SECONDS",
+        help="Cancel the run after this many seconds and write partial reports; with --monitor, stop monitoring"
+    )
+    parser.add_argument(
+        "--check-code",
+        action="store_true",
+        help="Run generated code against hidden tests in sandboxed subprocesses"
+    )
+    parser.add_argument(
+        "--group-by",
+        nargs="+",
+        choices=GROUP_KEYS,
+        default=["model"],
+        help="Group keys for --aggregate (default: model)"
+    )
+    parser.add_argument(
+        "--export-dir",
+        type=str,
+        help="Directory for --export (default: test_results/export)"
+    )
+    parser.add_argument(
+        "--export-format",
+        choices=["parquet", "npz"],
+        help="File format for --export (default: parquet when pyarrow is installed, otherwise npz)"
+    )
+    parser.add_argument(
+        "--context-sizes",
+        nargs="+",
+        type=int,
+        metavar="TOKENS",
+        help="Input sizes for --benchmark-context (default: 1k to 128k, capped by the context window)"
+    )
+    parser.add_argument(
+        "--mock-models",
+        type=int,
+        metavar="COUNT",
+        help="Add COUNT models served by the local mock server (see model_mock.py)"
+    )
+    parser.add_argument(
+        "--mock-profile",
+        choices=list(MOCK_PROFILES),
+        default="fast",
+        help="Latency profile of the --mock-models models (default: fast)"
+    )
+    parser.add_argument(
+        "--profile-cpu",
+        action="store_true",
+        help="Sample the harness's CPU use during --run-tests and write a flamegraph profile"
+    )
+    parser.add_argument(
+        "--profile-mem",
+        action="store_true",
+        help="Trace the harness's allocations during --run-tests and write a top allocations report"
+    )
+    parser.add_argument(
+        "--probe-interval",
+        type=float,
+        default=DEFAULT_PROBE_INTERVAL,
+        metavar="SECONDS",
+        help=f"Seconds between --monitor probes of a model (default: {DEFAULT_PROBE_INTERVAL:g})"
+    )
+    parser.add_argument(
+        "--probe-cases",
+        nargs="+",
+        choices=list(TEST_SCENARIOS),
+        default=["basic_response"],
+        metavar="TEST_CASE",
+        help="Test cases sent on each --monitor probe (default: basic_response)"
+    )
+    parser.add_argument(
+        "--monitor-windows",
+        nargs="+",
+        type=float,
+        default=list(DEFAULT_WINDOWS),
+        metavar="SECONDS",
+        help="Rolling windows of --monitor metrics (default: 900 3600 86400)"
+    )
+    parser.add_argument(
+        "--alert-p95",
+        type=float,
+        metavar="SECONDS",
+        help="Alert when a model's rolling p95 latency exceeds this"
+    )
+    parser.add_argument(
+        "--alert-error-rate",
+        type=float,
+        metavar="FRACTION",
+        help="Alert when a model's rolling error rate exceeds this, e.g. 0.2"
+    )
+    parser.add_argument(
+        "--alert-file",
+        type=str,
+        help="JSON lines file --monitor alerts are appended to (default: test_results/monitor_alerts.jsonl)"
+    )
+    parser.add_argument(
+        "--alert-webhook",
+        type=str,
+        metavar="URL",
+        help="URL --monitor alerts are posted to as JSON"
+    )
     
     return parser
 
@@ -973,6 +2842,25 @@ Test Scenarios:
    - Multiple file handling
    - Interface/implementation patterns
 
+3. Structured:
+   - Pydantic result models (JSON/tool output)
+   - Estimated generation vs. re-validation time
+   - Validation retry counts
+
+4. Prompt caching:
+   - Repeated requests sharing a long prompt prefix
+   - Cold vs. warm duration and time to first token
+   - Cache hits and estimated input cost savings
+
+5. Multi-turn:
+   - Conversations carrying message history across turns
+   - Per-turn latency against cumulative context size
+
+6. Tool use:
+   - Multi-step tasks solved with local lookup and calculator tools
+   - Model turns, tool calls and round trip latency per task
+   - Time to answer and correctness per model
+
 Provider Support:
 ---------------
 Major Providers:
@@ -1013,8 +2901,20 @@ python model_test.py --run-tests --providers anthropic openai
 # Run multi-file test scenario:
 python model_test.py --run-tests --scenario multi-file
 
+# Run every scenario in one sweep:
+python model_test.py --run-tests --scenario all
+
 # Show test history:
 python model_test.py --show-history
+
+# Aggregate saved results per provider and day:
+python model_test.py --aggregate --group-by provider day
+
+# Export saved results for analytics tools:
+python model_test.py --export
+
+# Benchmark latency against input size and fit latency models:
+python model_test.py --benchmark-context
 """)
 
 async def main():
@@ -1028,9 +2928,14 @@ async def main():
     
     # Initialize tester with scenario and output directory
     tester = ModelTester(
-        scenario=args.scenario
+        scenario=args.scenario,
+        output_dir=args.output_dir
     )
     
+    if args.mock_models:
+        register_mock_models(args.mock_models, args.mock_profile)
+        tester.available_providers.add("mock")
+    
     if args.list_providers:
         tester._check_provider_availability()
         return
@@ -1055,12 +2960,62 @@ async def main():
                     print(f"    • {issue}")
         return
     
+    if args.render_markdown:
+        models = sorted({f.name.rsplit("_", 2)[0] for f in tester.results_dir.glob("*:*_*.json")})
+        for model in models:
+            if md_file := tester.render_markdown(model):
+                print(f"Rendered {model} to {md_file}")
+        return
+    
+    if args.aggregate:
+        table = aggregate(tester.load_result_history(), args.group_by)
+        if not len(table):
+            print("No saved results to aggregate")
+            return
+        print(table.to_markdown())
+        return
+    
+    if args.export:
+        written = tester.export_results(
+            Path(args.export_dir) if args.export_dir else None,
+            args.export_format
+        )
+        print(f"Exported {len(written)} files")
+        return
+    
+    if args.benchmark_context:
+        if args.providers:
+            tester.available_providers = {p for p in args.providers if p in tester.available_providers}
+        await tester.run_context_benchmark(args.context_sizes)
+        return
+    
+    if args.monitor:
+        if args.providers:
+            tester.available_providers = {p for p in args.providers if p in tester.available_providers}
+        await tester.run_monitor(
+            interval=args.probe_interval,
+            probe_cases=args.probe_cases,
+            windows=args.monitor_windows,
+            thresholds=AlertThresholds(p95=args.alert_p95, error_rate=args.alert_error_rate),
+            alert_file=Path(args.alert_file) if args.alert_file else None,
+            webhook=args.alert_webhook,
+            duration=args.max_wall_time
+        )
+        return
+    
     if args.run_tests:
         # Filter providers if specified
         if args.providers:
             tester.available_providers = {p for p in args.providers if p in tester.available_providers}
         
-        await tester.run_all_tests(failed_only=args.failed_only)
+        await tester.run_all_tests(
+            failed_only=args.failed_only,
+            batch=args.batch,
+            max_wall_time=args.max_wall_time,
+            check_code=args.check_code,
+            profile_cpu=args.profile_cpu,
+            profile_mem=args.profile_mem
+        )
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
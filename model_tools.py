@@ -0,0 +1,99 @@
+"""
+Deterministic local tools for the tool-use scenario.
+
+Tool-use test cases register these tools on the agent. They run in
+process, take microseconds and always return the same output for the
+same input, so the measured latency of a tool task is model latency:
+the number of model turns a task needs and the time of each round trip.
+
+    calculate(expression)  Evaluates arithmetic on numbers
+    lookup(key)            Reads a value from a fixed key-value table
+"""
+
+import ast
+import operator
+from typing import Dict, List, Sequence
+
+from pydantic_ai import ModelRetry, Tool
+
+# Key-value data behind the lookup tool
+LOOKUP_DATA: Dict[str, str] = {
+    "price:widget": "12.50 USD",
+    "price:gadget": "7.25 USD",
+    "price:gizmo": "3.10 USD",
+    "tax_rate:default": "0.085",
+    "plan:basic": "19.00 USD per month",
+    "plan:premium": "49.00 USD per month",
+    "fx:USD-EUR": "0.92",
+    "fx:USD-GBP": "0.79",
+    "stock:sku-7": "1260 units",
+    "daily_sales:sku-7": "45 units",
+    "stock:sku-9": "380 units",
+    "daily_sales:sku-9": "19 units",
+}
+
+_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+def _evaluate(node: ast.AST) -> float:
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _OPERATORS:
+        left, right = _evaluate(node.left), _evaluate(node.right)
+        if isinstance(node.op, ast.Pow) and abs(right) > 100:
+            raise ValueError("exponent too large")
+        return _OPERATORS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _OPERATORS:
+        return _OPERATORS[type(node.op)](_evaluate(node.operand))
+    raise ValueError(f"unsupported expression: {ast.dump(node)[:80]}")
+
+def calculate(expression: str) -> str:
+    """Evaluate an arithmetic expression and return the result.
+
+    Args:
+        expression: Arithmetic on numbers with + - * / // % ** and parentheses, e.g. '(3 * 12.5) * 1.085'
+    """
+    try:
+        value = _evaluate(ast.parse(expression, mode="eval"))
+    except (SyntaxError, ValueError, ZeroDivisionError, OverflowError) as e:
+        raise ModelRetry(f"Cannot evaluate {expression!r}: {e}. Use numbers and arithmetic operators only.")
+    if isinstance(value, float):
+        value = round(value, 6)
+    return str(value)
+
+def lookup(key: str) -> str:
+    """Look up a value by key, e.g. 'price:widget', 'fx:USD-EUR' or 'stock:sku-7'.
+
+    Args:
+        key: Key of the value
+    """
+    if key not in LOOKUP_DATA:
+        prefix = key.split(":", 1)[0]
+        known = [k for k in LOOKUP_DATA if k.startswith(f"{prefix}:")] or sorted(LOOKUP_DATA)
+        raise ModelRetry(f"Unknown key {key!r}. Known keys: {', '.join(known)}")
+    return LOOKUP_DATA[key]
+
+# Tools by name, as referenced by test cases
+TOOLS = {
+    "calculate": calculate,
+    "lookup": lookup,
+}
+
+def get_tools(names: Sequence[str]) -> List[Tool]:
+    """Get the tools to register on an agent.
+
+    Raises:
+        KeyError: If a tool does not exist
+    """
+    return [Tool(TOOLS[name], takes_ctx=False, max_retries=2) for name in names]
@@ -20,7 +20,8 @@ PROVIDER_PREFIXES = {
     "cohere": ["command", "c4ai"],
     "groq": ["llama", "gemma", "mixtral", "deepseek", "qwen"],  # Updated Groq prefixes
     "mistral": ["mistral", "codestral"],
-    "openrouter": ["o1", "o3"]  # OpenRouter supports various models
+    "openrouter": ["o1", "o3"],  # OpenRouter supports various models
+    "mock": ["mock"]  # Local mock server (model_mock.py)
 }
 
 class ModelCapabilities(BaseModel):
@@ -37,6 +38,7 @@ MODEL_REGISTRY: Dict[str, Dict[str, Any]] = {
     "anthropic:claude-3-5-sonnet-latest": {
         "provider": "anthropic",
         "base_name": "claude-3-5-sonnet",
+        "context_window": 200_000,
         "capabilities": {
             "tools": True,
             "function_calling": True,
@@ -49,6 +51,7 @@ MODEL_REGISTRY: Dict[str, Dict[str, Any]] = {
     "groq:deepseek-r1-distill-llama-70b-specdec": {
         "provider": "groq",
         "base_name": "deepseek-r1-distill-llama-70b",
+        "context_window": 128_000,
         "capabilities": {
             "tools": False,
             "function_calling": False,
@@ -61,6 +64,7 @@ MODEL_REGISTRY: Dict[str, Dict[str, Any]] = {
     "groq:qwen-2.5-coder-32b": {
         "provider": "groq",
         "base_name": "qwen-2.5-coder",
+        "context_window": 128_000,
         "capabilities": {
             "tools": False,
             "function_calling": False,
@@ -69,6 +73,89 @@ MODEL_REGISTRY: Dict[str, Dict[str, Any]] = {
             "vision": False,
             "audio": False
         }
+    },
+    "google-gla:gemini-2.0-flash": {
+        "provider": "google-gla",
+        "base_name": "gemini-2.0-flash",
+        "context_window": 1_048_576,
+        "capabilities": {
+            "tools": True,
+            "function_calling": True,
+            "json_mode": True,
+            "system_prompt": True,
+            "vision": True,
+            "audio": True
+        }
+    },
+    "google-vertex:gemini-2.0-flash": {
+        "provider": "google-vertex",
+        "base_name": "gemini-2.0-flash",
+        "context_window": 1_048_576,
+        "capabilities": {
+            "tools": True,
+            "function_calling": True,
+            "json_mode": True,
+            "system_prompt": True,
+            "vision": True,
+            "audio": True
+        }
+    },
+    # Local mock server models (model_mock.py); the profile is part of the name
+    "mock:openai-fast": {
+        "provider": "mock",
+        "base_name": "mock-openai-fast",
+        "context_window": 128_000,
+        "mock_api": "openai",
+        "capabilities": {
+            "tools": True,
+            "function_calling": True,
+            "json_mode": True,
+            "system_prompt": True,
+            "vision": False,
+            "audio": False
+        }
+    },
+    "mock:anthropic-fast": {
+        "provider": "mock",
+        "base_name": "mock-anthropic-fast",
+        "context_window": 128_000,
+        "mock_api": "anthropic",
+        "capabilities": {
+            "tools": True,
+            "function_calling": True,
+            "json_mode": True,
+            "system_prompt": True,
+            "vision": False,
+            "audio": False
+        }
+    },
+    "mock:openai-slow": {
+        "provider": "mock",
+        "base_name": "mock-openai-slow",
+        "context_window": 128_000,
+        "mock_api": "openai",
+        "capabilities": {
+            "tools": True,
+            "function_calling": True,
+            "json_mode": True,
+            "system_prompt": True,
+            "vision": False,
+            "audio": False
+        }
+    },
+    "mock:openai-flaky": {
+        "provider": "mock",
+        "base_name": "mock-openai-flaky",
+        "context_window": 128_000,
+        "mock_api": "openai",
+        "capabilities": {
+            "tools": True,
+            "function_calling": True,
+            "json_mode": True,
+            "system_prompt": True,
+            "vision": False,
+            "audio": False
+        }
     }
 }
 
@@ -110,4 +197,15 @@ def get_model_info(model: KnownModelName) -> Dict[str, Any]:
     """
     if model not in MODEL_REGISTRY:
         raise KeyError(f"Model {model} not found in registry")
-    return MODEL_REGISTRY[model] 
\ No newline at end of file
+    return MODEL_REGISTRY[model]
+
+def get_routes(base_name: str) -> List[KnownModelName]:
+    """Get all registered models that serve the same base model.
+    
+    Args:
+        base_name: The base model name
+        
+    Returns:
+        Full model identifiers, one per provider route, in registry order
+    """
+    return [model for model, info in MODEL_REGISTRY.items() if info["base_name"] == base_name]
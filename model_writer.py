@@ -0,0 +1,151 @@
+"""
+Background writer that keeps file I/O off the event loop.
+
+Writes are submitted as callables under a key (usually the target file)
+and run one at a time on a dedicated thread, in submission order. A write
+submitted while an earlier write with the same key is still queued
+replaces it, so frequently saved state (history, learned limits) is
+written once per burst instead of once per change. The queue is bounded:
+when it is full, submitters wait, which applies backpressure instead of
+buffering without limit.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Process umask, read once at import: os.umask can only be read by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def write_bytes(path: Path, data: bytes) -> Path:
+    """Write a file atomically, so readers never see partial files.
+
+    The file gets the permissions a plain open() would give it; mkstemp
+    alone would leave it readable by the owner only.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o666 & ~_UMASK)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    return path
+
+def write_text(path: Path, text: str) -> Path:
+    """Write a text file atomically."""
+    return write_bytes(path, text.encode("utf-8"))
+
+def write_json(path: Path, data: Any) -> Path:
+    """Write a JSON file atomically."""
+    return write_text(path, json.dumps(data, indent=2, default=str))
+
+class BackgroundWriter:
+    """Single-threaded, coalescing writer with a bounded queue."""
+
+    def __init__(self, max_pending: int = 64):
+        """Initialize the writer.
+
+        Args:
+            max_pending: Maximum number of queued writes before submitters wait
+        """
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="writer")
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Dict[str, Tuple[Callable[[], Any], List[asyncio.Future]]] = {}
+        self._task: Optional[asyncio.Task] = None
+        # Statistics
+        self.writes = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.write_time = 0.0  # Seconds spent writing, off the event loop
+        self.max_queued = 0
+
+    def start(self) -> None:
+        """Start the writer task on the running event loop."""
+        if self._task is None:
+            self._queue = asyncio.Queue(self.max_pending)
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, key: str, write: Callable[[], Any]) -> asyncio.Future:
+        """Queue a write, replacing a queued write with the same key.
+
+        Args:
+            key: Identity of the write, usually the path of the written file
+            write: Callable doing the I/O; it runs on the writer thread
+
+        Returns:
+            Future resolved with the write's return value once it is written
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        key = str(key)
+        if key in self._pending:
+            _, futures = self._pending[key]
+            self._pending[key] = (write, futures + [future])
+            self.coalesced += 1
+            return future
+        self._pending[key] = (write, [future])
+        await self._queue.put(key)
+        self.max_queued = max(self.max_queued, self._queue.qsize())
+        return future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            key = await self._queue.get()
+            # Taken out of pending first: later submits queue a new write
+            write, futures = self._pending.pop(key)
+            start = time.perf_counter()
+            try:
+                result = await loop.run_in_executor(self._executor, write)
+            except Exception as e:
+                self.failures += 1
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for future in futures:
+                    if not future.done():
+                        future.set_result(result)
+            finally:
+                self.writes += 1
+                self.write_time += time.perf_counter() - start
+                self._queue.task_done()
+
+    async def flush(self) -> None:
+        """Wait until all queued writes are done."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def close(self) -> None:
+        """Flush queued writes and stop the writer."""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._queue = None
+
+    def summary_line(self) -> str:
+        """Get a one-line summary of the writes so far."""
+        line = (
+            f"{self.writes} writes ({self.coalesced} coalesced), "
+            f"{self.write_time:.2f}s off the event loop, max queue {self.max_queued}"
+        )
+        if self.failures:
+            line += f", {self.failures} failed"
+        return line
@@ -0,0 +1,132 @@
+"""
+Test suite for model_agents.py test execution helpers.
+"""
+
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, RetryPromptPart, TextPart, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+from pydantic_ai.usage import Usage
+
+import model_agents
+from model_agents import (
+    RESULT_TOOL_NAME,
+    get_cached_tokens,
+    get_type_adapter,
+    run_conversation,
+    run_test,
+    run_tool_task
+)
+from model_tools import get_tools
+
+class Answer(BaseModel):
+    value: int
+
+def echo_system_prompts(messages, info):
+    """Respond with the system prompts the model received."""
+    prompts = [p.content for m in messages for p in m.parts if p.part_kind == "system-prompt"]
+    return ModelResponse(parts=[TextPart("|".join(prompts))])
+
+@pytest.mark.asyncio
+async def test_run_test_uses_per_run_system_prompt():
+    """Test that concurrent runs on one agent each get their own system prompt."""
+    agent = Agent(FunctionModel(echo_system_prompts), system_prompt="default")
+    first, second = await asyncio.gather(
+        run_test(agent, "first prompt", "question"),
+        run_test(agent, "second prompt", "question")
+    )
+    assert first.content == "first prompt"
+    assert second.content == "second prompt"
+    assert first.request_tokens and first.response_tokens
+
+def invalid_then_valid(messages, info):
+    """Return an invalid structured result first, then a valid one."""
+    retried = any(isinstance(p, RetryPromptPart) for m in messages for p in m.parts)
+    args = '{"value": 4}' if retried else '{"value": "four"}'
+    return ModelResponse(parts=[ToolCallPart(tool_name=RESULT_TOOL_NAME, args=args)])
+
+@pytest.mark.asyncio
+async def test_run_test_structured_output_records_validation_and_retries():
+    """Test that structured runs report validation time and retry counts."""
+    agent = Agent(FunctionModel(invalid_then_valid), result_type=Answer, result_retries=2)
+    response = await run_test(agent, "system", "What is 2+2?", result_type=Answer)
+    assert response.content == '{"value":4}'
+    assert response.retries == 1
+    assert response.validation_time is not None and response.validation_time > 0
+    assert get_type_adapter(Answer) is get_type_adapter(Answer)
+
+async def stream_words(messages, info):
+    """Stream a response word by word."""
+    for word in ("cached ", "prefix ", "answer"):
+        yield word
+
+@pytest.mark.asyncio
+async def test_run_test_stream_records_time_to_first_token():
+    """Test that streamed runs join the chunks and report time to first token."""
+    agent = Agent(FunctionModel(echo_system_prompts, stream_function=stream_words))
+    response = await run_test(agent, "system", "question", stream=True)
+    assert response.content == "cached prefix answer"
+    assert 0 < response.ttft <= response.duration
+    assert response.request_tokens
+
+def test_get_cached_tokens_from_usage_details():
+    """Test cached prompt token detection across provider usage formats."""
+    assert get_cached_tokens(Usage(details={"cached_tokens": 1024})) == 1024
+    assert get_cached_tokens(Usage(details={"cached_content_token_count": 0})) == 0
+    assert get_cached_tokens(Usage(details={"reasoning_tokens": 10})) is None
+    assert get_cached_tokens(Usage()) is None
+
+def count_user_turns(messages, info):
+    """Respond with the number of user prompts in the history."""
+    turns = sum(1 for m in messages for p in m.parts if p.part_kind == "user-prompt")
+    return ModelResponse(parts=[TextPart(f"turn {turns}")])
+
+@pytest.mark.asyncio
+async def test_run_conversation_carries_history_across_turns():
+    """Test that each turn sees the previous turns and reports its growing context."""
+    agent = Agent(FunctionModel(count_user_turns))
+    response = await run_conversation(agent, "system", ["first", "second", "third"])
+    assert response.content == "turn 1\n\n---\n\nturn 2\n\n---\n\nturn 3"
+    assert len(response.turn_durations) == 3
+    assert response.turn_context_tokens == sorted(response.turn_context_tokens)
+    assert response.turn_context_tokens[0] < response.turn_context_tokens[-1]
+    assert response.request_tokens == sum(response.turn_context_tokens)
+    assert response.cached_tokens is None
+
+@pytest.mark.asyncio
+async def test_run_conversation_sums_cached_tokens(monkeypatch):
+    """Test that cached prompt tokens of all turns are reported."""
+    reported = iter([None, 512, 1024])
+    monkeypatch.setattr(model_agents, "get_cached_tokens", lambda usage: next(reported))
+    response = await run_conversation(Agent(FunctionModel(count_user_turns)), "system", ["first", "second", "third"])
+    assert response.cached_tokens == 1536
+
+def use_tools(messages, info):
+    """Look up two prices in one turn, misspell a calculation, then answer with the tool result."""
+    returns = [p for m in messages for p in m.parts if p.part_kind in ("tool-return", "retry-prompt")]
+    if not returns:
+        return ModelResponse(parts=[
+            ToolCallPart("lookup", {"key": "price:widget"}),
+            ToolCallPart("lookup", {"key": "price:gadget"})
+        ])
+    if len(returns) == 2:
+        return ModelResponse(parts=[ToolCallPart("calculate", {"expression": "3 * 12.50 +"})])
+    if len(returns) == 3:
+        return ModelResponse(parts=[ToolCallPart("calculate", {"expression": "3 * 12.50 + 2 * 7.25"})])
+    return ModelResponse(parts=[TextPart(returns[-1].content)])
+
+@pytest.mark.asyncio
+async def test_run_tool_task_counts_turns_calls_and_round_trips():
+    """Test that a tool task reports its model turns, tool calls and one round trip per tool turn."""
+    agent = Agent(FunctionModel(use_tools), tools=get_tools(["lookup", "calculate"]))
+    response = await run_tool_task(agent, "system", "total?")
+    assert response.content == "52.0"
+    assert response.model_turns == 4
+    assert response.tool_calls == 4
+    assert len(response.tool_round_trips) == 3
+    assert all(t >= 0 for t in response.tool_round_trips)
+    assert sum(response.tool_round_trips) <= response.duration
@@ -0,0 +1,137 @@
+"""
+Test suite for model_batch.py batch execution backends.
+
+Runs the backends against local stand-in batch servers.
+"""
+
+import json
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from model_batch import (
+    AnthropicBatchBackend,
+    BatchJob,
+    OpenAIBatchBackend,
+    get_batch_backend,
+    run_batch
+)
+
+def make_jobs(count: int, model: str) -> list[BatchJob]:
+    return [
+        BatchJob(
+            custom_id=f"job-{i}",
+            model=model,
+            test_case=f"case_{i}",
+            system_prompt="You are a helpful assistant.",
+            user_prompt=f"Question {i}"
+        )
+        for i in range(count)
+    ]
+
+def anthropic_stand_in(polls_until_done: int = 2) -> tuple[web.Application, dict]:
+    """Stand-in for the Anthropic Message Batches API."""
+    state = {"requests": [], "polls": 0}
+
+    async def create(request):
+        state["requests"] = (await request.json())["requests"]
+        return web.json_response({"id": "batch_1", "processing_status": "in_progress"})
+
+    async def status(request):
+        state["polls"] += 1
+        if state["polls"] < polls_until_done:
+            return web.json_response({"id": "batch_1", "processing_status": "in_progress"})
+        return web.json_response({
+            "id": "batch_1",
+            "processing_status": "ended",
+            "results_url": str(request.url.with_path("/v1/messages/batches/batch_1/results"))
+        })
+
+    async def results(request):
+        lines = []
+        # Drop the last request to check missing outputs are reported
+        for item in state["requests"][:-1]:
+            text = item["params"]["messages"][0]["content"]
+            lines.append(json.dumps({
+                "custom_id": item["custom_id"],
+                "result": {"type": "succeeded", "message": {"content": [{"type": "text", "text": f"Answer to {text}"}]}}
+            }))
+        return web.Response(text="\n".join(lines))
+
+    app = web.Application()
+    app.router.add_post("/v1/messages/batches", create)
+    app.router.add_get("/v1/messages/batches/batch_1", status)
+    app.router.add_get("/v1/messages/batches/batch_1/results", results)
+    return app, state
+
+def openai_stand_in() -> web.Application:
+    """Stand-in for the OpenAI Files and Batch APIs."""
+    files = {}
+
+    async def upload(request):
+        form = await request.post()
+        files["input"] = form["file"].file.read().decode()
+        return web.json_response({"id": "file_in"})
+
+    async def create(request):
+        assert (await request.json())["input_file_id"] == "file_in"
+        return web.json_response({"id": "batch_1", "status": "validating"})
+
+    async def status(request):
+        return web.json_response({"id": "batch_1", "status": "completed", "output_file_id": "file_out"})
+
+    async def content(request):
+        lines = []
+        for line in files["input"].splitlines():
+            item = json.loads(line)
+            if item["custom_id"] == "job-1":
+                lines.append(json.dumps({"custom_id": "job-1", "response": {"status_code": 429, "body": {}}}))
+                continue
+            lines.append(json.dumps({
+                "custom_id": item["custom_id"],
+                "response": {"status_code": 200, "body": {"choices": [{"message": {"content": item["body"]["model"]}}]}}
+            }))
+        return web.Response(text="\n".join(lines))
+
+    app = web.Application()
+    app.router.add_post("/v1/files", upload)
+    app.router.add_post("/v1/batches", create)
+    app.router.add_get("/v1/batches/batch_1", status)
+    app.router.add_get("/v1/files/file_out/content", content)
+    return app
+
+@pytest.mark.asyncio
+async def test_anthropic_batch_round_trip():
+    """Test submit, backoff polling and result mapping against the stand-in server."""
+    app, state = anthropic_stand_in(polls_until_done=3)
+    async with TestServer(app) as server:
+        backend = AnthropicBatchBackend(api_key="test", api_base=str(server.make_url("")))
+        responses = await run_batch(backend, make_jobs(3, "anthropic:claude-3-5-sonnet-latest"), poll_interval=0.01)
+
+    assert state["polls"] == 3
+    assert state["requests"][0]["params"]["model"] == "claude-3-5-sonnet-latest"
+    assert responses["job-0"].content == "Answer to Question 0"
+    assert responses["job-2"].content.startswith("Error:")
+    assert all(r.duration > 0 for r in responses.values())
+
+@pytest.mark.asyncio
+async def test_openai_batch_round_trip():
+    """Test the file-based OpenAI batch flow including per-request errors."""
+    async with TestServer(openai_stand_in()) as server:
+        backend = OpenAIBatchBackend(api_key="test", api_base=str(server.make_url("")))
+        responses = await run_batch(backend, make_jobs(2, "openai:gpt-4o"), poll_interval=0.01)
+
+    assert responses["job-0"].content == "gpt-4o"
+    assert responses["job-1"].content.startswith("Error:")
+
+def test_openai_reasoning_models_use_max_completion_tokens():
+    """Test that o1/o3 jobs send max_completion_tokens instead of max_tokens."""
+    backend = OpenAIBatchBackend(api_key="test")
+    assert backend._max_tokens_field("openai:o3-mini") == "max_completion_tokens"
+    assert backend._max_tokens_field("openai:gpt-4o") == "max_tokens"
+
+def test_unsupported_batch_provider():
+    """Test that providers without a batch endpoint are rejected."""
+    with pytest.raises(KeyError):
+        get_batch_backend("cohere")
@@ -0,0 +1,50 @@
+"""
+Test suite for model_bench.py harness microbenchmarks.
+"""
+
+from model_bench import BenchResult, compare, load_baseline, main, run_case, save_baseline
+from model_utils import MODEL_REGISTRY
+
+def bench(operation: str, seconds: float, peak_mb: float) -> BenchResult:
+    return BenchResult(operation=operation, results=1000, models=10, seconds=seconds, peak_mb=peak_mb)
+
+def test_run_case_measures_every_operation():
+    """Test that a small fixture is measured and its synthetic models are removed again."""
+    measured = run_case(200, 4, repeat=1, log=lambda line: None)
+    assert [r.operation for r in measured] == [
+        "load_history", "save_history", "metrics_table", "speed_ranking", "save_results", "get_model_info"
+    ]
+    assert all(r.seconds > 0 and r.peak_mb >= 0 for r in measured)
+    assert measured[0].key == "load_history[200x4]"
+    assert not any(model.startswith("bench:") for model in MODEL_REGISTRY)
+
+def test_compare_flags_regressions_past_threshold_and_noise():
+    """Test that only growth past both the threshold and the noise floor counts."""
+    baseline = {r.key: r for r in (
+        bench("metrics_table", 1.0, 100.0),
+        bench("save_history", 0.001, 0.5),
+        bench("speed_ranking", 1.0, 10.0),
+    )}
+    regressions = compare([
+        bench("metrics_table", 1.3, 100.0),  # Slower
+        bench("save_history", 0.004, 1.2),  # Within noise
+        bench("speed_ranking", 1.1, 20.0),  # More memory
+        bench("save_results", 9.0, 9.0),  # Not in the baseline
+    ], baseline, threshold=0.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("metrics_table[1000x10]: 1.3000s vs 1.0000s baseline (+30%)")
+    assert regressions[1].startswith("speed_ranking[1000x10]: peak 20.0 MB")
+
+def test_baseline_is_stored_then_compared(tmp_path, capsys):
+    """Test that the first run stores the baseline and later runs fail on regressions."""
+    baseline_file = tmp_path / "baseline.json"
+    args = ["--case", "100", "2", "--repeat", "1", "--baseline", str(baseline_file)]
+    assert main(args) == 0
+    stored = load_baseline(baseline_file)
+    assert len(stored) == 6
+
+    # A baseline far faster than possible makes every timed operation regress
+    save_baseline(baseline_file, [r.model_copy(update={"seconds": 1e-9}) for r in stored.values()])
+    assert main(args + ["--threshold", "0.1"]) == 1
+    assert "regressions past 10%" in capsys.readouterr().out
+    assert main(args + ["--update-baseline"]) == 0
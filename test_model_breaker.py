@@ -0,0 +1,58 @@
+"""
+Test suite for model_breaker.py circuit breakers.
+"""
+
+from model_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreakers
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_breaker_opens_fast_fails_and_closes_after_probe():
+    """Test the closed → open → half-open → closed cycle of a model breaker."""
+    clock = FakeClock()
+    transitions = []
+    breakers = CircuitBreakers(model_threshold=3, probe_interval=30, on_transition=transitions.append, clock=clock)
+
+    for _ in range(3):
+        assert breakers.allow("groq", "groq:model", "groq:model")
+        breakers.record("groq", "groq:model", False, "503 service unavailable", "groq:model")
+    assert breakers.breakers["model:groq:model"].state == OPEN
+    assert breakers.breakers["provider:groq"].state == CLOSED
+    assert not breakers.allow("groq", "groq:model")
+    assert breakers.allow("groq", "groq:other")  # Other models of the provider still run
+    breakers.record("groq", "groq:other", True)
+
+    clock.now = 31
+    assert breakers.allow("groq", "groq:model", "groq:model")  # The probe
+    assert breakers.breakers["model:groq:model"].state == HALF_OPEN
+    assert not breakers.allow("groq", "groq:model")  # Only one probe at a time
+    breakers.record("groq", "groq:model", True, model="groq:model")
+
+    assert [(t.from_state, t.to_state) for t in transitions] == [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+    assert transitions[0].reason.startswith("3 consecutive failures: 503")
+    assert all(t.model == "groq:model" for t in transitions)
+    assert breakers.breakers["model:groq:model"].fast_failed == 2
+    assert "| model:groq:model | closed | 1 | 2 | 1 |" in breakers.generate_table()
+
+def test_failed_or_cancelled_probe_reopens():
+    """Test that a failed probe waits another interval and a cancelled probe can be retried."""
+    clock = FakeClock()
+    breakers = CircuitBreakers(provider_threshold=2, probe_interval=10, clock=clock)
+    for model in ("groq:a", "groq:b"):
+        breakers.allow("groq", model)
+        breakers.record("groq", model, False, "timeout")
+    assert breakers.is_open("groq", "groq:c")
+
+    clock.now = 10
+    assert breakers.allow("groq", "groq:c")
+    breakers.cancel("groq", "groq:c")
+    assert breakers.allow("groq", "groq:c")
+    breakers.record("groq", "groq:c", False, "timeout")
+    assert breakers.breakers["provider:groq"].state == OPEN
+    clock.now = 15
+    assert not breakers.allow("groq", "groq:c")
+    assert breakers.open_breakers("groq", "groq:c") == ["provider:groq"]
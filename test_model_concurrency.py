@@ -0,0 +1,118 @@
+"""
+Test suite for model_concurrency.py adaptive concurrency control.
+"""
+
+import asyncio
+
+import pytest
+
+from model_concurrency import (
+    OK,
+    RATE_LIMITED,
+    SERVER_ERROR,
+    AdaptiveLimiter,
+    ConcurrencyController,
+    classify_error
+)
+
+def test_classify_error():
+    """Test error classification into limiter outcomes."""
+    assert classify_error(None) == OK
+    assert classify_error("Error: status_code: 429, rate limit exceeded") == RATE_LIMITED
+    assert classify_error("Error: Request timed out") == "timeout"
+    assert classify_error("Error: invalid model") == "error"
+    assert classify_error("Error: status_code: 503, model_name: x, body: busy") == SERVER_ERROR
+    assert classify_error("Error code: 500 - {'error': 'boom'}") == SERVER_ERROR
+    assert classify_error("Error: HTTP 502") == SERVER_ERROR
+    assert classify_error("Error: 529 overloaded") == SERVER_ERROR
+    # Numbers that are not status codes are not transient
+    assert classify_error("Error: status_code: 400, max_tokens=1500 exceeds the limit of 500") == "error"
+    assert classify_error("Error: prompt is 5029 tokens, context length is 4290") == "error"
+
+@pytest.mark.asyncio
+async def test_additive_increase_and_multiplicative_decrease():
+    """Test the limit grows on healthy completions and halves on 429s."""
+    limiter = AdaptiveLimiter("test", initial_limit=2, max_limit=10)
+    for _ in range(10):
+        await limiter.acquire()
+        await limiter.release(1.0)
+    assert 3 < limiter.limit < 6
+
+    grown = limiter.limit
+    await limiter.acquire()
+    await limiter.release(0.0, RATE_LIMITED)
+    assert limiter.limit == pytest.approx(grown / 2)
+    assert limiter.state()["decreases"] == 1
+
+@pytest.mark.asyncio
+async def test_latency_spike_counts_as_overload():
+    """Test that latency far above the per-key baseline cuts the limit."""
+    limiter = AdaptiveLimiter("test", initial_limit=8)
+    await limiter.acquire()
+    await limiter.release(1.0, key="case")
+    await limiter.acquire()
+    await limiter.release(5.0, key="case")
+    assert limiter.state()["latency_spikes"] == 1
+    assert limiter.limit < 8
+
+@pytest.mark.asyncio
+async def test_baselines_are_kept_per_key():
+    """Test that a slower model on the same provider is not treated as a spike."""
+    limiter = AdaptiveLimiter("groq", initial_limit=8)
+    await limiter.acquire()
+    await limiter.release(1.0, key="groq:fast-model:code_generation")
+    await limiter.acquire()
+    await limiter.release(6.0, key="groq:slow-model:code_generation")
+    assert limiter.state()["latency_spikes"] == 0
+    assert limiter.limit >= 8
+
+@pytest.mark.asyncio
+async def test_acquire_blocks_at_limit():
+    """Test that no more than `limit` requests are in flight."""
+    limiter = AdaptiveLimiter("test", initial_limit=2)
+
+    async def request():
+        await limiter.acquire()
+        await asyncio.sleep(0.01)
+        await limiter.release(0.01)
+
+    await asyncio.gather(*(request() for _ in range(6)))
+    assert limiter.peak_in_flight == 2
+
+@pytest.mark.asyncio
+async def test_waiting_requests_start_by_priority():
+    """Test that queued requests get slots highest priority first."""
+    limiter = AdaptiveLimiter("test", initial_limit=1)
+    started = []
+
+    async def request(name, priority):
+        await limiter.acquire(priority)
+        started.append(name)
+        await asyncio.sleep(0.01)
+        await limiter.release(0.01)
+
+    await asyncio.gather(request("short", 1.0), request("long", 9.0), request("medium", 5.0))
+    assert started == ["long", "medium", "short"]
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_block_the_queue():
+    """Test that a cancelled waiting request gives up its place."""
+    limiter = AdaptiveLimiter("test", initial_limit=1)
+    await limiter.acquire()
+    blocked = asyncio.create_task(limiter.acquire(priority=10.0))
+    waiting = asyncio.create_task(limiter.acquire(priority=1.0))
+    await asyncio.sleep(0.01)
+    blocked.cancel()
+    await limiter.release(0.01)
+    await asyncio.wait_for(waiting, 1.0)
+    assert limiter.in_flight == 1
+
+def test_learned_limits_persist(tmp_path):
+    """Test that limits are saved and used as starting points."""
+    state_file = tmp_path / "limits.json"
+    controller = ConcurrencyController(state_file)
+    controller.get("groq").limit = 7.5
+    controller.save()
+
+    assert ConcurrencyController(state_file).get("groq").limit == 7.5
+    assert "| groq | 7.50 |" in controller.generate_state_table()
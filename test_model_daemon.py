@@ -0,0 +1,102 @@
+"""
+Test suite for model_daemon.py test daemon.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+import pytest_asyncio
+
+import model_test
+from model_agents import TestResponse
+from model_daemon import ModelTestDaemon
+from model_test import ModelTester
+
+@pytest_asyncio.fixture
+async def daemon(tmp_path, monkeypatch):
+    """A daemon on a free port whose tester writes to a temporary directory and fakes requests."""
+    tester = ModelTester(output_dir=tmp_path)
+    tester.available_providers = {"groq", "mistral"}
+    created = []
+
+    def fake_create_test_agent(model_name, api_key=None, result_type=str, tools=()):
+        created.append(model_name)
+        return model_name
+
+    async def fake_run_test(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        await asyncio.sleep(0.01)
+        return TestResponse(content=f"# {agent}\n* answer", duration=0.5)
+
+    monkeypatch.setattr(model_test, "create_test_agent", fake_create_test_agent)
+    monkeypatch.setattr(model_test, "run_test", fake_run_test)
+    server = ModelTestDaemon(tester, port=0)
+    server.created = created
+    await server.start()
+    yield server
+    await server.stop()
+
+async def submit(url: str, job: dict) -> list:
+    """Submit a job and collect its streamed events."""
+    async with httpx.AsyncClient(timeout=60) as client:
+        async with client.stream("POST", f"{url}/jobs", json=job) as response:
+            assert response.status_code == 200
+            return [json.loads(line) async for line in response.aiter_lines() if line]
+
+@pytest.mark.asyncio
+async def test_jobs_stream_results_and_reuse_warm_agents(daemon):
+    """Test that queued jobs run in order on the same tester, streaming each result."""
+    first, second = await asyncio.gather(
+        submit(daemon.url, {"providers": ["groq"], "scenarios": ["standard"]}),
+        submit(daemon.url, {"providers": ["groq"], "test_cases": ["basic_response", "reasoning"]})
+    )
+    assert [e["event"] for e in first[:2]] == ["queued", "started"] and first[0]["position"] == 0
+    assert second[0]["position"] == 1
+    results = [e for e in first if e["event"] == "result"]
+    assert results and all(r["model"].startswith("groq:") and "response" not in r for r in results)
+    assert first[-1]["event"] == "done" and first[-1]["results"] == len(results) == first[-1]["passed"]
+    assert {e["test_case"] for e in second if e["event"] == "result"} == {"basic_response", "reasoning"}
+    assert second[-1]["summary"].endswith(".md")
+    
+    # Jobs starting within the same second still get their own run and files
+    assert first[-1]["run"] != second[-1]["run"] and first[-1]["summary"] != second[-1]["summary"]
+    history = daemon.tester.load_result_history()
+    assert sorted(history.runs.values) == sorted([first[-1]["run"], second[-1]["run"]])
+
+    # Agents were created by the first job only
+    models = {r["model"] for r in results}
+    assert sorted(daemon.created) == sorted(models)
+    async with httpx.AsyncClient() as client:
+        status = (await client.get(f"{daemon.url}/status")).json()
+    assert status["completed"] == 2 and status["queued"] == 0 and status["running"] is None
+    assert status["available_providers"] == ["groq", "mistral"]
+
+@pytest.mark.asyncio
+async def test_invalid_jobs_are_rejected(daemon):
+    """Test that unknown fields, models, scenarios and test cases get a 400 before queueing."""
+    async with httpx.AsyncClient() as client:
+        for job in (
+            {"model": ["groq:x"]},
+            {"models": ["groq:not-a-model"]},
+            {"scenarios": ["nightly"]},
+            {"scenarios": ["structured"], "test_cases": ["basic_response"]},
+        ):
+            response = await client.post(f"{daemon.url}/jobs", json=job)
+            assert response.status_code == 400, job
+            assert response.json()["error"]
+        assert (await client.get(f"{daemon.url}/missing")).status_code == 404
+    assert daemon.queued == 0 and daemon.completed == 0
+
+@pytest.mark.asyncio
+async def test_malformed_requests_get_a_400(daemon):
+    """Test that a broken request line or Content-Length is answered with 400 and the daemon keeps serving."""
+    for raw in (b"GARBAGE\r\n\r\n", b"POST /jobs HTTP/1.1\r\nHost: x\r\nContent-Length: abc\r\n\r\n"):
+        reader, writer = await asyncio.open_connection(daemon.host, daemon.port)
+        writer.write(raw)
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), 5)
+        writer.close()
+        assert status_line.split()[1] == b"400", raw
+    async with httpx.AsyncClient() as client:
+        assert (await client.get(f"{daemon.url}/status")).status_code == 200
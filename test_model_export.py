@@ -0,0 +1,58 @@
+"""
+Test suite for model_export.py columnar export.
+"""
+
+from datetime import datetime, UTC
+
+import pytest
+
+from model_export import ResultExporter, read_export
+from model_results import ResultBuffer
+
+def make_buffer() -> ResultBuffer:
+    buffer = ResultBuffer()
+    buffer.append_row(model="groq:qwen-2.5-coder-32b", test_case="basic_response", success=True,
+                      duration=1.5, response="four", request_tokens=12, response_tokens=3,
+                      timestamp=datetime(2025, 2, 20, 23, tzinfo=UTC), run="20250220_230000")
+    buffer.append_row(model="anthropic:claude-3-5-sonnet-latest", test_case="structured_math", success=True,
+                      duration=2.0, response="{}", validation_time=0.5, retries=1,
+                      timestamp=datetime(2025, 2, 20, 23, tzinfo=UTC), run="20250220_230000")
+    buffer.append_row(model="groq:qwen-2.5-coder-32b", test_case="reasoning", success=False,
+                      duration=0.2, error="Error: 429", timestamp=datetime(2025, 2, 21, 1, tzinfo=UTC))
+    return buffer
+
+def test_npz_export_is_partitioned_by_date_and_provider(tmp_path):
+    """Test partition layout and column values of the npz fallback."""
+    exporter = ResultExporter(tmp_path, fmt="npz")
+    written = exporter.export_buffer(make_buffer(), "groq:run")
+    assert sorted(p.relative_to(tmp_path).parent.as_posix() for p in written) == [
+        "date=2025-02-20/provider=anthropic",
+        "date=2025-02-20/provider=groq",
+        "date=2025-02-21/provider=groq",
+    ]
+    assert all(p.name == "groq_run.npz" for p in written)
+
+    data = read_export(tmp_path, ["test_case", "generation_time", "request_tokens"])
+    assert set(data) == {"date", "provider", "test_case", "generation_time", "request_tokens"}
+    by_case = dict(zip(data["test_case"], zip(data["generation_time"], data["request_tokens"])))
+    assert by_case["structured_math"] == (pytest.approx(1.5), -1)
+    assert by_case["basic_response"] == (pytest.approx(1.5), 12)
+
+def test_parquet_export_round_trip(tmp_path):
+    """Test that parquet exports keep nulls and types."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    written = ResultExporter(tmp_path, fmt="parquet").export_buffer(make_buffer(), "run")
+    table = pq.read_table(next(p for p in written if "anthropic" in str(p)))
+    assert table.column("validation_time").to_pylist() == [0.5]
+    assert table.column("request_tokens").to_pylist() == [None]
+    assert read_export(tmp_path, ["duration"])["duration"].sum() == pytest.approx(3.7)
+
+def test_manifest_and_format_validation(tmp_path):
+    """Test that the manifest persists and unknown formats are rejected."""
+    exporter = ResultExporter(tmp_path, fmt="npz")
+    exporter.exported.append("groq:model_20250220_230000.json")
+    exporter.save_manifest()
+    assert ResultExporter(tmp_path, fmt="npz").exported == ["groq:model_20250220_230000.json"]
+    with pytest.raises(ValueError):
+        ResultExporter(tmp_path, fmt="csv")
+    assert len(read_export(tmp_path / "empty")["duration"]) == 0
@@ -0,0 +1,45 @@
+"""
+Test suite for model_lag.py event loop lag monitor.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from model_lag import LAG_BUCKETS, LoopLagMonitor, is_unreliable
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_attributed_to_in_flight_requests():
+    """Test that a blocking call shows up in the samples and in every overlapping request."""
+    monitor = LoopLagMonitor(interval=0.01)
+    assert monitor.begin() is None  # Not monitored before start
+    monitor.start()
+    await asyncio.sleep(0.05)
+    before = monitor.begin()
+    await asyncio.sleep(0.05)
+    assert monitor.end(before) < 0.05
+
+    blocked = monitor.begin()
+    time.sleep(0.1)
+    assert monitor.end(blocked) >= 0.09  # Pending lag counts before the sample runs
+    overlapping = monitor.begin()
+    await asyncio.sleep(0)
+    time.sleep(0.1)
+    await asyncio.sleep(0.03)
+    assert monitor.end(overlapping) >= 0.09
+    await monitor.stop()
+
+    assert not monitor.running and max(monitor.samples) >= 0.09
+    assert sum(monitor.histogram) == len(monitor.samples)
+    # Consecutive stalls can merge into one sample when the monitor does not run in between
+    assert sum(monitor.histogram[LAG_BUCKETS.index(0.1):]) >= 1
+    table = monitor.generate_table()
+    assert "| P99 (ms) |" in table and "| ≥ 1000 ms | 0 |" in table
+
+def test_unreliable_needs_absolute_and_relative_lag():
+    """Test that small lag, or lag small relative to a long request, is not flagged."""
+    assert is_unreliable(0.2, 1.0)
+    assert not is_unreliable(0.01, 0.05)
+    assert not is_unreliable(0.2, 5.0)
+    assert not is_unreliable(None, 1.0)
@@ -0,0 +1,68 @@
+"""
+Test suite for model_latency.py latency benchmark and fitted latency models.
+"""
+
+import pytest
+
+import model_latency
+from model_latency import (
+    LatencySample,
+    benchmark_sizes,
+    build_prompt,
+    estimate_tokens,
+    fit_latency_model,
+    load_latency_models,
+    predict_latency,
+    save_latency_models
+)
+
+def sample(tokens: int, ttft: float, output_tokens: int = 100, decode: float = 0.01) -> LatencySample:
+    return LatencySample(target_tokens=tokens, input_tokens=tokens, output_tokens=output_tokens,
+                         ttft=ttft, duration=ttft + decode * output_tokens)
+
+def test_prompts_and_sizes_follow_the_context_window():
+    """Test synthetic prompt sizes, cache-busting nonces and context window caps."""
+    prompt = build_prompt(4_000, nonce="run1")
+    assert prompt.startswith("Benchmark run1")
+    assert estimate_tokens(prompt) == pytest.approx(4_000, rel=0.02)
+    assert build_prompt(4_000, nonce="run2")[:20] != prompt[:20]
+    assert benchmark_sizes(32_000) == [1_000, 2_000, 4_000, 8_000, 16_000]
+    assert benchmark_sizes(200_000)[-1] == 128_000
+
+def test_linear_fit_recovers_prefill_and_decode():
+    """Test that samples on a line give a linear model without breakpoint."""
+    samples = [sample(n, 0.3 + 0.05 * n / 1000) for n in (1_000, 2_000, 4_000, 8_000, 16_000)]
+    model = fit_latency_model(samples)
+    assert model.overhead == pytest.approx(0.3)
+    assert model.prefill_per_1k == pytest.approx(0.05)
+    assert model.breakpoint is None
+    assert model.decode_per_token == pytest.approx(0.01)
+    assert model.predict(10_000, 200) == pytest.approx(0.3 + 0.5 + 2.0)
+
+def test_piecewise_fit_finds_the_breakpoint():
+    """Test that a kink in prefill cost is fitted as a second segment."""
+    def ttft(n):
+        return 0.2 + 0.02 * n / 1000 + 0.1 * max(n - 16_000, 0) / 1000
+    sizes = (1_000, 2_000, 4_000, 8_000, 16_000, 32_000, 64_000)
+    model = fit_latency_model([sample(n, ttft(n)) for n in sizes])
+    assert model.breakpoint == 16_000
+    assert model.prefill_above_per_1k == pytest.approx(0.1)
+    assert model.ttft(48_000) == pytest.approx(ttft(48_000))
+
+def test_fit_needs_two_sizes():
+    """Test that a single input size cannot be fitted."""
+    with pytest.raises(ValueError):
+        fit_latency_model([sample(1_000, 0.5), sample(1_000, 0.6)])
+
+def test_models_are_persisted_and_stored_in_registry(tmp_path, monkeypatch):
+    """Test saving, loading into the registry and predicting from it."""
+    model_name = "groq:qwen-2.5-coder-32b"
+    monkeypatch.setitem(model_latency.MODEL_REGISTRY, model_name, dict(model_latency.MODEL_REGISTRY[model_name]))
+    assert predict_latency(model_name, 8_000) is None
+
+    fitted = fit_latency_model([sample(1_000, 0.35), sample(9_000, 0.75)])
+    path = tmp_path / "latency_models.json"
+    save_latency_models(path, {model_name: fitted})
+    assert load_latency_models(path) == {model_name: fitted}
+    assert model_latency.MODEL_REGISTRY[model_name]["latency_model"]["prefill_per_1k"] == pytest.approx(0.05)
+    assert predict_latency(model_name, 8_000, 100) == pytest.approx(0.3 + 0.4 + 1.0)
@@ -0,0 +1,77 @@
+"""
+Test suite for model_metrics.py vectorized aggregation.
+"""
+
+import random
+from datetime import datetime, UTC
+
+import numpy as np
+import pytest
+
+from model_metrics import aggregate
+from model_results import ResultBuffer
+
+def make_buffer(rows: int = 500) -> ResultBuffer:
+    rng = random.Random(7)
+    buffer = ResultBuffer()
+    models = ["groq:llama-3.3-70b-versatile", "groq:qwen-2.5-coder-32b", "anthropic:claude-3-5-sonnet-latest"]
+    for i in range(rows):
+        buffer.append_row(
+            model=rng.choice(models),
+            test_case=rng.choice(["basic_response", "reasoning", "code_generation"]),
+            success=rng.random() > 0.2,
+            duration=rng.uniform(0.1, 10.0),
+            response="x" * rng.randint(0, 200),
+            timestamp=datetime(2025, 2, 20 + i % 2, 12, tzinfo=UTC),
+            run=f"run{i % 3}"
+        )
+    return buffer
+
+def test_matches_numpy_reference():
+    """Test per-model metrics against a straightforward NumPy computation."""
+    buffer = make_buffer()
+    table = aggregate(buffer, ["model"])
+    durations = np.array(buffer.durations)
+    model_ids = np.array(buffer.model_ids)
+    assert len(table) == 3
+    for model in buffer.models.values:
+        values = durations[model_ids == buffer.models.id_of(model)]
+        metrics = table.get(model)
+        assert metrics["count"] == len(values)
+        assert metrics["mean"] == pytest.approx(values.mean())
+        assert metrics["std"] == pytest.approx(values.std())
+        assert metrics["min"] == values.min() and metrics["max"] == values.max()
+        for q in (50, 90, 95, 99):
+            assert metrics[f"p{q}"] == pytest.approx(np.percentile(values, q))
+
+def test_group_by_multiple_keys():
+    """Test provider, test case, run and day grouping."""
+    buffer = make_buffer()
+    by_provider_case = aggregate(buffer, ["provider", "test_case"])
+    assert len(by_provider_case) == 6
+    assert sum(row["count"] for row in by_provider_case.rows()) == len(buffer)
+
+    assert {key for key, in aggregate(buffer, ["run"]).keys} == {"run0", "run1", "run2"}
+    assert [key for key, in aggregate(buffer, ["day"]).keys] == ["2025-02-20", "2025-02-21"]
+
+    overall = aggregate(buffer, [])
+    assert overall.keys == [()]
+    assert overall.get()["success_rate"] == pytest.approx(sum(buffer.success) / len(buffer))
+
+def test_successful_only_and_empty():
+    """Test filtering failures and aggregating empty buffers."""
+    buffer = make_buffer(50)
+    table = aggregate(buffer, ["model"], successful_only=True)
+    assert all(row["success_rate"] == 1.0 for row in table.rows())
+    assert len(aggregate(ResultBuffer(), ["model"])) == 0
+    reasoning = np.array(buffer.test_case_ids) == buffer.test_cases.id_of("reasoning")
+    assert sum(row["count"] for row in aggregate(buffer, ["model"], where=reasoning).rows()) == reasoning.sum()
+    with pytest.raises(ValueError):
+        aggregate(buffer, ["colour"])
+
+def test_markdown_rendering():
+    """Test that tables render one row per group."""
+    table = aggregate(make_buffer(20), ["provider"]).sort_by("mean")
+    lines = table.to_markdown(["count", "success_rate", "p95"]).splitlines()
+    assert lines[0] == "| Provider | Count | Success Rate | P95 |"
+    assert len(lines) == 2 + len(table)
@@ -0,0 +1,132 @@
+"""
+Test suite for model_mock.py mock provider server.
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from anthropic import AsyncAnthropic, RateLimitError
+from pydantic import BaseModel, Field
+
+from model_agents import create_test_agent, run_conversation, run_test
+from model_mock import MockProfile, MockServer, fake_value, get_profile_name, register_mock_models
+from model_utils import MODEL_REGISTRY
+
+class Plan(BaseModel):
+    title: str
+    steps: list[str] = Field(..., min_length=2)
+    estimate: float
+
+@pytest_asyncio.fixture
+async def mock_server(monkeypatch):
+    """A mock server on a free port with constant, fast profiles."""
+    server = MockServer(port=0, seed=1, profiles={
+        "fast": MockProfile(ttft=0.05, ttft_sigma=0.0, tokens_per_second=500.0, output_tokens=20),
+        "slow": MockProfile(ttft=0.3, ttft_sigma=0.0, tokens_per_second=None, output_tokens=5, max_concurrency=2),
+        "flaky": MockProfile(ttft=0.0, ttft_sigma=0.0, tokens_per_second=None, rate_limit_rate=1.0),
+    })
+    await server.start()
+    monkeypatch.setenv("MOCK_LLM_URL", server.url)
+    yield server
+    await server.stop()
+
+@pytest.mark.asyncio
+async def test_run_and_stream_through_openai_api(mock_server):
+    """Test that agents get text responses with usage, streamed and not."""
+    agent = create_test_agent("mock:openai-fast")
+    response = await run_test(agent, "Be brief.", "Say hello")
+    streamed = await run_test(agent, "Be brief.", "Say hello", stream=True)
+
+    for result in (response, streamed):
+        assert not result.content.startswith("Error"), result.content
+        assert len(result.content.split()) == 20
+        assert result.request_tokens > 0 and result.response_tokens == 20
+    # 20 tokens at 500/s after a 50 ms TTFT
+    assert 0.04 <= streamed.ttft < streamed.duration
+    assert streamed.duration >= 0.08
+    assert mock_server.stats()["statuses"] == {"200": 2}
+
+@pytest.mark.asyncio
+async def test_structured_output_and_conversations(mock_server):
+    """Test that tool calls carry arguments valid for the result schema."""
+    model = "mock:openai-fast"
+    response = await run_test(create_test_agent(model, result_type=Plan), "Plan it.", "Plan a trip", result_type=Plan)
+    plan = Plan.model_validate_json(response.content)
+    assert len(plan.steps) == 2 and response.retries == 0
+
+    conversation = await run_conversation(create_test_agent(model), "Be brief.", ["one", "two", "three"])
+    assert not conversation.content.startswith("Error"), conversation.content
+    # The context grows with every turn
+    assert conversation.turn_context_tokens == sorted(conversation.turn_context_tokens)
+    assert len(set(conversation.turn_context_tokens)) == 3
+
+@pytest.mark.asyncio
+async def test_anthropic_messages_api(mock_server):
+    """Test text, streamed and tool use responses of the Anthropic endpoint."""
+    client = AsyncAnthropic(base_url=mock_server.url, api_key="mock", max_retries=0)
+    request = {"model": "anthropic-fast", "max_tokens": 10, "messages": [{"role": "user", "content": "hi"}]}
+
+    message = await client.messages.create(**request)
+    assert len(message.content[0].text.split()) == 10  # Capped by max_tokens
+    assert message.usage.output_tokens == 10
+
+    stream = await client.messages.create(**request, stream=True)
+    events = [event async for event in stream]
+    assert [e.type for e in events[:2]] == ["message_start", "content_block_start"]
+    assert "".join(e.delta.text for e in events if e.type == "content_block_delta") == message.content[0].text
+    assert events[-1].type == "message_stop"
+
+    schema = Plan.model_json_schema()
+    tool_use = await client.messages.create(
+        **request, tools=[{"name": "final_result", "input_schema": schema}], tool_choice={"type": "any"}
+    )
+    assert tool_use.stop_reason == "tool_use"
+    Plan.model_validate(tool_use.content[0].input)
+
+    with pytest.raises(RateLimitError):
+        await client.messages.create(**{**request, "model": "anthropic-flaky"})
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_rate_limits_and_concurrency_limit(mock_server):
+    """Test that injected 429s and requests above max concurrency fail as rate limited."""
+    register_mock_models(3, "slow")
+    agents = [create_test_agent(f"mock:openai-slow-{i}") for i in range(3)]
+    responses = await asyncio.gather(*(run_test(agent, "", "hi") for agent in agents))
+    errors = [r.content for r in responses if r.content.startswith("Error")]
+    assert len(errors) == 1 and "429" in errors[0]
+
+    limited = await run_test(create_test_agent("mock:openai-flaky"), "", "hi")
+    assert "429" in limited.content
+    stats = mock_server.stats()
+    assert stats["statuses"] == {"200": 2, "429": 2}
+    assert stats["peak_in_flight"] == 2 and stats["in_flight"] == 0
+    for i in range(3):
+        del MODEL_REGISTRY[f"mock:openai-slow-{i}"]
+
+@pytest.mark.asyncio
+async def test_malformed_requests_get_a_400(mock_server):
+    """Test that broken request lines, Content-Length values and bodies are answered with 400."""
+    for raw in (
+        b"GARBAGE\r\n\r\n",
+        b"POST /v1/chat/completions HTTP/1.1\r\nContent-Length: abc\r\n\r\n",
+        b"POST /v1/chat/completions HTTP/1.1\r\nContent-Length: 3\r\n\r\n{x}",
+    ):
+        reader, writer = await asyncio.open_connection(mock_server.host, mock_server.port)
+        writer.write(raw)
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), 5)
+        writer.close()
+        assert status_line.split()[1] == b"400", raw
+    assert mock_server.stats()["statuses"] == {"400": 3}
+
+def test_profile_names_and_schema_values():
+    """Test profile lookup from model names and values generated from JSON schemas."""
+    profiles = {"fast": MockProfile(), "slow": MockProfile()}
+    assert get_profile_name("anthropic-slow-3", profiles) == "slow"
+    assert get_profile_name("unknown", profiles) == "fast"
+
+    value = fake_value(Plan.model_json_schema())
+    assert Plan.model_validate(value).estimate == 1.0
+    assert fake_value({"anyOf": [{"type": "null"}, {"type": "integer", "minimum": 5}]}) == 5
@@ -0,0 +1,44 @@
+"""
+Test suite for model_monitor.py rolling-window monitoring.
+"""
+
+import json
+
+from model_monitor import AlertThresholds, LatencyRing, ProbeMonitor, append_alerts, window_label, window_stats
+
+def test_ring_keeps_fixed_memory_and_windows_by_time():
+    """Test that the ring overwrites the oldest probes and windows select by timestamp."""
+    ring = LatencyRing(capacity=4)
+    nbytes = ring.nbytes
+    for t in range(10):
+        ring.append(float(t), float(t), t % 3 != 0)
+    assert len(ring) == 4 and ring.count == 10 and ring.nbytes == nbytes
+    durations, success = ring.window(now=9.0, seconds=2.5)
+    assert sorted(durations) == [7.0, 8.0, 9.0]
+    stats = window_stats(ring, 9.0, 100)
+    assert stats.count == 4 and stats.error_rate == 0.5  # 6 and 9 failed
+    assert stats.p50 == 7.5  # Of the successful probes 7 and 8
+    assert window_stats(ring, 100.0, 10).count == 0
+
+def test_alerts_fire_once_and_resolve():
+    """Test that a breach fires one alert per window and metric, and resolves when it ends."""
+    monitor = ProbeMonitor(windows=[10, 100], thresholds=AlertThresholds(error_rate=0.4, min_samples=2))
+    assert monitor.record("m", 0.0, 1.0, False) == []  # Below the minimum sample count
+    fired = monitor.record("m", 1.0, 1.0, False)
+    assert [(a.window, a.metric, a.state) for a in fired] == [("10s", "error_rate", "firing"), ("100s", "error_rate", "firing")]
+    assert monitor.record("m", 2.0, 1.0, False) == []
+    # Later successes push the short window under the threshold first
+    resolved = [a for t in range(13, 20) for a in monitor.record("m", float(t), 1.0, True)]
+    assert [(a.window, a.state) for a in resolved] == [("10s", "resolved"), ("100s", "resolved")]
+    assert ("m", 10, "error_rate") not in monitor.firing
+    assert "| m | 10s | 7 | 1.00 | 1.00 | 0.0% | - |" in monitor.generate_table(19.0)
+
+def test_window_labels_and_alert_file(tmp_path):
+    """Test window labels and that alerts are appended as JSON lines."""
+    assert [window_label(w) for w in (900, 3600, 86400, 90)] == ["15m", "1h", "1d", "90s"]
+    monitor = ProbeMonitor(windows=[60], thresholds=AlertThresholds(p95=2.0, min_samples=1))
+    alerts = monitor.record("m", 0.0, 3.0, True)
+    path = append_alerts(tmp_path / "alerts.jsonl", alerts)
+    append_alerts(path, monitor.record("m", 100.0, 1.0, True))
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(a["metric"], a["state"], a["value"]) for a in lines] == [("p95", "firing", 3.0), ("p95", "resolved", 1.0)]
@@ -0,0 +1,54 @@
+"""
+Test suite for model_profile.py harness profiling.
+"""
+
+import threading
+import time
+
+from model_profile import IDLE, RunProfiler
+
+def busy_work(seconds: float) -> int:
+    """Spin the CPU and allocate for a while."""
+    end = time.perf_counter() + seconds
+    blocks = []
+    while time.perf_counter() < end:
+        blocks.append(list(range(100)))
+    return len(blocks)
+
+def test_samples_busy_stacks_and_traces_allocations(tmp_path):
+    """Test that busy code shows up in the folded stacks and the allocations report."""
+    profiler = RunProfiler(interval=0.002)
+    profiler.start()
+    busy_work(0.3)
+    time.sleep(0.1)
+    profiler.stop()
+
+    stats = profiler.stats()
+    assert stats["cpu_time"] > 0.2 and stats["wall_time"] >= 0.4
+    assert stats["traced_peak"] > 1_000_000 and stats["peak_rss"] > 0
+    assert stats["busy_samples"] > 0
+
+    folded, allocations = profiler.write_reports(tmp_path, "run")
+    lines = folded.read_text().splitlines()
+    busy = [line for line in lines if "busy_work (test_model_profile.py:" in line]
+    assert busy and busy[0].startswith("MainThread;")
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == profiler.samples
+    assert "test_model_profile.py" in allocations.read_text()
+    assert "| CPU Time (s) |" in profiler.generate_table()
+
+def test_waiting_threads_are_counted_as_idle():
+    """Test that a thread waiting on an event is folded into one idle stack."""
+    done = threading.Event()
+    waiter = threading.Thread(target=done.wait, name="waiter")
+    waiter.start()
+    profiler = RunProfiler(memory=False, interval=0.002)
+    profiler.start()
+    time.sleep(0.1)
+    profiler.stop()
+    done.set()
+    waiter.join()
+
+    assert profiler.stacks[f"waiter;{IDLE}"] > 10
+    assert not any(stack.startswith("waiter;") and stack != f"waiter;{IDLE}" for stack in profiler.stacks)
+    assert profiler.idle_samples >= profiler.stacks[f"waiter;{IDLE}"]
+    assert profiler.stats()["traced_peak"] is None
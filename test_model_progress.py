@@ -0,0 +1,65 @@
+"""
+Test suite for model_progress.py live progress view.
+"""
+
+import io
+
+import pytest
+
+from model_progress import ProgressView
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_counters_rate_eta_and_bottleneck():
+    """Test per-model counters and the derived run metrics."""
+    clock = FakeClock()
+    view = ProgressView(stream=io.StringIO(), clock=clock)
+    view.add_jobs("groq:fast", 4)
+    view.add_jobs("anthropic:slow", 4)
+
+    for model, duration in (("groq:fast", 1.0), ("groq:fast", 1.0), ("anthropic:slow", 8.0)):
+        view.request_started(model)
+        view.request_finished(model)
+        view.complete(model, "case", duration, success=True)
+    view.request_started("anthropic:slow")
+    view.backoff("anthropic:slow")
+    clock.now += 10
+
+    assert view.models["anthropic:slow"].in_flight == 1
+    assert view.models["anthropic:slow"].queued == 2
+    assert view.rate() == pytest.approx(0.3)
+    assert view.eta() == pytest.approx(5 / 0.3)
+    assert view.bottleneck() == "anthropic"
+    summary = view.summary_line()
+    assert "3/8 done" in summary and "1 in flight" in summary and "1 backoffs" in summary
+
+def test_plain_log_fallback_for_non_tty():
+    """Test that non-TTY output gets one line per finished test case and no escape codes."""
+    stream = io.StringIO()
+    view = ProgressView(stream=stream)
+    assert not view.live
+    view.add_jobs("groq:model", 2)
+    view.complete("groq:model", "reasoning", 1.25, success=False)
+    view.log("message")
+    assert stream.getvalue() == "[1/2] groq:model reasoning ✗ 1.25s\nmessage\n"
+
+@pytest.mark.asyncio
+async def test_live_view_redraws_in_place():
+    """Test that the live view clears its previous frame and keeps logs above it."""
+    stream = io.StringIO()
+    view = ProgressView(stream=stream, live=True, interval=0.01)
+    view.add_jobs("groq:model", 1)
+    view.start()
+    view.log("Submitting batch")
+    view.complete("groq:model", "reasoning", 0.5, success=True)
+    await view.stop()
+    output = stream.getvalue()
+    assert "\x1b[" in output and "F\x1b[J" in output
+    assert "Submitting batch" in output
+    assert output.rstrip().splitlines()[-1].startswith("1/1 done, 0 in flight")
+    assert "[1/1]" not in output
@@ -0,0 +1,51 @@
+"""
+Test suite for model_results.py columnar result storage.
+"""
+
+import json
+from datetime import datetime, UTC
+
+from model_results import ResultBuffer
+from model_test import TestResult
+
+def make_results() -> list[TestResult]:
+    timestamp = datetime(2025, 2, 20, 21, 21, 36, tzinfo=UTC)
+    return [
+        TestResult(model="groq:qwen-2.5-coder-32b", test_case="basic_response", success=True,
+                   response="4", duration=1.5, timestamp=timestamp),
+        TestResult(model="groq:qwen-2.5-coder-32b", test_case="reasoning", success=False,
+                   error="Error: 429", duration=0.2, route="groq:qwen-2.5-coder-32b", timestamp=timestamp),
+        TestResult(model="anthropic:claude-3-5-sonnet-latest", test_case="basic_response", success=True,
+                   response="4", duration=2.5, validation_time=0.001, retries=1, timestamp=timestamp)
+    ]
+
+def test_round_trip_through_columns():
+    """Test that results survive the columnar representation unchanged."""
+    results = make_results()
+    buffer = ResultBuffer.from_results(results)
+    assert len(buffer) == 3
+    assert len(buffer.models) == 2 and len(buffer.test_cases) == 2
+    assert buffer.to_results(TestResult) == results
+
+def test_responses_are_held_by_reference():
+    """Test that response strings are not copied into the buffer."""
+    results = make_results()
+    buffer = ResultBuffer.from_results(results)
+    assert buffer.responses[0] is results[0].response
+
+def test_records_match_pydantic_serialization():
+    """Test that records serialize like model_dump with default=str."""
+    results = make_results()
+    buffer = ResultBuffer.from_results(results)
+    expected = [json.loads(json.dumps(r.model_dump(exclude={"response"}), default=str)) for r in results]
+    records = json.loads(json.dumps(buffer.to_records()))
+    assert [record.pop("response_length") for record in records] == [1, 0, 1]
+    assert records == expected
+
+def test_group_by_model():
+    """Test grouping rows by model."""
+    buffer = ResultBuffer.from_results(make_results())
+    assert buffer.rows_by_model() == {"groq:qwen-2.5-coder-32b": [0, 1], "anthropic:claude-3-5-sonnet-latest": [2]}
+    grouped = buffer.by_model(TestResult)
+    assert list(grouped) == ["groq:qwen-2.5-coder-32b", "anthropic:claude-3-5-sonnet-latest"]
+    assert [r.test_case for r in grouped["groq:qwen-2.5-coder-32b"]] == ["basic_response", "reasoning"]
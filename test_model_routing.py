@@ -0,0 +1,40 @@
+"""
+Test suite for model_routing.py latency-aware routing.
+"""
+
+from model_routing import ModelRouter
+
+def make_router() -> ModelRouter:
+    router = ModelRouter(alpha=0.5, error_threshold=0.5, cooldown=60)
+    router.add_route("gemini-2.0-flash", "google-gla:gemini-2.0-flash")
+    router.add_route("gemini-2.0-flash", "google-vertex:gemini-2.0-flash")
+    return router
+
+def test_unmeasured_routes_are_explored_first():
+    """Test that every route gets measured before preferring one."""
+    router = make_router()
+    router.record("google-gla:gemini-2.0-flash", 1.0, True)
+    assert router.ranked_routes("gemini-2.0-flash")[0] == "google-vertex:gemini-2.0-flash"
+
+def test_fastest_healthy_route_is_preferred():
+    """Test that the route with the lowest latency EWMA ranks first."""
+    router = make_router()
+    router.record("google-gla:gemini-2.0-flash", 3.0, True)
+    router.record("google-vertex:gemini-2.0-flash", 1.0, True)
+    assert router.ranked_routes("gemini-2.0-flash") == [
+        "google-vertex:gemini-2.0-flash",
+        "google-gla:gemini-2.0-flash"
+    ]
+
+def test_failing_route_is_demoted():
+    """Test that a route above the error threshold is only used as a last resort."""
+    router = make_router()
+    router.record("google-gla:gemini-2.0-flash", 3.0, True)
+    router.record("google-vertex:gemini-2.0-flash", 1.0, True)
+    router.record("google-vertex:gemini-2.0-flash", 0.1, False)
+    assert router.ranked_routes("gemini-2.0-flash")[0] == "google-gla:gemini-2.0-flash"
+    assert "unhealthy" in router.generate_route_table()
+
+def test_unknown_base_model_has_no_routes():
+    """Test that unregistered base models return no routes."""
+    assert make_router().ranked_routes("unknown") == []
@@ -0,0 +1,59 @@
+"""
+Test suite for model_sandbox.py sandboxed code checks.
+"""
+
+import asyncio
+
+import pytest
+
+from model_sandbox import CodeChecker, extract_code_blocks, prepare_solution
+
+MEDIAN_FINDER = """# Median
+
+```python
+import heapq
+
+class MedianFinder:
+    def __init__(self):
+        self.low, self.high = [], []
+
+    def add_num(self, num: int) -> None:
+        heapq.heappush(self.low, -num)
+        heapq.heappush(self.high, -heapq.heappop(self.low))
+        if len(self.high) > len(self.low):
+            heapq.heappush(self.low, -heapq.heappop(self.high))
+
+    def find_median(self) -> float:
+        if len(self.low) > len(self.high):
+            return -self.low[0]
+        return (-self.low[0] + self.high[0]) / 2
+```
+"""
+
+def test_extract_and_prepare_code_blocks():
+    """Test code block extraction and dropping of imports between generated files."""
+    text = "```python\nfrom src.store.interfaces.key_value_store import KeyValueStore\nx = 1\n```\n```bash\nls\n```"
+    blocks = extract_code_blocks(text)
+    assert len(blocks) == 1
+    assert prepare_solution(blocks).strip() == "x = 1"
+
+@pytest.mark.asyncio
+async def test_hidden_tests_pass_for_correct_code():
+    """Test that correct solutions pass their hidden tests."""
+    checker = CodeChecker(workers=2)
+    median, add = await asyncio.gather(
+        checker.check("problem_solving", MEDIAN_FINDER),
+        checker.check("code_generation", "```python\ndef add(a: int, b: int) -> int:\n    return a + b\n```")
+    )
+    assert (median.passed, median.total, median.error) == (2, 2, None)
+    assert add.pass_rate == 1.0 and add.duration > 0
+
+@pytest.mark.asyncio
+async def test_failures_are_reported():
+    """Test wrong answers, missing code and time limits."""
+    checker = CodeChecker(timeout=2, cpu_seconds=1)
+    wrong = await checker.check("code_generation", "```python\ndef add(a, b):\n    return a - b\n```")
+    assert wrong.passed == 0 and wrong.total == 2 and "test_adds_integers" in wrong.error
+    assert (await checker.check("complex_code", "no code here")).error == "no python code blocks"
+    hung = await checker.check("code_generation", "```python\nwhile True:\n    pass\n```")
+    assert hung.passed == 0 and hung.error
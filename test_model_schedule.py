@@ -0,0 +1,42 @@
+"""
+Test suite for model_schedule.py job ordering.
+"""
+
+import pytest
+
+from model_schedule import DEFAULT_ESTIMATE, SchedulePlan, estimate_durations, simulate_makespan
+
+def test_simulate_makespan():
+    """Test list scheduling on identical workers."""
+    assert simulate_makespan([1, 1, 4], 2) == 5
+    assert simulate_makespan([4, 1, 1], 2) == 4
+    assert simulate_makespan([], 4) == 0
+
+def test_estimates_fall_back_to_related_history():
+    """Test per-job estimates and their fallbacks."""
+    recorded = {
+        "groq:fast": {"reasoning": 2.0, "code_generation": 4.0},
+        "groq:other": {"system_design": 20.0},
+    }
+    estimates = estimate_durations(
+        [("groq:fast", "reasoning"), ("groq:fast", "system_design"),
+         ("groq:new", "system_design"), ("groq:new", "unknown")],
+        recorded
+    )
+    assert estimates[("groq:fast", "reasoning")] == 2.0
+    assert estimates[("groq:fast", "system_design")] == 3.0
+    assert estimates[("groq:new", "system_design")] == 20.0
+    assert estimates[("groq:new", "unknown")] == DEFAULT_ESTIMATE
+
+    predicted = {("groq:fast", "reasoning"): 9.0, ("groq:new", "unknown"): 7.5}
+    estimates = estimate_durations([("groq:fast", "reasoning"), ("groq:new", "unknown")], recorded, predicted=predicted)
+    assert estimates == {("groq:fast", "reasoning"): 2.0, ("groq:new", "unknown"): 7.5}
+
+def test_lpt_plan_beats_list_order():
+    """Test that the LPT makespan is never worse than list order and is reported."""
+    estimates = {("m", f"case{i}"): d for i, d in enumerate([1, 1, 1, 1, 1, 1, 6])}
+    plan = SchedulePlan(estimates, {job: "groq" for job in estimates}, {"groq": 2})
+    assert plan.planned_makespan() == 6
+    assert plan.planned_makespan(lpt=False) == 9
+    assert plan.priority("m", "case6") > plan.priority("m", "case0")
+    assert "| 7 | 6.00 | 9.00 | 5.50 |" in plan.generate_table(5.5)
@@ -6,10 +6,20 @@ Tests all command line options and their combinations.
 
 import asyncio
 import os
+import stat
+import time
+import tracemalloc
+from types import SimpleNamespace
 import pytest
+from aiohttp import web
 from pathlib import Path
 from datetime import datetime, UTC
 
+import model_test
+from model_agents import TestResponse
+from model_metrics import aggregate
+from model_results import ResultBuffer
+from model_monitor import AlertThresholds
 from model_test import ModelTester, TestScenario, get_parser, TestResult
 
 # Add pytest configuration
@@ -17,18 +27,23 @@ pytest.register_assert_rewrite('test_model_test')
 
 # Remove the global pytestmark and only mark async tests
 
-@pytest.fixture(autouse=True)
-def setup_test_dirs():
-    """Create test directories if they don't exist."""
-    Path("test_results/markdown").mkdir(parents=True, exist_ok=True)
-    yield
-    # Could clean up here if needed
-    # But keeping test results might be useful
+@pytest.fixture
+def model_tester(tmp_path):
+    """Create a ModelTester writing to a temporary directory."""
+    return ModelTester(scenario=TestScenario.STANDARD, output_dir=tmp_path)
 
 @pytest.fixture
-def model_tester():
-    """Create a ModelTester instance."""
-    return ModelTester(scenario=TestScenario.STANDARD)
+def isolated_tester(tmp_path, monkeypatch):
+    """Create a ModelTester writing to a temporary directory with a stubbed run_test."""
+    tester = ModelTester(scenario=TestScenario.STANDARD, output_dir=tmp_path)
+    tester.available_providers = {"groq"}
+    tester.agents = {model: model for model in model_test.MODEL_REGISTRY}
+    
+    async def fake_run_test(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        return TestResponse(content=f"# {agent}\n* answer", duration=0.5)
+    
+    monkeypatch.setattr(model_test, "run_test", fake_run_test)
+    return tester
 
 @pytest.fixture
 def parser():
@@ -62,7 +77,7 @@ def test_run_tests_basic(parser):
     assert args.run_tests is True
     assert args.providers is None
     assert args.failed_only is False
-    assert args.scenario == TestScenario.STANDARD
+    assert args.scenario == [TestScenario.STANDARD]
 
 def test_run_tests_with_providers(parser):
     """Test --run-tests with specific providers."""
@@ -80,7 +95,28 @@ def test_run_tests_with_scenario(parser):
     """Test --run-tests with different scenarios."""
     args = parser.parse_args(['--run-tests', '--scenario', 'multi-file'])
     assert args.run_tests is True
-    assert args.scenario == TestScenario.MULTI_FILE
+    assert args.scenario == [TestScenario.MULTI_FILE]
+    assert parser.parse_args(['--run-tests', '--scenario', 'standard', 'all']).scenario == ['standard', 'all']
+    with pytest.raises(SystemExit):
+        parser.parse_args(['--run-tests', '--scenario', 'unknown'])
+
+def test_scenarios_merge_into_one_job_set(tmp_path):
+    """Test that several scenarios run as one set of test cases with a per-scenario breakdown."""
+    tester = ModelTester(scenario=["structured", "all"], output_dir=tmp_path)
+    assert tester.scenarios[0] == TestScenario.STRUCTURED and set(tester.scenarios) == set(TestScenario)
+    assert len(tester.test_cases) == sum(len(tests) for tests in model_test.SCENARIO_TESTS.values())
+    assert tester.test_cases[0].name == model_test.STRUCTURED_TESTS[0].name
+    
+    results = [
+        TestResult(model="test:model", test_case="basic_response", success=True, duration=1.0),
+        TestResult(model="test:model", test_case="reasoning", success=False, error="Error", duration=3.0),
+        TestResult(model="test:model", test_case="structured_math", success=True, response="{}", duration=2.0)
+    ]
+    content = Path(tester.save_test_summary(ResultBuffer.from_results(results), "scenarios")).read_text()
+    assert "Scenarios: structured, standard, multi-file" in content
+    assert "| standard | test:model | 2 | 1 | 50.0% | 2.00 |" in content
+    assert "| structured | test:model | 1 | 1 | 100.0% | 2.00 |" in content
+    assert tester._generate_scenario_table(ResultBuffer.from_results(results[:2])) == ""
 
 def test_run_tests_with_output_dir(parser):
     """Test --run-tests with custom output directory."""
@@ -117,7 +153,7 @@ async def test_model_tester_run_all_tests(model_tester):
     await model_tester.run_all_tests()
     
     # Check that results were saved
-    results_dir = Path("test_results")
+    results_dir = model_tester.results_dir
     assert results_dir.exists()
     assert (results_dir / "markdown").exists()
     
@@ -139,7 +175,7 @@ async def test_model_tester_specific_providers(model_tester):
     await model_tester.run_all_tests()
     
     # Check that only anthropic results exist
-    json_files = list(Path("test_results").glob("anthropic:*.json"))
+    json_files = list(model_tester.results_dir.glob("anthropic:*.json"))
     assert len(json_files) > 0
     assert all('anthropic:' in f.name for f in json_files)
 
@@ -157,12 +193,7 @@ def test_model_tester_save_test_summary(model_tester):
         timestamp=datetime.now(UTC)
     )
     
-    # Create results dictionary with list of TestResult objects
-    results = {
-        "test:model": [test_result]
-    }
-    
-    filepath = model_tester.save_test_summary(results, timestamp)
+    filepath = model_tester.save_test_summary(ResultBuffer.from_results([test_result]), timestamp)
     assert Path(filepath).exists()
     content = Path(filepath).read_text()
     assert "# Model Test Results Summary" in content
@@ -170,5 +201,547 @@ def test_model_tester_save_test_summary(model_tester):
     assert "test:model" in content  # Check that our test model is in the output
     assert "test_case" in content   # Check that our test case is in the output
 
+def test_render_markdown_option(parser):
+    """Test --render-markdown option."""
+    args = parser.parse_args(['--render-markdown'])
+    assert args.render_markdown is True
+
+def test_save_results_uses_artifact_store(model_tester, tmp_path):
+    """Test that responses are stored once by hash and rendered on demand."""
+    results = [
+        TestResult(model="test:model", test_case="first", success=True, response="Same response", duration=1.0),
+        TestResult(model="test:model", test_case="second", success=True, response="Same response", duration=2.0)
+    ]
+    model_tester.save_results("test:model", results)
+    
+    assert results[0].response_hash == results[1].response_hash
+    assert model_tester.artifacts.duplicates_skipped == 1
+    assert "## Response Storage" in Path(model_tester.save_test_summary(ResultBuffer.from_results(results), "artifacts")).read_text()
+    artifacts = list((tmp_path / "artifacts").rglob("*.*z*"))
+    assert len(artifacts) == 1
+    # Readable like any other file, not only by the owner
+    plain = tmp_path / "plain.txt"
+    plain.write_text("x")
+    assert stat.S_IMODE(artifacts[0].stat().st_mode) == stat.S_IMODE(plain.stat().st_mode)
+    result_file = next(tmp_path.glob("test:model_*.json"))
+    assert "Same response" not in result_file.read_text()
+    assert model_tester.load_results(result_file)[1].response == "Same response"
+    
+    content = Path(model_tester.render_markdown("test:model")).read_text()
+    assert "# first" in content and "# second" in content
+
+def test_latest_models_register_alternative_routes(model_tester):
+    """Test that models served by several providers get one entry and several routes."""
+    model_tester.available_providers = {"google-gla", "google-vertex", "groq"}
+    models = model_tester._get_latest_models()
+    assert "google-gla:gemini-2.0-flash" in models
+    assert "google-vertex:gemini-2.0-flash" not in models
+    assert len(model_tester.router.ranked_routes("gemini-2.0-flash")) == 2
+    # Repeated calls on the same tester return the same models
+    assert model_tester._get_latest_models() == models
+
+@pytest.mark.asyncio
+async def test_routes_of_excluded_providers_are_not_used(model_tester, monkeypatch):
+    """Test that a later run with fewer providers skips routes registered by an earlier run."""
+    model_tester.available_providers = {"google-gla", "google-vertex"}
+    model_tester._get_latest_models()
+    model_tester.available_providers = {"google-vertex"}
+    assert model_tester._get_latest_models() == ["google-vertex:gemini-2.0-flash"]
+    model_tester.agents = {route: route for route in model_tester.router.stats}
+    served = []
+    
+    async def fake_run_test(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        served.append(agent)
+        return TestResponse(content="Error: status_code: 429", duration=1.0)
+    
+    monkeypatch.setattr(model_test, "run_test", fake_run_test)
+    await model_tester._run_test_case("google-vertex:gemini-2.0-flash", model_test.STANDARD_TESTS[0])
+    assert served == ["google-vertex:gemini-2.0-flash"]
+
+@pytest.mark.asyncio
+async def test_run_test_case_fails_over_on_transient_errors(model_tester, monkeypatch):
+    """Test that rate-limited requests fail over and deterministic errors don't."""
+    model_tester.available_providers = {"google-gla", "google-vertex"}
+    model_tester._get_latest_models()
+    model_tester.agents = {route: route for route in model_tester.router.stats}
+    errors = {"google-gla:gemini-2.0-flash": "Error: status_code: 429"}
+    
+    async def fake_run_test(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        return TestResponse(content=errors.get(agent, f"served by {agent}"), duration=1.0)
+    
+    monkeypatch.setattr(model_test, "run_test", fake_run_test)
+    test_case = model_test.STANDARD_TESTS[0]
+    
+    result = await model_tester._run_test_case("google-gla:gemini-2.0-flash", test_case)
+    assert result["success"]
+    assert result["route"] == "google-vertex:gemini-2.0-flash"
+    assert result["duration"] == pytest.approx(2.0)
+    # The failover is counted in the progress view instead of printed
+    assert model_tester.progress.models["google-gla:gemini-2.0-flash"].backoffs == 1
+    
+    # Deterministic errors are not retried on other routes
+    errors = {route: "Error: invalid request" for route in model_tester.router.stats}
+    result = await model_tester._run_test_case("google-gla:gemini-2.0-flash", test_case)
+    assert not result["success"]
+    assert result["duration"] == pytest.approx(1.0)
+
+def test_structured_scenario_reports_validation_cost(tmp_path):
+    """Test that structured results get their own cost table in the summary."""
+    tester = ModelTester(scenario=TestScenario.STRUCTURED, output_dir=tmp_path)
+    assert all(tc.result_type is not str for tc in tester.test_cases)
+    
+    results = ResultBuffer.from_results([
+        TestResult(model="test:model", test_case="structured_math", success=True,
+                   response="{}", duration=2.0, validation_time=0.001, retries=1),
+        TestResult(model="test:model", test_case="structured_design", success=False,
+                   error="Error: invalid", duration=1.0)
+    ])
+    content = Path(tester.save_test_summary(results, "structured")).read_text()
+    assert "## Structured Output Cost" in content
+    assert "| Avg Generation, est. (s) | Avg Re-validation (ms) |" in content
+    assert "| test:model | 2 | 1 | 2.00 | 2.00 | 1.000 | 1 |" in content
+
+@pytest.fixture
+def fake_batch(monkeypatch):
+    """Stub batch submissions; the submitted jobs are collected in the returned list."""
+    submitted = []
+    
+    async def fake_run_batch(backend, jobs):
+        submitted.extend(jobs)
+        return {job.custom_id: TestResponse(content=f"# {job.test_case}\n* answer", duration=60.0) for job in jobs}
+    
+    monkeypatch.setattr(model_test, "get_batch_backend", lambda provider, api_key=None: provider)
+    monkeypatch.setattr(model_test, "run_batch", fake_run_batch)
+    return submitted
+
+@pytest.mark.asyncio
+async def test_batch_mode_runs_structured_cases_individually(isolated_tester, fake_batch, monkeypatch):
+    """Test that structured cases are not batched as plain text but run with their result type."""
+    isolated_tester.set_scenarios([TestScenario.STANDARD, TestScenario.STRUCTURED])
+    individual = []
+    
+    async def fake_run_test(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        individual.append(result_type)
+        return TestResponse(content="{}", duration=0.5, validation_time=0.001)
+    
+    monkeypatch.setattr(model_test, "create_test_agent", lambda model_name, **kwargs: model_name)
+    monkeypatch.setattr(model_test, "run_test", fake_run_test)
+    results = await isolated_tester.run_batch_tests(["groq:qwen-2.5-coder-32b"])
+    structured = {tc.name for tc in model_test.STRUCTURED_TESTS}
+    assert fake_batch and not structured & {job.test_case for job in fake_batch}
+    assert individual and str not in individual
+    by_case = {r.test_case: r for r in results["groq:qwen-2.5-coder-32b"]}
+    assert set(by_case) == {tc.name for tc in isolated_tester.test_cases}
+    assert all(by_case[name].validation_time == 0.001 for name in structured)
+
+@pytest.mark.asyncio
+async def test_batch_mode_runs_conversations_individually(isolated_tester, fake_batch, monkeypatch):
+    """Test that multi-turn cases send every turn instead of a batched first prompt."""
+    isolated_tester.set_scenarios([TestScenario.STANDARD, TestScenario.MULTI_TURN])
+    conversations = []
+    
+    async def fake_run_conversation(agent, system_prompt, user_prompts):
+        conversations.append(user_prompts)
+        return TestResponse(content="answer", duration=2.0, turn_durations=[0.5] * len(user_prompts))
+    
+    monkeypatch.setattr(model_test, "run_conversation", fake_run_conversation)
+    results = await isolated_tester.run_batch_tests(["groq:qwen-2.5-coder-32b"])
+    multi_turn = {tc.name: tc for tc in model_test.MULTI_TURN_TESTS}
+    assert not set(multi_turn) & {job.test_case for job in fake_batch}
+    assert sorted(conversations) == sorted([tc.prompt, *tc.turns] for tc in multi_turn.values())
+    for result in results["groq:qwen-2.5-coder-32b"]:
+        if result.test_case in multi_turn:
+            assert len(result.turn_durations) == len(multi_turn[result.test_case].turns) + 1
+
+@pytest.mark.asyncio
+async def test_batch_mode_runs_tool_tasks_with_tools(isolated_tester, fake_batch, monkeypatch):
+    """Test that tool-use cases are not batched without tools but run through run_tool_task."""
+    isolated_tester.set_scenarios([TestScenario.STANDARD, TestScenario.TOOL_USE])
+    tool_agents = []
+    
+    def fake_create_test_agent(model_name, api_key=None, result_type=str, tools=()):
+        tool_agents.append(tuple(tools))
+        return model_name
+    
+    async def fake_run_tool_task(agent, system_prompt, user_prompt):
+        return TestResponse(content="56.42", duration=1.0, tool_calls=3, model_turns=3, tool_round_trips=[0.2, 0.3])
+    
+    monkeypatch.setattr(model_test, "create_test_agent", fake_create_test_agent)
+    monkeypatch.setattr(model_test, "run_tool_task", fake_run_tool_task)
+    model = "anthropic:claude-3-5-sonnet-latest"
+    results = await isolated_tester.run_batch_tests([model])
+    tool_cases = {tc.name for tc in model_test.TOOL_USE_TESTS}
+    assert fake_batch and not tool_cases & {job.test_case for job in fake_batch}
+    assert tool_agents == [("lookup", "calculate")]
+    tool_results = [r for r in results[model] if r.test_case in tool_cases]
+    assert len(tool_results) == len(tool_cases)
+    assert all(r.tool_calls == 3 and r.model_turns == 3 for r in tool_results)
+
+@pytest.mark.asyncio
+async def test_batch_mode_checks_generated_code(isolated_tester, fake_batch):
+    """Test that batch outputs of code cases run against the hidden tests like individual results."""
+    checked = []
+    
+    class FakeChecker:
+        def supports(self, test_case):
+            return test_case == "code_generation"
+        
+        async def check(self, test_case, response):
+            checked.append((test_case, response))
+            return SimpleNamespace(passed=3, total=4, duration=0.2)
+    
+    isolated_tester.code_checker = FakeChecker()
+    results = await isolated_tester.run_batch_tests(["groq:qwen-2.5-coder-32b"])
+    assert checked == [("code_generation", "# code_generation\n* answer")]
+    by_case = {r.test_case: r for r in results["groq:qwen-2.5-coder-32b"]}
+    assert (by_case["code_generation"].code_passed, by_case["code_generation"].code_total) == (3, 4)
+    assert by_case["reasoning"].code_total is None
+
+@pytest.mark.asyncio
+async def test_run_all_tests_end_to_end(isolated_tester, tmp_path):
+    """Test a full run with stubbed requests: buffer, JSON results, summary and history."""
+    await isolated_tester.run_all_tests()
+    
+    assert len(isolated_tester.results) == 2 * len(model_test.STANDARD_TESTS)
+    result_files = list(tmp_path.glob("groq:*.json"))
+    assert len(result_files) == 2
+    saved = isolated_tester.load_results(result_files[0])
+    assert all(r.success and r.response.startswith("# groq:") for r in saved)
+    assert list((tmp_path / "markdown").glob("model_test_summary_*.md"))
+    assert isolated_tester.history_file.exists()
+
+@pytest.mark.asyncio
+async def test_run_reports_from_buffer_without_result_objects(isolated_tester, tmp_path, monkeypatch):
+    """Test that a run records and reports results from the buffer's columns without building TestResults."""
+    def fail(*args, **kwargs):
+        raise AssertionError("TestResult built during a run")
+    
+    monkeypatch.setattr(TestResult, "__init__", fail)
+    monkeypatch.setattr(TestResult, "model_construct", fail)
+    await isolated_tester.run_all_tests()
+    
+    assert len(isolated_tester.results) == 2 * len(model_test.STANDARD_TESTS)
+    summary = next((tmp_path / "markdown").glob("model_test_summary_*.md")).read_text()
+    assert "groq:qwen-2.5-coder-32b (Summary)" in summary
+
+@pytest.mark.asyncio
+async def test_profiled_run_writes_profiles_and_resources(isolated_tester, tmp_path, parser):
+    """Test that --profile-cpu/--profile-mem write reports and a resources section."""
+    args = parser.parse_args(['--run-tests', '--profile-cpu', '--profile-mem'])
+    await isolated_tester.run_all_tests(profile_cpu=args.profile_cpu, profile_mem=args.profile_mem)
+    
+    run_id = isolated_tester.run_id
+    folded = (tmp_path / "profiles" / f"{run_id}_cpu.folded").read_text().splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded)
+    assert "Top allocations by line" in (tmp_path / "profiles" / f"{run_id}_allocations.txt").read_text()
+    summary = next((tmp_path / "markdown").glob("model_test_summary_*.md")).read_text()
+    assert "## Harness Resources" in summary
+    assert "| Peak RSS (MB) |" in summary and "| CPU Time (s) |" in summary
+    assert not tracemalloc.is_tracing()
+
+def test_aggregate_option(parser):
+    """Test --aggregate with --group-by."""
+    args = parser.parse_args(['--aggregate', '--group-by', 'provider', 'day'])
+    assert args.aggregate is True
+    assert args.group_by == ['provider', 'day']
+    assert parser.parse_args(['--aggregate']).group_by == ['model']
+
+@pytest.mark.asyncio
+async def test_saved_runs_aggregate_by_run(isolated_tester):
+    """Test that saved results load back into the buffer with their run ids."""
+    await isolated_tester.run_all_tests()
+    history = isolated_tester.load_result_history()
+    assert len(history) == len(isolated_tester.results)
+    assert history.runs.values == [isolated_tester.run_id]
+    table = aggregate(history, ["run", "provider"])
+    assert table.get(isolated_tester.run_id, "groq")["count"] == len(history)
+    assert "| P50 (s) | P95 (s) |" in isolated_tester._generate_speed_ranking(history)
+
+@pytest.mark.asyncio
+async def test_export_is_incremental(isolated_tester, tmp_path):
+    """Test that --export only writes results files not exported yet."""
+    await isolated_tester.run_all_tests()
+    written = isolated_tester.export_results(fmt="npz")
+    assert len(written) == 2
+    assert all("provider=groq" in str(p) for p in written)
+    assert isolated_tester.export_results(fmt="npz") == []
+    args = get_parser().parse_args(['--export', '--export-format', 'npz'])
+    assert args.export is True and args.export_format == "npz"
+
+@pytest.mark.asyncio
+async def test_max_wall_time_writes_partial_reports(isolated_tester, tmp_path, monkeypatch):
+    """Test that an expired budget cancels hung requests and still writes reports."""
+    async def hanging_run_test(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        if "architect" in system_prompt:
+            await asyncio.sleep(60)
+        return TestResponse(content=f"# {agent}", duration=0.5)
+    
+    monkeypatch.setattr(model_test, "run_test", hanging_run_test)
+    isolated_tester.test_history = {}
+    await isolated_tester.run_all_tests(max_wall_time=0.5)
+    
+    assert isolated_tester.timed_out
+    results = isolated_tester.results.to_results(TestResult)
+    skipped = [r for r in results if r.skipped]
+    finished = [r for r in results if not r.skipped]
+    assert skipped and finished
+    assert len(results) == 2 * len(model_test.STANDARD_TESTS)
+    assert all(r.error.startswith("Skipped:") for r in skipped)
+    # Skipped test cases are neither failures in history nor part of the speed ranking
+    history = isolated_tester.test_history
+    assert sum(h.success_count + h.failure_count for h in history.values()) == len(finished)
+    summary = next((tmp_path / "markdown").glob("model_test_summary_*.md")).read_text()
+    assert "**Partial run:**" in summary
+    state = isolated_tester.concurrency.get("groq").state()
+    assert state["cancelled"] == len(skipped) and state["error"] == 0
+    assert aggregate(isolated_tester.results).rows()[0]["count"] < len(model_test.STANDARD_TESTS)
+
+@pytest.mark.asyncio
+async def test_recorded_durations_drive_the_schedule(isolated_tester, tmp_path):
+    """Test that runs record per-test-case durations and report the planned makespan."""
+    isolated_tester.test_history = {}
+    await isolated_tester.run_all_tests()
+    model = "groq:qwen-2.5-coder-32b"
+    durations = isolated_tester.test_history[model].durations
+    assert set(durations) == {tc.name for tc in model_test.STANDARD_TESTS}
+    assert isolated_tester.plan.estimates  # planned before any history existed
+    
+    plan = isolated_tester._plan_schedule([model])
+    assert plan.priority(model, "basic_response") == pytest.approx(0.5)
+    summary = next((tmp_path / "markdown").glob("model_test_summary_*.md")).read_text()
+    assert "## Schedule" in summary
+
+def test_code_execution_table(model_tester):
+    """Test the hidden test summary per model."""
+    results = [
+        TestResult(model="test:model", test_case="code_generation", success=True, duration=1.0,
+                   code_passed=2, code_total=2, code_time=0.1),
+        TestResult(model="test:model", test_case="complex_code", success=True, duration=1.0,
+                   code_passed=1, code_total=3, code_time=0.3),
+        TestResult(model="test:model", test_case="reasoning", success=True, duration=1.0)
+    ]
+    table = model_tester._generate_code_check_table(ResultBuffer.from_results(results))
+    assert "| test:model | 2 | 3/5 | 60.0% | 1 | 0.20 |" in table
+    assert model_tester._generate_code_check_table(ResultBuffer.from_results(results[2:])) == ""
+    assert get_parser().parse_args(['--run-tests', '--check-code']).check_code is True
+
+@pytest.mark.asyncio
+async def test_prompt_caching_runs_warm_requests_after_cold(isolated_tester, monkeypatch):
+    """Test that a sequence group runs in order and the cache table compares cold and warm requests."""
+    isolated_tester.test_cases = model_test.PROMPT_CACHING_TESTS
+    started = []
+    
+    async def fake_run_test(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        started.append(user_prompt)
+        await asyncio.sleep(0.01)
+        warm = len(started) > 1
+        return TestResponse(content="| get |", duration=0.5 if warm else 2.0, request_tokens=1600,
+                            cached_tokens=1536 if warm else 0, ttft=0.2 if warm else 1.0)
+    
+    monkeypatch.setattr(model_test, "run_test", fake_run_test)
+    results = await isolated_tester.test_model("groq:qwen-2.5-coder-32b")
+    assert started == [tc.prompt for tc in model_test.PROMPT_CACHING_TESTS]
+    assert all(r.ttft is not None and r.cached_tokens is not None for r in results)
+    
+    table = isolated_tester._generate_cache_table(isolated_tester.results)
+    assert "| groq:qwen-2.5-coder-32b | 2.00 | 0.50 | 4.00x | 1.00 | 0.20 | 3/3 | 96.0% | 48.0% |" in table
+
+@pytest.mark.asyncio
+async def test_sequence_group_stays_on_one_route(isolated_tester, monkeypatch):
+    """Test that warm prompt cache requests go to the route that served the cold one."""
+    isolated_tester.available_providers = {"google-gla", "google-vertex"}
+    isolated_tester.test_cases = model_test.PROMPT_CACHING_TESTS
+    model = isolated_tester._get_latest_models()[0]
+    assert len(isolated_tester.router.ranked_routes("gemini-2.0-flash")) == 2
+    
+    async def fake_run_test(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        return TestResponse(content="| get |", duration=0.5)
+    
+    monkeypatch.setattr(model_test, "run_test", fake_run_test)
+    results = await isolated_tester.test_model(model)
+    assert len(results) == len(model_test.PROMPT_CACHING_TESTS)
+    assert len({r.route for r in results}) == 1
+    
+    # A transient failure on the pinned route fails over, and the group follows
+    cold_routes = []
+    
+    async def failing_pinned_route(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        if user_prompt == model_test.PROMPT_CACHING_TESTS[0].prompt:
+            cold_routes.append(agent)
+        elif agent == cold_routes[0] and user_prompt == model_test.PROMPT_CACHING_TESTS[1].prompt:
+            return TestResponse(content="Error: status_code: 503, overloaded", duration=0.1)
+        return TestResponse(content="| get |", duration=0.5)
+    
+    monkeypatch.setattr(model_test, "run_test", failing_pinned_route)
+    routes = [r.route for r in await isolated_tester.test_model(model)]
+    assert routes[0] == cold_routes[0] and len(set(routes[1:])) == 1 and routes[1] != cold_routes[0]
+
+def test_multi_turn_latency_table(model_tester):
+    """Test the fitted latency increase per 1k context tokens."""
+    results = [
+        TestResult(model="test:model", test_case="design_discussion", success=True, duration=4.0,
+                   turn_durations=[0.5, 1.0, 1.5], turn_context_tokens=[1000, 2000, 3000]),
+        TestResult(model="test:model", test_case="reasoning", success=True, duration=1.0)
+    ]
+    table = model_tester._generate_multi_turn_table(ResultBuffer.from_results(results))
+    assert "| test:model | 1 | 3 | 0.50 | 1.50 | 1000 → 3000 | 500.0 |" in table
+    assert model_tester._generate_multi_turn_table(ResultBuffer.from_results(results[1:])) == ""
+    assert all(tc.turns for tc in model_test.MULTI_TURN_TESTS)
+
+@pytest.mark.asyncio
+async def test_tool_use_scenario_compares_models(isolated_tester, monkeypatch):
+    """Test that tool-use test cases get agents with their tools and the table ranks models by time to answer."""
+    isolated_tester.set_scenarios([TestScenario.TOOL_USE])
+    created = []
+    answers = {"order_total": "56.42", "plan_conversion": "45.08", "stock_runway": "30"}
+    
+    def fake_create_test_agent(model_name, api_key=None, result_type=str, tools=()):
+        created.append((model_name, tuple(tools)))
+        return model_name
+    
+    async def fake_run_tool_task(agent, system_prompt, user_prompt):
+        name = next(tc.name for tc in model_test.TOOL_USE_TESTS if tc.prompt == user_prompt)
+        slow = agent.startswith("google")
+        return TestResponse(content=answers[name], duration=3.0 if slow else 1.5, tool_calls=3,
+                            model_turns=4 if slow else 3, tool_round_trips=[0.5, 1.0] if slow else [0.25, 0.5])
+    
+    monkeypatch.setattr(model_test, "create_test_agent", fake_create_test_agent)
+    monkeypatch.setattr(model_test, "run_tool_task", fake_run_tool_task)
+    isolated_tester.agents = {}
+    models = ["google-gla:gemini-2.0-flash", "mock:openai-fast"]
+    results = {model: await isolated_tester.test_model(model) for model in models}
+    assert sorted(c for c in created if c[1]) == [(model, ("lookup", "calculate")) for model in models]
+    assert all(r.success and r.model_turns for rs in results.values() for r in rs)
+    
+    table = isolated_tester._generate_tool_use_table(isolated_tester.results)
+    fast, slow = table.splitlines()[2:]
+    assert fast == "| mock:openai-fast | 3 | 2/3 | 3.0 | 3.0 | 0.38 | 0.50 | 1.50 |"
+    assert slow == "| google-gla:gemini-2.0-flash | 3 | 2/3 | 4.0 | 3.0 | 0.75 | 1.00 | 3.00 |"
+    
+    # Models without tool support don't run the scenario
+    assert await isolated_tester.test_model("groq:qwen-2.5-coder-32b") == []
+    assert isolated_tester._generate_tool_use_table(ResultBuffer()) == ""
+
+@pytest.mark.asyncio
+async def test_context_benchmark_fits_and_stores_latency_models(isolated_tester, tmp_path, monkeypatch):
+    """Test the benchmark loop, the registry update and the report with stubbed requests."""
+    for name, info in model_test.MODEL_REGISTRY.items():
+        monkeypatch.setitem(model_test.MODEL_REGISTRY, name, dict(info))
+    
+    async def fake_run_test(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        tokens = len(user_prompt) // 4
+        return TestResponse(content="1\n2", duration=0.2 + tokens / 10_000 + 0.5, ttft=0.2 + tokens / 10_000,
+                            request_tokens=tokens, response_tokens=50)
+    
+    monkeypatch.setattr(model_test, "run_test", fake_run_test)
+    fitted = await isolated_tester.run_context_benchmark([1_000, 4_000, 16_000])
+    
+    assert set(fitted) == set(isolated_tester._get_latest_models())
+    model = next(iter(fitted))
+    assert fitted[model].prefill_per_1k == pytest.approx(0.1, rel=0.01)
+    assert model_test.MODEL_REGISTRY[model]["latency_model"]["samples"] == 3
+    assert isolated_tester.latency_file.exists()
+    assert list((tmp_path / "markdown").glob("context_benchmark_*.md"))
+    assert get_parser().parse_args(['--benchmark-context', '--context-sizes', '1000', '2000']).context_sizes == [1000, 2000]
+
+@pytest.mark.asyncio
+async def test_provider_outage_fast_fails_remaining_test_cases(isolated_tester, tmp_path, monkeypatch):
+    """Test that an open breaker skips the rest of a model's test cases and is recorded."""
+    calls = []
+    
+    async def failing_run_test(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        calls.append(agent)
+        return TestResponse(content="Error: 503 Service Unavailable", duration=2.0)
+    
+    monkeypatch.setattr(model_test, "run_test", failing_run_test)
+    isolated_tester.test_history = {}
+    isolated_tester.available_providers = {"groq"}
+    model = "groq:qwen-2.5-coder-32b"
+    isolated_tester._ensure_history(model, model_test.get_model_info(model))
+    isolated_tester.concurrency.get("groq").limit = 1
+    results = await isolated_tester.test_model(model)
+    
+    assert len(calls) == isolated_tester.breakers.model_threshold
+    skipped = [r for r in results if r.skipped]
+    assert len(skipped) == len(model_test.STANDARD_TESTS) - len(calls)
+    assert all(r.error.startswith("Skipped: circuit open (model:groq:qwen-2.5-coder-32b)") for r in skipped)
+    history = isolated_tester.test_history[model]
+    assert history.failure_count == len(calls)
+    assert history.known_issues == ["Error: 503 Service Unavailable"]
+    assert [(t.breaker, t.to_state) for t in history.breaker_transitions] == [("model:groq:qwen-2.5-coder-32b", "open")]
+    
+    summary = Path(isolated_tester.save_test_summary(isolated_tester.results, "breaker")).read_text()
+    assert "## Circuit Breakers" in summary and "**Partial run:**" not in summary
+
+@pytest.mark.asyncio
+async def test_blocked_event_loop_marks_results_unreliable(isolated_tester, monkeypatch):
+    """Test that results in flight while the loop is blocked carry the lag and are flagged."""
+    async def blocking_run_test(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        await asyncio.sleep(0.05)
+        time.sleep(0.15)  # Blocks every other in-flight request too
+        return TestResponse(content="* answer", duration=0.5)
+    
+    monkeypatch.setattr(model_test, "run_test", blocking_run_test)
+    await isolated_tester.run_all_tests()
+    
+    results = [r for r in isolated_tester.results.to_results(TestResult) if not r.skipped]
+    assert results and all(r.loop_lag >= 0.1 for r in results)
+    assert isolated_tester.load_result_history().row(0)["loop_lag"] >= 0.1
+    ranking = isolated_tester._generate_speed_ranking(isolated_tester.results)
+    assert "| Unreliable |" in ranking and "Unreliable results were in flight" in ranking
+    assert f"| {len(model_test.STANDARD_TESTS)}/{len(model_test.STANDARD_TESTS)} |" in ranking
+    assert not isolated_tester.lag_monitor.running
+    summary = next((isolated_tester.markdown_dir).glob("model_test_summary_*.md")).read_text()
+    assert "## Event Loop Lag" in summary
+
+@pytest.mark.asyncio
+async def test_monitor_probes_models_and_posts_alerts(isolated_tester, tmp_path, monkeypatch):
+    """Test that failing probes fire alerts to the file and webhook, and recovery resolves them."""
+    failing = {"groq:qwen-2.5-coder-32b"}
+    
+    async def probe_run_test(agent, system_prompt, user_prompt, result_type=str, stream=False):
+        await asyncio.sleep(0.01)
+        if agent in failing:
+            return TestResponse(content="Error: 503 Service Unavailable", duration=0.01)
+        return TestResponse(content="# Sum\n2 + 2 = 4", duration=0.01)
+    
+    monkeypatch.setattr(model_test, "run_test", probe_run_test)
+    posted = []
+    
+    async def receive(request):
+        posted.extend((await request.json())["alerts"])
+        return web.json_response({})
+    
+    app = web.Application()
+    app.router.add_post("/alerts", receive)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        # The breaker would skip the failing model's later probes
+        isolated_tester.breakers.model_threshold = 1000
+        monitor = await isolated_tester.run_monitor(
+            interval=0.05,
+            windows=[0.3, 60],
+            thresholds=AlertThresholds(error_rate=0.5, min_samples=2),
+            webhook=f"http://127.0.0.1:{port}/alerts",
+            duration=0.5
+        )
+    finally:
+        await runner.cleanup()
+    
+    groq_models = [m for m, info in model_test.MODEL_REGISTRY.items() if info["provider"] == "groq"]
+    assert sorted(monitor.rings) == sorted(groq_models)
+    assert all(len(ring) >= 5 for ring in monitor.rings.values())
+    firing = {(a.model, a.window) for a in monitor.alerts if a.state == "firing"}
+    assert firing == {("groq:qwen-2.5-coder-32b", "0.3s"), ("groq:qwen-2.5-coder-32b", "1m")}
+    lines = (tmp_path / "monitor_alerts.jsonl").read_text().splitlines()
+    assert len(lines) == len(monitor.alerts) == len(posted)
+    assert "| groq:qwen-2.5-coder-32b | 1m |" in (tmp_path / "monitor_status.md").read_text()
+    # Probes are not results of a run
+    assert len(isolated_tester.results) == 0
+
 if __name__ == '__main__':
     pytest.main(['-v', __file__]) 
\ No newline at end of file
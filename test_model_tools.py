@@ -0,0 +1,31 @@
+"""
+Test suite for model_tools.py local tools.
+"""
+
+import pytest
+from pydantic_ai import ModelRetry
+
+from model_tools import LOOKUP_DATA, calculate, get_tools, lookup
+
+def test_calculate_evaluates_arithmetic_only():
+    """Test arithmetic results and that anything else asks the model to retry."""
+    assert calculate("(3 * 12.50 + 2 * 7.25) * (1 + 0.085)") == "56.42"
+    assert calculate("1260 / 45") == "28.0"
+    assert calculate("2 ** 10 - -1") == "1025"
+    for expression in ("__import__('os')", "1 +", "1 / 0", "10 ** 1000", "True + 1", "x * 2"):
+        with pytest.raises(ModelRetry):
+            calculate(expression)
+
+def test_lookup_suggests_known_keys():
+    """Test that unknown keys list the known keys with the same prefix."""
+    assert lookup("fx:USD-EUR") == LOOKUP_DATA["fx:USD-EUR"]
+    with pytest.raises(ModelRetry, match="price:widget, price:gadget, price:gizmo"):
+        lookup("price:sprocket")
+    with pytest.raises(ModelRetry, match="tax_rate:default"):
+        lookup("tax")
+
+def test_get_tools():
+    """Test that tools are registered by name."""
+    assert [tool.name for tool in get_tools(["lookup", "calculate"])] == ["lookup", "calculate"]
+    with pytest.raises(KeyError):
+        get_tools(["search"])
@@ -0,0 +1,82 @@
+"""
+Test suite for model_writer.py background writer.
+"""
+
+import asyncio
+import json
+import stat
+import threading
+import time
+
+import pytest
+
+from model_writer import BackgroundWriter, write_json, write_text
+
+@pytest.mark.asyncio
+async def test_writes_run_off_the_event_loop_in_order():
+    """Test that slow writes don't stall the loop and run in submission order."""
+    writer = BackgroundWriter()
+    order = []
+    loop_thread = threading.get_ident()
+
+    def slow_write(name):
+        time.sleep(0.1)
+        order.append((name, threading.get_ident() != loop_thread))
+        return name
+
+    first = await writer.submit("a", lambda: slow_write("a"))
+    second = await writer.submit("b", lambda: slow_write("b"))
+    ticks = 0
+    while not second.done():
+        await asyncio.sleep(0.01)
+        ticks += 1
+    await writer.close()
+
+    assert order == [("a", True), ("b", True)]
+    assert first.result() == "a" and second.result() == "b"
+    assert ticks >= 10
+    assert writer.write_time >= 0.2
+
+@pytest.mark.asyncio
+async def test_queued_writes_with_the_same_key_are_coalesced(tmp_path):
+    """Test that only the latest queued write of a key runs and all submitters get its result."""
+    writer = BackgroundWriter()
+    blocker = threading.Event()
+    await writer.submit("block", blocker.wait)
+    path = tmp_path / "state.json"
+    futures = [await writer.submit(path, lambda n=n: write_json(path, {"version": n})) for n in range(5)]
+    blocker.set()
+    await writer.close()
+
+    assert json.loads(path.read_text()) == {"version": 4}
+    assert all(f.result() == path for f in futures)
+    assert writer.writes == 2 and writer.coalesced == 4
+    assert "2 writes (4 coalesced)" in writer.summary_line()
+
+@pytest.mark.asyncio
+async def test_bounded_queue_applies_backpressure_and_reports_errors():
+    """Test that submitters wait when the queue is full and write errors reach their futures."""
+    writer = BackgroundWriter(max_pending=1)
+    blocker = threading.Event()
+    await writer.submit("block", blocker.wait)
+    await asyncio.sleep(0.01)  # Let the writer take the first write
+    await writer.submit("queued", lambda: None)
+    submit = asyncio.create_task(writer.submit("waiting", lambda: 1 / 0))
+    await asyncio.sleep(0.05)
+    assert not submit.done()
+
+    blocker.set()
+    failed = await submit
+    await writer.close()
+    with pytest.raises(ZeroDivisionError):
+        failed.result()
+    assert writer.failures == 1
+
+def test_atomic_writes_keep_default_permissions(tmp_path):
+    """Test that atomically written files get the same mode as files written with open()."""
+    plain = tmp_path / "plain.txt"
+    plain.write_text("x")
+    written = write_text(tmp_path / "atomic.txt", "x")
+    assert stat.S_IMODE(written.stat().st_mode) == stat.S_IMODE(plain.stat().st_mode)
+    assert stat.S_IMODE(write_json(tmp_path / "atomic.json", {}).stat().st_mode) == stat.S_IMODE(plain.stat().st_mode)
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []